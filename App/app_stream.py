@@ -8,6 +8,7 @@ from langchain_community.chat_message_histories import SQLChatMessageHistory
 # --- Local Imports ---
 from config import SQL_CONNECTION_STRING, DEFAULT_USER_PROFILE
 from db_utils import init_db, get_threads, create_thread
+from hedgeone_agent.retrieval_cache import cache_stats
 from agent import get_agent_executor
 
 # --- Page Configuration ---
@@ -77,6 +78,11 @@ with st.sidebar:
                 st.session_state.messages = load_chat_history(session_id)
                 st.rerun()
 
+    # --- Search Cache Section ---
+    with st.expander("Search cache"):
+        for name, stats in cache_stats().items():
+            st.caption(f"{name}: {stats['entries']}/{stats['max_entries']} entries, hit rate {stats['hit_rate']:.0%} ({stats['hits']} hits, {stats['misses']} misses)")
+
 # --- Main Chat Interface ---
 st.title("AI Financial Assistant")
 
@@ -25,6 +25,8 @@ EQUITY_FAISS_INDEX = "faiss_index"
 FNO_CSV_FILE = "F&O_symbols.csv"
 FNO_FAISS_INDEX = "fno_faiss_index"
 EMBEDDINGS_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+INDEX_BUILD_BATCH_SIZE = 256 # Rows embedded per batch when (re)building an index
+INDEX_BUILD_WORKERS = min(4, os.cpu_count() or 1) # Embedding processes for large builds
 
 # --- LLM Configuration ---
 LLM_MODEL = "openai/gpt-oss-20b" # Note: Your original code had 'openai/gpt-oss-120b' and 'llama3-70b-8192' in comments. Using Llama 3 70b as it's a strong model.
@@ -2,8 +2,13 @@ import sys
 from fyers_apiv3 import fyersModel
 from config import CLIENT_ID, ACCESS_TOKEN
 
+# The rate-limited / retrying gateway is shared with the Backtester package (pip install -e Backtester)
+from hedgeone_agent.fyers_gateway import FyersGateway, account_bucket_path
+
 try:
-    fyers = fyersModel.FyersModel(client_id=CLIENT_ID, token=ACCESS_TOKEN, is_async=False)
+    # Same account bucket file as the Backtester, so together they stay under the account limit
+    fyers = FyersGateway(fyersModel.FyersModel(client_id=CLIENT_ID, token=ACCESS_TOKEN, is_async=False),
+                         shared_state=account_bucket_path(CLIENT_ID))
     test_response = fyers.get_profile()
     
     if test_response.get('s') != 'ok':
@@ -0,0 +1,22 @@
+from typing import Any, Dict
+
+from hedgeone_agent.symbol_index import SymbolIndex, build_symbol_index
+from config import EQUITY_CSV_FILE, FNO_CSV_FILE
+
+# --- Symbol Indexes ---
+# Exact / prefix / fuzzy lookups (hedgeone_agent.symbol_index) over each
+# symbols CSV, tried before the FAISS vector search (vector_store.py). A
+# missing CSV gives an empty index, leaving every lookup to FAISS.
+
+
+def format_record(record: Dict[str, Any]) -> str:
+    """The same 'Company Name,Symbol[,Lot Size]' string the vector store documents hold."""
+    fields = [record["company_name"], record["symbol"]]
+    if "lot_size" in record:
+        fields.append(str(record["lot_size"]))
+    return ",".join(fields)
+
+
+# --- Build Indexes ---
+equity_index: SymbolIndex = build_symbol_index([EQUITY_CSV_FILE])
+fno_index: SymbolIndex = build_symbol_index([FNO_CSV_FILE])
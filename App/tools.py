@@ -1,7 +1,8 @@
 import sys
 from langchain_core.tools import tool
 from fyers_client import fyers  # Import the initialized Fyers model
-from vector_store import equity_vectorstore, fno_vectorstore # Import loaded stores
+from vector_store import equity_vectorstore, fno_vectorstore, cached_similarity_search # Import loaded stores
+from symbol_index import equity_index, fno_index, format_record # Exact/prefix/fuzzy lookups before FAISS
 
 # --- Tool Definitions (No changes) ---
 
@@ -18,7 +19,14 @@ def search_for_equity_symbol(company_query: str, top_k: int = 3) -> list[str]:
     print(f"[Tool Call] search_for_equity_symbol: Searching for '{company_query}', k={top_k}")
     sys.stdout.flush()
     try:
-        docs = equity_vectorstore.similarity_search(company_query, k=top_k)
+        hits = equity_index.search(company_query, k=top_k)
+        if hits:
+            results = [format_record(hit) for hit in hits]
+            print(f"[Tool Result] Found {hits[0]['match']} matches: {results}")
+            sys.stdout.flush()
+            return results
+
+        docs = cached_similarity_search("equity", equity_vectorstore, company_query, top_k)
         if not docs:
             return ["Error: No equity symbols found matching that query."]
         results = [doc.page_content for doc in docs]
@@ -46,7 +54,14 @@ def search_for_fno_symbol(derivative_query: str, top_k: int = 3) -> list[str]:
     print(f"[Tool Call] search_for_fno_symbol: Searching for '{derivative_query}', k={top_k}")
     sys.stdout.flush()
     try:
-        docs = fno_vectorstore.similarity_search(derivative_query, k=top_k)
+        hits = fno_index.search(derivative_query, k=top_k)
+        if hits:
+            results = [format_record(hit) for hit in hits]
+            print(f"[Tool Result] Found {hits[0]['match']} matches: {results}")
+            sys.stdout.flush()
+            return results
+
+        docs = cached_similarity_search("fno", fno_vectorstore, derivative_query, top_k)
         if not docs:
             return ["Error: No F&O symbols found matching that query."]
         results = [doc.page_content for doc in docs]
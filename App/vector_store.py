@@ -2,21 +2,22 @@ import os
 import sys
 import pandas as pd
 from langchain.embeddings import HuggingFaceEmbeddings
-from langchain.vectorstores import FAISS
 from langchain.docstore.document import Document
 from config import (
     EQUITY_CSV_FILE, EQUITY_FAISS_INDEX, 
-    FNO_CSV_FILE, FNO_FAISS_INDEX, EMBEDDINGS_MODEL
+    FNO_CSV_FILE, FNO_FAISS_INDEX, EMBEDDINGS_MODEL,
+    INDEX_BUILD_BATCH_SIZE, INDEX_BUILD_WORKERS
 )
+from hedgeone_agent.embeddings import CachedEmbeddings
+from hedgeone_agent.retrieval_cache import retrieval_cache, query_key
+from hedgeone_agent.index_manifest import sync_vector_store
 
-def create_vector_store_if_missing(csv_path: str, index_path: str, embeddings_model):
-    """Creates and saves a FAISS vector store if it doesn't already exist."""
-    if os.path.exists(index_path):
-        print(f"Vector store '{index_path}' already exists. Loading...")
-        sys.stdout.flush()
-        return
-    
-    print(f"Vector store '{index_path}' not found. Creating from '{csv_path}'...")
+def sync_vector_store_with_csv(csv_path: str, index_path: str, embeddings_model):
+    """
+    Creates the FAISS vector store for a CSV, or updates an existing one with
+    only the rows added / changed / removed since the last sync, and returns it.
+    """
+    print(f"Syncing vector store '{index_path}' with '{csv_path}'...")
     sys.stdout.flush()
     if not os.path.exists(csv_path):
         print(f"Error: CSV file not found at '{csv_path}'. Cannot create vector store.")
@@ -35,10 +36,9 @@ def create_vector_store_if_missing(csv_path: str, index_path: str, embeddings_mo
                 sys.stdout.flush()
                 exit()
                 
-            documents = [
-                Document(page_content=f"{row['Company name']},{row['Symbol']},{row['Lot size']}")
-                for _, row in df.iterrows()
-            ]
+            # Column-wise string ops instead of a Python loop per row
+            contents = df['Company name'].astype(str) + "," + df['Symbol'].astype(str) + "," + df['Lot size'].astype(str)
+            documents = [Document(page_content=content) for content in contents]
             print(f"Loaded F&O data with Lot Size.")
             sys.stdout.flush()
             
@@ -49,10 +49,8 @@ def create_vector_store_if_missing(csv_path: str, index_path: str, embeddings_mo
                 sys.stdout.flush()
                 exit()
                 
-            documents = [
-                Document(page_content=f"{row['Company name']},{row['Symbol']}")
-                for _, row in df.iterrows()
-            ]
+            contents = df['Company name'].astype(str) + "," + df['Symbol'].astype(str)
+            documents = [Document(page_content=content) for content in contents]
         # --- END OF UPDATED LOGIC ---
 
         if not documents:
@@ -60,29 +58,46 @@ def create_vector_store_if_missing(csv_path: str, index_path: str, embeddings_mo
             sys.stdout.flush()
             exit()
             
-        vectorstore = FAISS.from_documents(documents, embeddings_model)
-        vectorstore.save_local(index_path)
-        print(f"Successfully created and saved vector store at '{index_path}'.")
+        vectorstore, counts = sync_vector_store(
+            index_path, documents, embeddings_model, model_name=EMBEDDINGS_MODEL,
+            batch_size=INDEX_BUILD_BATCH_SIZE, workers=INDEX_BUILD_WORKERS
+        )
+        if counts["added"] or counts["removed"]:
+            # Cached results of the old index are stale now
+            retrieval_cache("fno" if csv_path == FNO_CSV_FILE else "equity").clear()
+            print(f"Saved vector store at '{index_path}' (+{counts['added']} / -{counts['removed']} rows).")
+        else:
+            print(f"Vector store '{index_path}' is up to date ({counts['unchanged']} rows).")
         sys.stdout.flush()
+        return vectorstore
         
     except Exception as e:
-        print(f"Error creating vector store from '{csv_path}': {e}")
+        print(f"Error syncing vector store from '{csv_path}': {e}")
         sys.stdout.flush()
         exit()
 
+def cached_similarity_search(name: str, vectorstore, query: str, k: int) -> list:
+    """`vectorstore.similarity_search(query, k)` through the `name` store's results cache."""
+    cache = retrieval_cache(name)
+    key = (*query_key(EMBEDDINGS_MODEL, query), k)
+    docs = cache.get(key)
+    if docs is None:
+        docs = vectorstore.similarity_search(query, k=k)
+        cache.put(key, list(docs))
+    return list(docs)
+
 # --- Initialize and Load Stores ---
 try:
-    embeddings_model = HuggingFaceEmbeddings(model_name=EMBEDDINGS_MODEL)
+    # Repeated queries reuse their embedding instead of another model forward pass
+    embeddings_model = CachedEmbeddings(HuggingFaceEmbeddings(model_name=EMBEDDINGS_MODEL), EMBEDDINGS_MODEL)
     
     # --- Create/Load Equity Vector Store ---
-    create_vector_store_if_missing(EQUITY_CSV_FILE, EQUITY_FAISS_INDEX, embeddings_model)
-    equity_vectorstore = FAISS.load_local(EQUITY_FAISS_INDEX, embeddings_model, allow_dangerous_deserialization=True)
+    equity_vectorstore = sync_vector_store_with_csv(EQUITY_CSV_FILE, EQUITY_FAISS_INDEX, embeddings_model)
     print("Equity symbol vector store loaded!")
     sys.stdout.flush()
 
     # --- Create/Load F&O Vector Store ---
-    create_vector_store_if_missing(FNO_CSV_FILE, FNO_FAISS_INDEX, embeddings_model)
-    fno_vectorstore = FAISS.load_local(FNO_FAISS_INDEX, embeddings_model, allow_dangerous_deserialization=True)
+    fno_vectorstore = sync_vector_store_with_csv(FNO_CSV_FILE, FNO_FAISS_INDEX, embeddings_model)
     print("F&O symbol vector store loaded!")
     sys.stdout.flush()
 
@@ -10,6 +10,7 @@ sys.path.append(os.path.dirname(__file__))
 from hedgeone_agent.agent_core import create_agent_runnable
 from hedgeone_agent.rag_setup import get_strategy_retriever, get_symbol_retriever
 from hedgeone_agent.config import GROQ_API_KEY, FYERS_CLIENT_ID, FYERS_TOKEN
+from hedgeone_agent.job_queue import get_job_queue, format_progress
 
 # --- Page Setup ---
 st.set_page_config(
@@ -53,6 +54,33 @@ def initialize_agent():
 # Initialize agent and retrievers
 agent_runnable, error = initialize_agent()
 
+# --- Background Backtests (sidebar, refreshed every second) ---
+@st.cache_resource
+def initialize_job_queue():
+    """Starts the pre-warmed backtest workers once per server."""
+    return get_job_queue()
+
+job_queue = initialize_job_queue()
+
+@st.fragment(run_every="1s")
+def job_panel():
+    jobs = job_queue.jobs()[-10:]
+    if not jobs:
+        st.caption("No background backtests yet.")
+    for job in reversed(jobs):
+        st.markdown(f"**{job['strategy_id']}** · `{job['job_id']}`")
+        fraction = job["bars"] / job["total_bars"] if job["total_bars"] else 0.0
+        if job["status"] == "running":
+            st.progress(min(fraction, 1.0), text=format_progress(job))
+            if st.button("Cancel", key=f"cancel-{job['job_id']}"):
+                job_queue.cancel(job["job_id"])
+        else:
+            st.caption(format_progress(job) if job["status"] != "done" else f"done in {job['elapsed']:.1f}s")
+
+with st.sidebar:
+    st.subheader("Backtest jobs")
+    job_panel()
+
 # --- Chat History Management ---
 if "messages" not in st.session_state:
     st.session_state.messages = []
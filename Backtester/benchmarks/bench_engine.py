@@ -0,0 +1,183 @@
+import sys
+import os
+import json
+import time
+import argparse
+import platform
+import subprocess
+from datetime import datetime
+
+# Add the package to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+# --- BACKTEST ENGINE BENCHMARK SUITE ---
+# Times every strategy in STRATEGY_REGISTRY through run_backtest_internal on
+# seeded synthetic OHLCV (no network, no Fyers credentials) for a grid of
+# bar counts x symbol counts x engines. Each case runs in a fresh subprocess
+# so its peak RSS (VmHWM) is its own. Cases above --max-total-bars are
+# listed as skipped rather than run. Results go to a JSON file; pass --baseline to
+# compare bars/sec against a saved run.
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "engine_baseline.json")
+PRESETS = {
+    "full": {"bars": [1_000, 100_000, 1_000_000], "symbols": [1, 10, 100]},
+    "quick": {"bars": [1_000, 10_000], "symbols": [1, 10]},
+}
+
+
+def _peak_rss_mb() -> float:
+    """
+    This process's own peak RSS (VmHWM). ru_maxrss is not used: Linux carries
+    it over from the parent across fork + exec.
+    """
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024.0
+    raise RuntimeError("VmHWM not available (Linux only)")
+
+
+def _child(strategy_id: str, engine: str, n_bars: int, n_symbols: int, repeats: int) -> None:
+    """ Runs one case and prints its measurements as JSON. """
+    from hedgeone_agent.backtest_engine import run_backtest_internal
+    from hedgeone_agent.synthetic_data import generate_ohlcv
+
+    feeds = [generate_ohlcv(n_bars, seed=i, freq="min" if n_bars > 10_000 else "B") for i in range(n_symbols)]
+    peak_before_mb = _peak_rss_mb()
+    best = float("inf")
+    for _ in range(repeats):
+        began = time.perf_counter()
+        summary = run_backtest_internal(strategy_id, feeds, {}, engine=engine)
+        best = min(best, time.perf_counter() - began)
+    if summary.startswith("Error"):
+        raise SystemExit(summary)
+    peak_mb = _peak_rss_mb()
+    print(json.dumps({
+        "wall_seconds": best,
+        "bars_per_sec": n_bars * n_symbols / best if best > 0 else None,
+        "peak_rss_mb": peak_mb,
+        # How far the backtest pushed the peak past the one left by building the feeds
+        "run_rss_growth_mb": peak_mb - peak_before_mb,
+    }))
+
+
+def _case_key(row: dict) -> str:
+    return f"{row['strategy_id']}|{row['engine']}|{row['bars']}|{row['symbols']}"
+
+
+def _environment() -> dict:
+    import backtrader, numpy, pandas
+    return {
+        "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+        "backtrader": backtrader.__version__, "numpy": numpy.__version__, "pandas": pandas.__version__,
+    }
+
+
+def compare(rows: list, baseline: dict, tolerance: float) -> list:
+    """ Cases whose bars/sec fell more than `tolerance` (relative) below the baseline. """
+    reference = {_case_key(r): r for r in baseline.get("results", []) if r.get("status") == "ok"}
+    regressions = []
+    for row in rows:
+        base = reference.get(_case_key(row))
+        if row.get("status") != "ok" or base is None or not base.get("bars_per_sec"):
+            continue
+        ratio = row["bars_per_sec"] / base["bars_per_sec"]
+        row["vs_baseline"] = ratio
+        if ratio < 1.0 - tolerance:
+            regressions.append(row)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every strategy on synthetic OHLCV.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="full")
+    parser.add_argument("--bars", default=None, help="Comma-separated bar counts (overrides the preset)")
+    parser.add_argument("--symbols", default=None, help="Comma-separated symbol counts (overrides the preset)")
+    parser.add_argument("--strategies", default=None, help="Comma-separated strategy ids (default: all registered)")
+    parser.add_argument("--engines", default="backtrader,vectorized")
+    parser.add_argument("--max-total-bars", type=int, default=1_000_000, help="Skip (and list as skipped) cases with bars x symbols above this; 0 runs every case")
+    parser.add_argument("--repeats", type=int, default=1, help="Best-of repeats per case")
+    parser.add_argument("--timeout", type=float, default=900.0, help="Seconds before a case is abandoned")
+    parser.add_argument("--out", default=None, help="Results JSON (default: benchmarks/results/engine_<timestamp>.json)")
+    parser.add_argument("--baseline", default=None, help=f"Compare against this results file (e.g. {DEFAULT_BASELINE})")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative bars/sec drop vs baseline")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Also write the results to {DEFAULT_BASELINE}")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--child", nargs=4, metavar=("STRATEGY", "ENGINE", "BARS", "SYMBOLS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        strategy_id, engine, n_bars, n_symbols = args.child
+        _child(strategy_id, engine, int(n_bars), int(n_symbols), args.repeats)
+        return
+
+    from hedgeone_agent.strategies import STRATEGY_REGISTRY
+
+    preset = PRESETS[args.preset]
+    bar_counts = [int(b) for b in args.bars.split(",")] if args.bars else preset["bars"]
+    symbol_counts = [int(s) for s in args.symbols.split(",")] if args.symbols else preset["symbols"]
+    strategy_ids = args.strategies.split(",") if args.strategies else list(STRATEGY_REGISTRY)
+    engines = args.engines.split(",")
+
+    # Measure the engines, not the result cache or the results warehouse
+    child_env = {**os.environ, "HEDGEONE_RESULT_CACHE": "0", "HEDGEONE_RESULTS_STORE": "0"}
+    rows = []
+    print(f"{'strategy':<26} {'engine':<11} {'bars':>9} {'syms':>5} {'wall s':>8} {'bars/s':>11} {'peak MB':>8}  status")
+    for strategy_id in strategy_ids:
+        for engine in engines:
+            for n_bars in bar_counts:
+                for n_symbols in symbol_counts:
+                    row = {"strategy_id": strategy_id, "engine": engine, "bars": n_bars, "symbols": n_symbols}
+                    if args.max_total_bars and n_bars * n_symbols > args.max_total_bars:
+                        row["status"] = "skipped"
+                        row["error"] = f"bars x symbols above --max-total-bars {args.max_total_bars:,}"
+                    else:
+                        try:
+                            out = subprocess.run(
+                                [sys.executable, os.path.abspath(__file__), "--repeats", str(args.repeats),
+                                 "--child", strategy_id, engine, str(n_bars), str(n_symbols)],
+                                capture_output=True, text=True, timeout=args.timeout, env=child_env,
+                            )
+                            if out.returncode == 0:
+                                row.update(json.loads(out.stdout.strip().splitlines()[-1]), status="ok")
+                            else:
+                                row["status"] = "error"
+                                row["error"] = (out.stderr.strip().splitlines() or ["unknown error"])[-1]
+                        except subprocess.TimeoutExpired:
+                            row["status"] = "timeout"
+                    rows.append(row)
+                    if row["status"] == "ok":
+                        print(f"{strategy_id:<26} {engine:<11} {n_bars:>9} {n_symbols:>5} {row['wall_seconds']:>8.2f} "
+                              f"{row['bars_per_sec']:>11,.0f} {row['peak_rss_mb']:>8.1f}  ok")
+                    else:
+                        print(f"{strategy_id:<26} {engine:<11} {n_bars:>9} {n_symbols:>5} {'':>8} {'':>11} {'':>8}  "
+                              f"{row['status']} {row.get('error', '')}")
+
+    skipped = sum(row["status"] == "skipped" for row in rows)
+    if skipped:
+        print(f"{skipped} case(s) skipped above --max-total-bars {args.max_total_bars:,}; pass --max-total-bars 0 to run them")
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(rows, json.load(f), args.tolerance)
+        for row in regressions:
+            print(f"REGRESSION {_case_key(row)}: {row['vs_baseline']:.2f}x baseline bars/sec")
+        print(f"Baseline comparison: {'OK' if not regressions else f'{len(regressions)} regression(s)'}")
+
+    report = {"created": datetime.now().isoformat(timespec="seconds"), "environment": _environment(), "results": rows}
+    out_path = args.out or os.path.join(BENCH_DIR, "results", f"engine_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with open(out_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {out_path}")
+    if args.save_baseline:
+        with open(DEFAULT_BASELINE, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {DEFAULT_BASELINE}")
+    sys.exit(1 if regressions and args.fail_on_regression else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import sys
+import os
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from datetime import datetime
+
+# Add the package to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+# --- SYMBOL INDEX BUILD BENCHMARK ---
+# Builds a FAISS symbol store from a synthetic symbol master of --rows rows
+# (shaped like symbols.csv) once per worker count, through the same
+# CSV -> documents -> batched embedding pipeline the agent uses, and reports
+# rows/sec for each stage. A second sync with a few changed rows shows the
+# incremental refresh cost.
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def write_symbol_master(path: str, rows: int) -> None:
+    import pandas as pd
+    ids = pd.RangeIndex(rows).astype(str)
+    pd.DataFrame({
+        "Company Name": "SYNTHETIC COMPANY " + ids + " LTD",
+        "Symbol": "NSE:SYN" + ids + "-EQ",
+    }).to_csv(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the batched symbol index build.")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts to compare")
+    parser.add_argument("--batch-size", type=int, default=None, help="Rows per embedding batch (default: config)")
+    parser.add_argument("--changed", type=int, default=100, help="Rows changed before the incremental re-sync")
+    parser.add_argument("--out", default=None, help="Results JSON (default: benchmarks/results/index_build_<timestamp>.json)")
+    args = parser.parse_args()
+
+    from hedgeone_agent import rag_setup
+    from hedgeone_agent.config import EMBEDDING_MODEL_NAME, INDEX_BUILD_BATCH_SIZE
+    from hedgeone_agent.embeddings import get_embeddings
+    from hedgeone_agent import index_manifest
+
+    batch_size = args.batch_size or INDEX_BUILD_BATCH_SIZE
+    workdir = tempfile.mkdtemp(prefix="index_build_")
+    csv_path = os.path.join(workdir, "symbols.csv")
+    write_symbol_master(csv_path, args.rows)
+    rag_setup.SYMBOL_CSV_PATH = csv_path
+    embeddings = get_embeddings()
+
+    rows = []
+    try:
+        for workers in [int(w) for w in args.workers.split(",")]:
+            index_path = os.path.join(workdir, f"index_{workers}")
+            began = time.perf_counter()
+            documents = rag_setup._symbol_documents()
+            read_seconds = time.perf_counter() - began
+            began = time.perf_counter()
+            index_manifest.sync_vector_store(index_path, documents, embeddings, batch_size=batch_size, workers=workers)
+            build_seconds = time.perf_counter() - began
+
+            for doc in documents[:args.changed]:
+                doc.page_content += " (renamed)"
+            began = time.perf_counter()
+            _, counts = index_manifest.sync_vector_store(index_path, documents, embeddings, batch_size=batch_size, workers=workers)
+            refresh_seconds = time.perf_counter() - began
+
+            rows.append({
+                "workers": workers, "rows": len(documents), "batch_size": batch_size,
+                "read_seconds": read_seconds, "build_seconds": build_seconds,
+                "rows_per_sec": len(documents) / build_seconds if build_seconds > 0 else None,
+                "refresh_seconds": refresh_seconds, "refresh_added": counts["added"],
+            })
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{'workers':>7} {'rows':>9} {'read s':>7} {'build s':>8} {'rows/s':>9} {'refresh s':>9}")
+    for row in rows:
+        print(f"{row['workers']:>7} {row['rows']:>9,} {row['read_seconds']:>7.2f} {row['build_seconds']:>8.1f} "
+              f"{row['rows_per_sec']:>9,.0f} {row['refresh_seconds']:>9.2f}")
+
+    out_path = args.out or os.path.join(BENCH_DIR, "results", f"index_build_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with open(out_path, "w") as f:
+        json.dump({"created": datetime.now().isoformat(timespec="seconds"), "cpus": os.cpu_count(),
+                   "model": EMBEDDING_MODEL_NAME, "results": rows}, f, indent=2)
+    print(f"Results written to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
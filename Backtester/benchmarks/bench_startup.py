@@ -0,0 +1,129 @@
+import sys
+import os
+import json
+import time
+import argparse
+import platform
+import subprocess
+from datetime import datetime
+
+# Add the package to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+# --- AGENT STARTUP BENCHMARK ---
+# Measures agent cold start in a fresh subprocess, stage by stage, the way
+# the CLI reaches its first answer: import agent_tools, warm the strategy and
+# symbol retrievers (as __main__ / app_streamlit do), then answer a first
+# strategy and symbol query through the agent's strategy_search and
+# symbol_search tools. For each stage it reports wall seconds, current
+# and peak RSS, and how many embedding models have been constructed so far.
+# Only public rag_setup functions and agent_tools tools are used, so the same script
+# can be run on an older checkout for the "before" numbers (--out there,
+# --baseline here).
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _rss_mb() -> dict:
+    """ Current (VmRSS) and peak (VmHWM) resident memory of this process in MB. """
+    values = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(("VmRSS:", "VmHWM:")):
+                key, kb = line.split()[:2]
+                values["rss_mb" if key == "VmRSS:" else "peak_rss_mb"] = int(kb) / 1024.0
+    return values
+
+
+def _child(query: str, company: str) -> None:
+    """ Runs the stages once and prints their measurements as JSON. """
+    began = time.perf_counter()
+    # Count model constructions by wrapping the class every code path uses
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    loads = {"n": 0}
+    original_init = HuggingFaceEmbeddings.__init__
+
+    def counting_init(self, *args, **kwargs):
+        loads["n"] += 1
+        original_init(self, *args, **kwargs)
+
+    HuggingFaceEmbeddings.__init__ = counting_init
+    stages = [{"stage": "import_langchain", "seconds": time.perf_counter() - began, "model_loads": 0, **_rss_mb()}]
+
+    def timed(name, fn):
+        start = time.perf_counter()
+        fn()
+        stages.append({"stage": name, "seconds": time.perf_counter() - start, "model_loads": loads["n"], **_rss_mb()})
+
+    def first_query():
+        # Through the tools the agent calls, so the symbol index / result caches in front of FAISS count too
+        from hedgeone_agent.agent_tools import strategy_search, symbol_search
+        strategy_search.invoke({"query": query})
+        symbol_search.invoke({"company_name_query": company})
+
+    def warm_retrievers():
+        from hedgeone_agent.rag_setup import get_strategy_retriever, get_symbol_retriever
+        get_strategy_retriever()
+        get_symbol_retriever()
+
+    timed("import_agent_tools", lambda: __import__("hedgeone_agent.agent_tools"))
+    timed("warm_retrievers", warm_retrievers)
+    timed("first_query", first_query)
+    print(json.dumps({"total_seconds": time.perf_counter() - began, "stages": stages}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure agent cold-start time and memory.")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh processes to run (the fastest is reported)")
+    parser.add_argument("--query", default="golden cross", help="First strategy search query")
+    parser.add_argument("--company", default="Reliance Industries", help="First symbol search query")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Seconds before a run is abandoned")
+    parser.add_argument("--out", default=None, help="Results JSON (default: benchmarks/results/startup_<timestamp>.json)")
+    parser.add_argument("--baseline", default=None, help="Compare against a results file from an earlier checkout")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.query, args.company)
+        return
+
+    runs = []
+    for i in range(max(1, args.runs)):
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", "--query", args.query, "--company", args.company],
+            capture_output=True, text=True, timeout=args.timeout, cwd=os.path.join(BENCH_DIR, ".."),
+        )
+        if out.returncode != 0:
+            sys.exit(f"Run {i + 1} failed: {(out.stderr.strip().splitlines() or ['unknown error'])[-1]}")
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        print(f"Run {i + 1}: {runs[-1]['total_seconds']:.2f}s")
+    best = min(runs, key=lambda run: run["total_seconds"])
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {row["stage"]: row for row in json.load(f)["best"]["stages"]}
+
+    print(f"{'stage':<20} {'seconds':>8} {'RSS MB':>8} {'peak MB':>8} {'models':>7}" + ("   vs baseline" if baseline else ""))
+    for row in best["stages"]:
+        line = f"{row['stage']:<20} {row['seconds']:>8.2f} {row['rss_mb']:>8.1f} {row['peak_rss_mb']:>8.1f} {row['model_loads']:>7}"
+        base = (baseline or {}).get(row["stage"])
+        if base:
+            line += f"   {base['seconds']:.2f}s, {base['peak_rss_mb']:.1f} MB peak, {base['model_loads']} model(s)"
+        print(line)
+    print(f"Cold start to first answer: {best['total_seconds']:.2f}s")
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "best": best, "runs": runs,
+    }
+    out_path = args.out or os.path.join(BENCH_DIR, "results", f"startup_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with open(out_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import sys
+import os
+import json
+import argparse
+import subprocess
+import tempfile
+import time
+from datetime import timedelta
+
+# Add the package to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+# --- STREAMING VS IN-MEMORY PEAK RSS BENCHMARK ---
+# Writes synthetic 1-minute bars of growing length into a scratch OHLCV cache,
+# then runs one backtest per (mode, bar count) in a fresh subprocess and
+# records that process's peak RSS. "memory" loads the whole frame into
+# PandasData with default Cerebro settings; "streaming" uses
+# run_streaming_backtest's chunked feeds with exactbars=1 and bounded_memory
+# (daily equity curve, trimmed order history); "stream-bars" is the same run
+# keeping every bar of the equity curve and every order, as the streaming
+# mode did before, for the before/after comparison.
+
+MODES = ("memory", "stream-bars", "streaming")
+
+SYMBOL = "BENCH:SYNTH"
+RESOLUTION = "1"
+
+
+def _peak_rss_mb() -> float:
+    """
+    This process's own peak RSS (VmHWM). ru_maxrss is not used: Linux carries
+    it over from the parent across fork + exec, so it would include the
+    parent's memory after writing the synthetic bars.
+    """
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024.0
+    raise RuntimeError("VmHWM not available (Linux only)")
+
+
+def _child(mode: str, cache_dir: str, strategy_id: str, n_symbols: int, start: str, end: str) -> None:
+    """ Runs one backtest and prints {"peak_rss_mb", "seconds", "final_value", "curve_points"} as JSON. """
+    from hedgeone_agent import backtest_engine
+    from hedgeone_agent.data_cache import OHLCVCache
+    from hedgeone_agent.strategies import STRATEGY_REGISTRY
+    from hedgeone_agent.streaming import StreamingFeed
+
+    data_cache = OHLCVCache(cache_dir)
+    symbols = [f"{SYMBOL}{i}" for i in range(n_symbols)]
+    began = time.perf_counter()
+    if mode == "memory":
+        frames = [data_cache.read(symbol, RESOLUTION, start, end) for symbol in symbols]
+        metrics = backtest_engine._run_backtrader(STRATEGY_REGISTRY[strategy_id], frames, {})
+    else:
+        # Same code path as run_streaming_backtest, minus the network prefetch
+        feeds = [
+            StreamingFeed(chunks=(lambda s=symbol: data_cache.iter_chunks(s, RESOLUTION, start, end)), name=symbol)
+            for symbol in symbols
+        ]
+        metrics = backtest_engine._run_cerebro(
+            STRATEGY_REGISTRY[strategy_id], feeds, {}, bounded_memory=(mode == "streaming"),
+            preload=False, runonce=False, exactbars=1
+        )
+    seconds = time.perf_counter() - began
+    print(json.dumps({"peak_rss_mb": _peak_rss_mb(), "seconds": seconds, "final_value": metrics["final_value"],
+                      "curve_points": len(metrics["equity_curve"])}))
+
+
+def _prepare(cache_dir: str, n_bars: int, n_symbols: int):
+    """ Writes `n_bars` synthetic minute bars per symbol into the scratch cache; returns (start, end) dates. """
+    from hedgeone_agent.data_cache import OHLCVCache
+    from hedgeone_agent.synthetic_data import generate_ohlcv
+
+    cache = OHLCVCache(cache_dir)
+    for i in range(n_symbols):
+        df = generate_ohlcv(n_bars, seed=i, freq="min")
+        cache.write_rows(f"{SYMBOL}{i}", RESOLUTION, df)
+    return str(df.index[0].date() - timedelta(days=1)), str(df.index[-1].date() + timedelta(days=1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak RSS of streaming vs in-memory backtests by bar count.")
+    parser.add_argument("--bars", default="50000,100000,200000,400000", help="Comma-separated bar counts per symbol")
+    parser.add_argument("--symbols", type=int, default=1, help="Number of feeds")
+    parser.add_argument("--strategy", default="SmaCrossStrategy")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"Comma-separated modes to run ({', '.join(MODES)})")
+    parser.add_argument("--json", default=None, help="Write results to this JSON file")
+    parser.add_argument("--child", nargs=5, metavar=("MODE", "CACHE_DIR", "N_SYMBOLS", "START", "END"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, cache_dir, n_symbols, start, end = args.child
+        _child(mode, cache_dir, args.strategy, int(n_symbols), start, end)
+        return
+
+    modes = args.modes.split(",")
+    rows = []
+    print(f"{'bars':>10} {'mode':>12} {'peak RSS MB':>12} {'seconds':>9} {'curve pts':>10}")
+    for n_bars in [int(b) for b in args.bars.split(",")]:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            start, end = _prepare(cache_dir, n_bars, args.symbols)
+            for mode in modes:
+                out = subprocess.run(
+                    [sys.executable, __file__, "--strategy", args.strategy,
+                     "--child", mode, cache_dir, str(args.symbols), start, end],
+                    check=True, capture_output=True, text=True,
+                )
+                stats = json.loads(out.stdout.strip().splitlines()[-1])
+                rows.append({"bars": n_bars, "symbols": args.symbols, "mode": mode, **stats})
+                print(f"{n_bars:>10} {mode:>12} {stats['peak_rss_mb']:>12.1f} {stats['seconds']:>9.2f} {stats['curve_points']:>10,}")
+
+    # Before / after of bounded_memory at each bar count
+    by_key = {(row["bars"], row["mode"]): row["peak_rss_mb"] for row in rows}
+    if "stream-bars" in modes and "streaming" in modes:
+        print(f"\n{'bars':>10} {'before MB':>11} {'after MB':>9} {'saved MB':>9}")
+        for n_bars in dict.fromkeys(row["bars"] for row in rows):
+            before, after = by_key[(n_bars, "stream-bars")], by_key[(n_bars, "streaming")]
+            print(f"{n_bars:>10} {before:>11.1f} {after:>9.1f} {before - after:>9.1f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
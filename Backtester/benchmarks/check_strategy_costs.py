@@ -0,0 +1,104 @@
+import sys
+import os
+import json
+import time
+import argparse
+
+# Add the package to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from hedgeone_agent.backtest_engine import run_profiled_backtest
+from hedgeone_agent.strategies import STRATEGY_REGISTRY
+from hedgeone_agent.synthetic_data import generate_ohlcv
+
+# --- PER-STRATEGY HOT-PATH COST CHECK ---
+# Profiles every strategy in STRATEGY_REGISTRY on synthetic data and fails
+# (exit code 1) when a strategy errors, creates indicators after __init__,
+# or its next() cost per bar regresses past the committed baseline. Baseline
+# timings are scaled by a pure-Python calibration loop so the check can run
+# on machines faster or slower than the one that recorded them.
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "strategy_costs_baseline.json")
+
+# Feeds per strategy (signal feeds first, trade feed last); default is one
+FEEDS_PER_STRATEGY = {"MultiInstrumentSignal": 4}
+
+
+def calibrate() -> float:
+    """ Seconds for a fixed pure-Python workload (best of 5). """
+    best = float("inf")
+    for _ in range(5):
+        began = time.perf_counter()
+        total = 0
+        for i in range(200_000):
+            total += i * i
+        best = min(best, time.perf_counter() - began)
+    return best
+
+
+def measure(strategy_id: str, n_bars: int, repeats: int) -> dict:
+    """ Best-of-`repeats` profile of one strategy. """
+    feeds = [generate_ohlcv(n_bars, seed=i) for i in range(FEEDS_PER_STRATEGY.get(strategy_id, 1))]
+    best = None
+    for _ in range(repeats):
+        _, report = run_profiled_backtest(strategy_id, feeds, {})
+        if report.get("error") or report.get("created_after_init"):
+            return report
+        if best is None or report["next_us_per_bar"] < best["next_us_per_bar"]:
+            best = report
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when a strategy's per-bar cost regresses.")
+    parser.add_argument("strategies", nargs="*", help="Strategy ids (default: all registered)")
+    parser.add_argument("--bars", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed relative slowdown (0.5 = 50%%)")
+    parser.add_argument("--slack-us", type=float, default=5.0, help="Absolute per-bar slack in microseconds")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="Record the measured costs as the new baseline")
+    args = parser.parse_args()
+
+    strategy_ids = args.strategies or list(STRATEGY_REGISTRY)
+    calibration = calibrate()
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    scale = calibration / baseline["calibration_seconds"] if baseline.get("calibration_seconds") else 1.0
+
+    failures, measured = [], {}
+    print(f"{'strategy':<26} {'init ms':>8} {'us/bar':>8} {'limit':>8}  status")
+    for strategy_id in strategy_ids:
+        report = measure(strategy_id, args.bars, args.repeats)
+        status, limit = "ok", None
+        if report.get("error"):
+            status = f"FAIL error: {report['error']}"
+        elif report.get("created_after_init"):
+            status = f"FAIL {report['created_after_init']} indicator(s) created after __init__ (bar {report['first_creation_bar']})"
+        else:
+            measured[strategy_id] = {"init_ms": report["init_ms"], "next_us_per_bar": report["next_us_per_bar"]}
+            reference = baseline.get("strategies", {}).get(strategy_id)
+            if reference is None:
+                status = "no baseline"
+            else:
+                limit = reference["next_us_per_bar"] * scale * (1.0 + args.tolerance) + args.slack_us
+                if report["next_us_per_bar"] > limit:
+                    status = "FAIL per-bar cost regressed"
+        if status.startswith("FAIL"):
+            failures.append(strategy_id)
+        print(f"{strategy_id:<26} {report.get('init_ms', 0.0):>8.2f} {report.get('next_us_per_bar', 0.0):>8.1f} "
+              f"{limit if limit is not None else float('nan'):>8.1f}  {status}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"calibration_seconds": calibration, "bars": args.bars, "strategies": measured}, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+
+    print(f"Strategy cost check: {'OK' if not failures else f'{len(failures)} failure(s)'}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,8 @@ from langchain_core.messages import HumanMessage, AIMessage
 from .config import GROQ_API_KEY, FYERS_CLIENT_ID, FYERS_TOKEN
 from .agent_core import create_agent_runnable
 from .rag_setup import get_strategy_retriever, get_symbol_retriever # To initialize them
+from .job_queue import get_job_queue, format_job, format_progress
+from .retrieval_cache import format_cache_stats
 
 # --- 10. MAIN CHAT LOOP ---
 def main():
@@ -32,7 +34,11 @@ def main():
     agent_runnable = create_agent_runnable()
     chat_history = []
 
-    print("Chatbot is ready! Type 'exit' to quit.")
+    # Start the backtest workers now so the first backtest does not pay for their imports
+    job_queue = get_job_queue()
+    job_queue.add_listener(lambda job: print(f"\n[Background] {format_job(job).splitlines()[0]}"))
+
+    print("Chatbot is ready! Type 'jobs' to see background backtests, 'cache' for search cache hit rates, 'exit' to quit.")
     
     while True:
         try:
@@ -40,7 +46,18 @@ def main():
             print(f"\n\nYou: {query}")
             if query.lower() in ['exit', 'quit']:
                 print("Goodbye!")
+                job_queue.shutdown()
                 break
+            if query.lower() == 'jobs':
+                jobs = job_queue.jobs()
+                for job in jobs:
+                    print(f"  {job['job_id']}  {job['strategy_id']:<24} {format_progress(job)}")
+                if not jobs:
+                    print("  No background backtests yet.")
+                continue
+            if query.lower() == 'cache':
+                print(format_cache_stats())
+                continue
             
             # Build chat_history Messages for prompt
             agent_history = []
@@ -6,7 +6,7 @@ from langchain_core.messages import HumanMessage, AIMessage
 
 # Import from our package
 from .config import GROQ_API_KEY
-from .agent_tools import strategy_search, symbol_search, run_strategy_backtest
+from .agent_tools import strategy_search, symbol_search, run_strategy_backtest, optimize_strategy_parameters, backtest_universe, monte_carlo_robustness, backtest_job_status, cancel_backtest_job
 
 
 # --- Helper to robustly call runnables / agents across versions ---
@@ -44,7 +44,7 @@ def create_agent_runnable():
     )
 
     # Tools are imported from agent_tools.py
-    tools = [strategy_search, symbol_search, run_strategy_backtest]
+    tools = [strategy_search, symbol_search, run_strategy_backtest, optimize_strategy_parameters, backtest_universe, monte_carlo_robustness, backtest_job_status, cancel_backtest_job]
 
     # ✅ Use `system_prompt` instead of custom ChatPromptTemplate
     system_prompt = (
@@ -60,7 +60,14 @@ def create_agent_runnable():
         "   e. Politely ask for ALL other missing information: the exact symbol (if not confirmed), start date, end date, and any strategy parameter values (like n1, n2).\n"
         "   f. For `MultiInstrumentSignal`, ask for the list of signal symbols AND the single trade symbol.\n"
         "3. **Only when you have 100% of the information** (the exact `strategy_id`, all exact `symbols`, `start_date`, `end_date`, and `params_dict`) call the `run_strategy_backtest` tool ONCE.\n"
-        "4. Present the results clearly."
+        "4. Present the results clearly. If `run_strategy_backtest` says the backtest is still running as a job, tell the user its job id and progress; "
+        "when they ask about it, call `backtest_job_status` (and `cancel_backtest_job` if they want to stop it).\n"
+        "5. If the user asks for the *best* parameters (e.g., 'best n1/n2 for SmaCross on Reliance'), collect the strategy_id, symbols and dates the same way, "
+        "then call `optimize_strategy_parameters` with any ranges the user gave (omit the rest to use defaults) and present the ranked table.\n"
+        "6. If the user wants to screen many stocks at once (e.g., 'run RSI on all F&O stocks'), collect the strategy_id, dates and params_dict, "
+        "then call `backtest_universe` (universe 'fno' or 'symbols', optional name_filter / limit) instead of backtesting symbols one by one.\n"
+        "7. If the user asks how robust a result is (or whether it was luck), call `monte_carlo_robustness` with the same inputs as the backtest "
+        "and explain the confidence intervals in plain words."
     )
 
 
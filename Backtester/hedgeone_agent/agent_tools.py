@@ -3,14 +3,17 @@ from typing import List, Dict, Any
 from langchain.tools import tool
 
 # Import our package's functions and retrievers
-from .rag_setup import get_strategy_retriever, get_symbol_retriever
-from .data_provider import get_historical_data
+from .rag_setup import retrieve
+from .symbol_index import get_symbol_index
+from .data_provider import load_data_feeds
 from .backtest_engine import run_backtest_internal
+from .job_queue import get_job_queue, format_job, format_progress, FINISHED_STATES
+from .optimizer import run_parameter_sweep
+from .batch import default_output_path, load_universe, run_universe_backtest
+from .config import SYMBOL_CSV_PATH, FNO_SYMBOL_CSV_PATH, JOB_INLINE_WAIT_SECONDS
 
 # --- 8. LANGCHAIN AGENT TOOLS (@tool) ---
-# Initialize retrievers globally
-strategy_retriever = get_strategy_retriever()
-symbol_retriever = get_symbol_retriever()
+# Retrievers (and the embedding model) load on first use, not at import
 
 
 @tool
@@ -21,15 +24,8 @@ def strategy_search(query: str) -> dict:
     """
     print(f"--- RAG: Searching for query: '{query}' ---")
     try:
-        # Use modern retriever invocation if available, fallback to get_relevant_documents
-        results = None
-        try:
-            results = strategy_retriever.invoke(query)
-        except Exception:
-            try:
-                results = strategy_retriever.get_relevant_documents(query)
-            except Exception:
-                results = strategy_retriever.similarity_search(query, k=1)
+        # Repeated queries are answered from the strategy store's results cache
+        results = retrieve("strategy", query)
         if not results:
             return {"error": "No matching strategy found."}
         
@@ -51,8 +47,14 @@ def symbol_search(company_name_query: str) -> List[Dict[str, str]]:
     """
     print(f"--- Symbol RAG: Searching for query: '{company_name_query}' ---")
     try:
-        # Use modern retriever invocation
-        results = symbol_retriever.invoke(company_name_query)
+        # Exact ticker / name-prefix / fuzzy lookups first; the embedding search only when they all miss
+        hits = get_symbol_index().search(company_name_query, k=3)
+        if hits:
+            matches = [{"company_name": hit["company_name"], "symbol": hit["symbol"]} for hit in hits]
+            print(f"--- Symbol index: Found {hits[0]['match']} matches: {matches} ---")
+            return matches
+
+        results = retrieve("symbol", company_name_query)
         
         matches = []
         if not results:
@@ -78,24 +80,153 @@ def run_strategy_backtest(
     symbols: List[str], 
     start_date: str, 
     end_date: str, 
-    params_dict: Dict[str, Any]
+    params_dict: Dict[str, Any],
+    resolution: str = "D"
 ) -> str:
     """
     Runs the final backtest. This tool should only be called when all 
     information (strategy_id, symbols, dates, and parameters) is collected.
+    `resolution` is the candle size: "D" for daily (default) or minutes
+    such as "1", "5", "15", "60" for intraday. A backtest that takes longer
+    than a few seconds keeps running in the background and a job id is
+    returned instead of the results.
     """
     print(f"--- Tool: run_strategy_backtest called for {strategy_id} ---")
-    
-    data_feeds = []
-    for symbol in symbols:
-        df = get_historical_data(symbol, start_date, end_date)
-        if df.empty:
-            return f"Error: Could not fetch data for symbol {symbol}."
-        data_feeds.append(df)
-        
-    result_str = run_backtest_internal(
+
+    # Runs in a background worker; long backtests hand back a job id instead of blocking the chat
+    job_queue = get_job_queue()
+    job_id = job_queue.submit(strategy_id, symbols, start_date, end_date, params_dict, resolution)
+    job = job_queue.wait(job_id, timeout=JOB_INLINE_WAIT_SECONDS)
+    if job["status"] == "done":
+        return job["result"]
+    if job["status"] in FINISHED_STATES:
+        return job["error"] if str(job["error"]).startswith("Error") else f"Error: {job['error']}"
+    return (
+        f"The backtest is still running as job {job_id} ({format_progress(job)}). "
+        f"Check it with backtest_job_status or stop it with cancel_backtest_job."
+    )
+
+@tool
+def backtest_job_status(job_id: str) -> str:
+    """
+    Reports a background backtest job's status and progress (bars processed
+    out of total), or its full results once it has finished.
+    """
+    print(f"--- Tool: backtest_job_status called for {job_id} ---")
+    job = get_job_queue().status(job_id)
+    if job is None:
+        return f"Error: No backtest job with id '{job_id}'."
+    return format_job(job)
+
+@tool
+def cancel_backtest_job(job_id: str) -> str:
+    """ Cancels a queued or running background backtest job. """
+    print(f"--- Tool: cancel_backtest_job called for {job_id} ---")
+    job_queue = get_job_queue()
+    if job_queue.cancel(job_id):
+        return f"Job {job_id} cancelled."
+    job = job_queue.status(job_id)
+    if job is None:
+        return f"Error: No backtest job with id '{job_id}'."
+    return f"Job {job_id} already finished ({job['status']})."
+
+@tool
+def monte_carlo_robustness(
+    strategy_id: str,
+    symbols: List[str],
+    start_date: str,
+    end_date: str,
+    params_dict: Dict[str, Any],
+    n_resamples: int = 10000,
+    resolution: str = "D"
+) -> str:
+    """
+    Runs the backtest, then stress-tests it with n_resamples Monte Carlo
+    resamples (trade order shuffled, block-bootstrapped returns, random
+    trades skipped) and returns the summary plus 95% confidence intervals
+    for final value, max drawdown and Sharpe.
+    """
+    print(f"--- Tool: monte_carlo_robustness called for {strategy_id} ---")
+    if n_resamples < 1:
+        return "Error: n_resamples must be at least 1."
+
+    data_feeds, failures = load_data_feeds(symbols, start_date, end_date, resolution)
+    if failures:
+        details = "; ".join(f"{symbol} ({reason})" for symbol, reason in failures.items())
+        return f"Error: Could not fetch data for {len(failures)} symbol(s): {details}."
+
+    return run_backtest_internal(
         strategy_id=strategy_id,
         data_feeds=data_feeds,
-        params_dict=params_dict
+        params_dict=params_dict,
+        symbols=symbols,
+        monte_carlo=n_resamples
+    )
+
+@tool
+def optimize_strategy_parameters(
+    strategy_id: str,
+    symbols: List[str],
+    start_date: str,
+    end_date: str,
+    param_ranges: Dict[str, Any],
+    rank_by: str = "sharpe",
+    top_n: int = 10
+) -> str:
+    """
+    Runs a parameter sweep (grid search) for one strategy and returns the
+    top_n parameter sets ranked by rank_by (sharpe, total_return_pct,
+    final_value, win_rate or max_drawdown_pct). param_ranges maps parameter
+    names to {"min": .., "max": .., "step": ..} or a list of values; any
+    parameter left out uses its default sweep range.
+    """
+    print(f"--- Tool: optimize_strategy_parameters called for {strategy_id} ---")
+
+    data_feeds, failures = load_data_feeds(symbols, start_date, end_date)
+    if failures:
+        details = "; ".join(f"{symbol} ({reason})" for symbol, reason in failures.items())
+        return f"Error: Could not fetch data for {len(failures)} symbol(s): {details}."
+
+    try:
+        table = run_parameter_sweep(strategy_id, data_feeds, param_ranges, rank_by=rank_by, top_n=top_n)
+    except ValueError as e:
+        return f"Error: {e}"
+    return f"Top {len(table)} parameter sets for '{strategy_id}' ranked by {rank_by}:\n{table.to_string(index=False)}"
+
+@tool
+def backtest_universe(
+    strategy_id: str,
+    start_date: str,
+    end_date: str,
+    params_dict: Dict[str, Any],
+    universe: str = "fno",
+    name_filter: str = "",
+    limit: int = 0
+) -> str:
+    """
+    Screens a whole universe: runs one strategy with one parameter set on
+    every symbol of the F&O list (universe="fno") or the full symbol list
+    (universe="symbols"), optionally filtered by a company-name/symbol regex
+    (name_filter) and capped at `limit` symbols. Returns the 10 best symbols
+    by total return and the path of the full per-symbol CSV.
+    """
+    print(f"--- Tool: backtest_universe called for {strategy_id} on '{universe}' ---")
+    csv_path = {"fno": FNO_SYMBOL_CSV_PATH, "symbols": SYMBOL_CSV_PATH}.get(universe)
+    if csv_path is None:
+        return "Error: universe must be 'fno' or 'symbols'."
+    try:
+        symbols = load_universe(csv_path, name_filter or None, limit or None)
+    except Exception as e:
+        return f"Error: Could not load universe '{universe}': {e}"
+    if not symbols:
+        return "Error: No symbols matched the filter."
+
+    output_path = default_output_path(strategy_id)
+    table = run_universe_backtest(strategy_id, params_dict, symbols, start_date, end_date, output_path=output_path)
+    ok = table[table["status"] == "ok"] if "status" in table.columns else table
+    columns = [c for c in ["symbol", "total_return_pct", "sharpe", "max_drawdown_pct", "total_trades", "win_rate"] if c in ok.columns]
+    return (
+        f"Universe backtest of '{strategy_id}' finished: {len(ok)}/{len(symbols)} symbols succeeded.\n"
+        f"Top 10 by total return:\n{ok[columns].head(10).to_string(index=False)}\n"
+        f"Full per-symbol results: {output_path}"
     )
-    return result_str
\ No newline at end of file
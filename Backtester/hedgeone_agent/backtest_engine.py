@@ -1,64 +1,397 @@
 import backtrader as bt
 import pandas as pd
-from typing import List, Dict, Any
+from array import array
+from typing import List, Dict, Any, Optional, Tuple, Callable
 
 # Import from our package
 from .strategies import STRATEGY_REGISTRY
+from .config import BACKTEST_ENGINE, BACKTEST_STREAMING, BACKTEST_PROFILE, RESULT_CACHE_ENABLED, RESULTS_STORE_ENABLED, FEED_CALENDAR
+from .data_provider import data_cache, ensure_cached, load_data_feeds
+from .data_cache import ROW_GROUP_ROWS
+from .streaming import StreamingFeed
+from .profiler import profiled, format_profile
+from .panel import align_frames
+from .monte_carlo import run_monte_carlo, format_monte_carlo
+from .metrics import compute_metrics, years_spanned
+from . import vector_engine
+from .result_cache import result_cache, strategy_source_hash, cache_key
+from .results import BacktestResult, TRADE_COLUMNS
+from .results_store import results_store
 
-def run_backtest_internal(strategy_id: str, data_feeds: List[pd.DataFrame], params_dict: Dict[str, Any]) -> str:
-    """ Internal Backtrader runner. """
-    
-    StrategyClass = STRATEGY_REGISTRY.get(strategy_id)
-    if not StrategyClass: return f"Error: Strategy '{strategy_id}' not found."
-    if not data_feeds or all(df.empty for df in data_feeds): return "Error: No data provided."
+# Broker settings shared by both engines
+START_CASH = 100000.0
+STAKE = 10
+COMMISSION = 0.001
+
+# Strategies that need full line history (indexing beyond their indicators'
+# minimum periods) and so cannot run with exactbars=1 in streaming mode
+STREAMING_UNBOUNDED = set()
+
+class EquityCurve(bt.Analyzer):
+    """
+    Records the broker value on every bar (including the warm-up bars), 16
+    bytes per bar. With `daily`, only the first bar and each day's last bar
+    are kept, so memory grows with days rather than bars; the metrics that
+    need every bar (sortino, drawdown, exposure) are then accumulated as the
+    bars pass and returned by bar_metrics().
+    """
+    params = (('daily', False),)
+    def start(self):
+        self.dates, self.values = array('d'), array('d')
+        self._bars, self._held, self._last = 0, 0, None
+        self._sum_returns = self._sum_downside = 0.0
+        self._peak, self._drawdown, self._underwater, self._longest = float('-inf'), 0.0, 0, 0
+    def next(self):
+        dt, value = self.strategy.datetime[0], self.strategy.broker.getvalue()
+        if not self.p.daily:
+            self.dates.append(dt)
+            self.values.append(value)
+            return
+        # Same day as the previous point (and not the run's first bar): replace it
+        if len(self.dates) > 1 and int(self.dates[-1]) == int(dt):
+            self.dates[-1], self.values[-1] = dt, value
+        else:
+            self.dates.append(dt)
+            self.values.append(value)
+        self._bars += 1
+        if self._last is not None:
+            ret = value / self._last - 1.0
+            self._sum_returns += ret
+            self._sum_downside += min(ret, 0.0) ** 2
+        self._last = value
+        if value >= self._peak:
+            self._peak, self._underwater = value, 0
+        else:
+            self._underwater += 1
+            self._longest = max(self._longest, self._underwater)
+            self._drawdown = max(self._drawdown, 100.0 * (self._peak - value) / self._peak)
+        if any(self.strategy.getposition(d).size for d in self.strategy.datas):
+            self._held += 1
+    def get_analysis(self):
+        index = pd.DatetimeIndex([bt.num2date(d) for d in self.dates], name="datetime")
+        return pd.Series(self.values, index=index, dtype=float)
+    def bar_metrics(self) -> Dict[str, Any]:
+        """ The per-bar metrics of a `daily` curve, as compute_metrics would report them from every bar. """
+        years = years_spanned(pd.DatetimeIndex([bt.num2date(self.dates[0]), bt.num2date(self.dates[-1])])) if self._bars else 0.0
+        periods_per_year = (self._bars - 1) / years if years > 0 else 0.0
+        downside = (self._sum_downside / (self._bars - 1)) ** 0.5 if self._bars > 1 else 0.0
+        sortino = None
+        if self._bars > 1 and periods_per_year > 0 and downside > 0.0:
+            sortino = self._sum_returns / (self._bars - 1) / downside * periods_per_year ** 0.5
+        return {
+            "sortino": sortino,
+            "max_drawdown_pct": self._drawdown,
+            "max_drawdown_bars": self._longest,
+            "exposure_pct": self._held / self._bars * 100 if self._bars else 0.0,
+        }
+
+TRIM_EVERY_BARS = 1000
+
+class HistoryTrim(bt.Analyzer):
+    """
+    Keeps backtrader's own order and trade history bounded: every
+    TRIM_EVERY_BARS bars the broker and strategy forget orders that are no
+    longer alive and trades that have closed (TradeLedger has recorded them
+    already), which they would otherwise hold for the whole run.
+    """
+    def next(self):
+        if len(self.strategy) % TRIM_EVERY_BARS:
+            return
+        broker, strategy = self.strategy.broker, self.strategy
+        broker.orders = [order for order in broker.orders if order.alive()]
+        # A parent's queue empties once it has executed and its children (if any) have gone
+        for ref in [ref for ref, queue in broker._pchildren.items() if not queue]:
+            del broker._pchildren[ref]
+        # The strategy's notification history (status snapshots, never read back)
+        del strategy._orders[:]
+        for by_id in strategy._trades.values():
+            for trades in by_id.values():
+                # Only the last trade per data/tradeid is ever updated again
+                del trades[:-1]
+
+# Per-process progress callback hook(bars_done, total_bars or None); set by job queue workers
+_PROGRESS_HOOK: Optional[Callable[[int, Optional[int]], None]] = None
+PROGRESS_EVERY_BARS = 1000
+
+def set_progress_hook(hook: Optional[Callable[[int, Optional[int]], None]]) -> None:
+    """ Reports the progress of every later Cerebro run in this process to `hook` (None to stop). """
+    global _PROGRESS_HOOK
+    _PROGRESS_HOOK = hook
+
+class Progress(bt.Analyzer):
+    """ Calls the progress hook every PROGRESS_EVERY_BARS bars; the total is unknown for streaming feeds. """
+    def start(self):
+        self.bars = 0
+        lengths = [d.buflen() for d in self.strategy.datas]
+        self.total = max(lengths) if lengths and min(lengths) > 0 else None
+        _PROGRESS_HOOK(0, self.total)
+    def next(self):
+        self.bars += 1
+        if self.bars % PROGRESS_EVERY_BARS == 0:
+            _PROGRESS_HOOK(self.bars, self.total)
+    def stop(self):
+        _PROGRESS_HOOK(self.bars, self.total or self.bars)
+
+class TradeLedger(bt.Analyzer):
+    """ Records every closed trade as a TRADE_COLUMNS row; `positions` maps Cerebro feeds back to data_feeds. """
+    params = (('positions', None),)
+    def start(self):
+        self.rows, self._open = [], {}
+    def notify_trade(self, trade):
+        if trade.justopened:
+            self._open[trade.ref] = (trade.size, bt.num2date(trade.dtopen))
+        if trade.isclosed:
+            size, _ = self._open.pop(trade.ref, (0, None))
+            self.rows.append({
+                "feed": self._position(self.strategy.datas.index(trade.data)),
+                "entry_time": bt.num2date(trade.dtopen),
+                "exit_time": bt.num2date(trade.dtclose),
+                "size": size,
+                "entry_price": trade.price,
+                "exit_price": trade.price + trade.pnl / size if size else float("nan"),
+                "pnl": trade.pnl,
+                "pnl_comm": trade.pnlcomm,
+                "bars": trade.barlen,
+            })
+    def _position(self, index):
+        return self.p.positions[index] if self.p.positions is not None else index
+    def get_analysis(self):
+        return pd.DataFrame(self.rows, columns=TRADE_COLUMNS)
+    def open_entries(self):
+        """ Entry times of the trades still open when the run ended. """
+        return [opened for _, opened in self._open.values()]
 
-    cerebro = bt.Cerebro()
-    for df in data_feeds:
-        if not df.empty:
-            cerebro.adddata(bt.feeds.PandasData(dataname=df))
+def _feed_alignment(n_feeds: int) -> Optional[str]:
+    """ The calendar `n_feeds` Cerebro feeds are aligned on, or None when they are left unaligned. """
+    if n_feeds < 2 or FEED_CALENDAR == "none":
+        return None
+    return FEED_CALENDAR
+
+def _run_backtrader(StrategyClass, data_feeds: List[pd.DataFrame], params_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Runs Cerebro on in-memory frames and returns the metrics dict. A strategy
+    may define prepare_feeds(frames, params) to precompute cross-feed inputs
+    and keep some frames out of Cerebro entirely. The remaining feeds are
+    aligned on one calendar (config.FEED_CALENDAR) beforehand.
+    """
+    frames = [df for df in data_feeds if not df.empty]
+    positions = list(range(len(frames)))
+    prepare = getattr(StrategyClass, 'prepare_feeds', None)
+    if prepare is not None:
+        positions, params_dict = prepare(frames, params_dict)
+    cerebro_frames = [frames[i] for i in positions]
+    if _feed_alignment(len(cerebro_frames)):
+        cerebro_frames = align_frames(cerebro_frames, calendar=FEED_CALENDAR)
+    bt_feeds = [bt.feeds.PandasData(dataname=df) for df in cerebro_frames]
+    return _run_cerebro(StrategyClass, bt_feeds, params_dict, feed_positions=positions)
+
+def _run_cerebro(StrategyClass, bt_feeds: List[bt.feed.DataBase], params_dict: Dict[str, Any], feed_positions: Optional[List[int]] = None, bounded_memory: bool = False, **cerebro_kwargs) -> Dict[str, Any]:
+    """
+    Runs Cerebro on ready-made backtrader feeds and returns the metrics dict.
+    With `bounded_memory` nothing is kept per bar: the equity curve keeps one
+    point per day (the metrics still cover every bar, see EquityCurve) and
+    finished orders and trades are trimmed as the run goes (HistoryTrim).
+    """
+    cerebro = bt.Cerebro(**cerebro_kwargs)
+    for feed in bt_feeds:
+        cerebro.adddata(feed)
 
     cerebro.addstrategy(StrategyClass, **(params_dict or {}))
-    
-    start_cash = 100000.0
-    cerebro.broker.setcash(start_cash)
-    cerebro.addsizer(bt.sizers.FixedSize, stake=10)
-    cerebro.broker.setcommission(commission=0.001)
 
-    cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trade')
-    cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe')
-    cerebro.addanalyzer(bt.analyzers.DrawDown, _name='drawdown')
+    cerebro.broker.setcash(START_CASH)
+    cerebro.addsizer(bt.sizers.FixedSize, stake=STAKE)
+    cerebro.broker.setcommission(commission=COMMISSION)
+
+    cerebro.addanalyzer(EquityCurve, _name='equity', daily=bounded_memory)
+    cerebro.addanalyzer(TradeLedger, _name='ledger', positions=feed_positions)
+    if _PROGRESS_HOOK is not None:
+        cerebro.addanalyzer(Progress, _name='progress')
+    if bounded_memory:
+        cerebro.addanalyzer(HistoryTrim, _name='trim')
 
-    print(f"--- Running Backtest: {strategy_id} ---")
     results = cerebro.run()
     strategy_instance = results[0]
-    
-    final_value = cerebro.broker.getvalue()
-    trade_analysis = strategy_instance.analyzers.trade.get_analysis() or {}
-    sharpe_analysis = strategy_instance.analyzers.sharpe.get_analysis() or {}
-    drawdown_analysis = strategy_instance.analyzers.drawdown.get_analysis() or {}
-
-    total_trades = trade_analysis.get('total', {}).get('total', 0) if isinstance(trade_analysis, dict) else 0
-    win_rate = (trade_analysis.get('won', {}).get('total', 0) / total_trades) * 100 if total_trades > 0 else 0
-    
-    sharpe_val = sharpe_analysis.get('sharperatio', 'N/A')
-    # drawdown_analysis format can vary; handle safely
-    drawdown_pct = 'N/A'
+
+    ledger = strategy_instance.analyzers.ledger
+    equity = strategy_instance.analyzers.equity
+    equity_curve = equity.get_analysis()
+    trades = ledger.get_analysis()
+    metrics = compute_metrics(equity_curve, trades, START_CASH, ledger.open_entries())
+    if bounded_memory:
+        metrics.update(equity.bar_metrics())
+    return {**metrics, "equity_curve": equity_curve, "trades": trades}
+
+def run_backtest_metrics(strategy_id: str, data_feeds: List[pd.DataFrame], params_dict: Dict[str, Any], engine: Optional[str] = None, use_cache: bool = False) -> Dict[str, Any]:
+    """
+    Runs one backtest and returns the metrics dict. `engine` is "backtrader"
+    or "vectorized" (defaults to config.BACKTEST_ENGINE); strategies or feed
+    sets the vectorized engine does not cover fall back to backtrader.
+    With `use_cache`, identical inputs are answered from the result cache.
+    """
+    StrategyClass = STRATEGY_REGISTRY.get(strategy_id)
+    if not StrategyClass: raise ValueError(f"Strategy '{strategy_id}' not found.")
+    feeds = [df for df in data_feeds or [] if not df.empty]
+    if not feeds: raise ValueError("No data provided.")
+
+    engine = engine or BACKTEST_ENGINE
+    if engine == "vectorized":
+        if not (vector_engine.supports(strategy_id) and len(feeds) == 1):
+            print(f"--- Vectorized engine does not cover '{strategy_id}' with {len(feeds)} feed(s); using backtrader ---")
+            engine = "backtrader"
+    elif engine != "backtrader":
+        raise ValueError(f"Unknown backtest engine '{engine}'.")
+
+    key = None
+    if use_cache and result_cache.enabled:
+        source_hash = strategy_source_hash(StrategyClass)
+        result_cache.prune_stale(strategy_id, source_hash)
+        params = vector_engine.strategy_params(strategy_id, params_dict)
+        alignment = _feed_alignment(len(feeds)) if engine == "backtrader" else None
+        key = cache_key(strategy_id, source_hash, feeds, params, START_CASH, STAKE, COMMISSION, engine, alignment)
+        cached = result_cache.get(key)
+        if cached is not None:
+            print(f"--- Result cache hit for {strategy_id} ---")
+            return dict(cached)
+
+    if engine == "vectorized":
+        metrics = vector_engine.run_vectorized_backtest(strategy_id, feeds[0], params_dict, START_CASH, STAKE, COMMISSION)
+        if _PROGRESS_HOOK is not None:
+            _PROGRESS_HOOK(len(feeds[0]), len(feeds[0]))
+    else:
+        metrics = _run_backtrader(StrategyClass, feeds, params_dict)
+    metrics["engine"] = engine
+    if key is not None:
+        result_cache.put(key, strategy_id, source_hash, metrics)
+    return metrics
+
+def run_backtest_result(strategy_id: str, data_feeds: List[pd.DataFrame], params_dict: Dict[str, Any], engine: Optional[str] = None, symbols: Optional[List[str]] = None, use_cache: bool = False) -> BacktestResult:
+    """ Runs one backtest and returns the structured BacktestResult; `symbols` label the feeds in order. """
+    symbols = list(symbols or [f"feed{i}" for i in range(len(data_feeds or []))])
+    # Empty feeds are skipped by the engines, so drop their labels too
+    symbols = [symbol for symbol, df in zip(symbols, data_feeds or []) if not df.empty]
+    metrics = run_backtest_metrics(strategy_id, data_feeds, params_dict, engine, use_cache)
+    params = vector_engine.strategy_params(strategy_id, params_dict)
+    return BacktestResult.from_metrics(strategy_id, symbols, params, metrics)
+
+def run_profiled_backtest(strategy_id: str, data_feeds: List[pd.DataFrame], params_dict: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Backtrader run with hot-path timing of the strategy's __init__ and next().
+    Returns (metrics, profile report); metrics is None if the run raised, in
+    which case the report carries the error.
+    """
+    StrategyClass = STRATEGY_REGISTRY.get(strategy_id)
+    if not StrategyClass: raise ValueError(f"Strategy '{strategy_id}' not found.")
+    feeds = [df for df in data_feeds or [] if not df.empty]
+    if not feeds: raise ValueError("No data provided.")
+
+    Profiled = profiled(StrategyClass)
+    metrics, error = None, None
+    try:
+        metrics = _run_backtrader(Profiled, feeds, params_dict)
+        metrics["engine"] = "backtrader"
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    instance = Profiled.last_instance
+    report = instance.hot_path_report() if instance is not None else {"strategy": StrategyClass.__name__}
+    report["error"] = error
+    return metrics, report
+
+def run_streaming_backtest(strategy_id: str, symbols: List[str], start_date: str, end_date: str, params_dict: Dict[str, Any], resolution: str = "D", chunk_rows: int = ROW_GROUP_ROWS) -> BacktestResult:
+    """
+    Low-memory backtrader run: bars stream from the on-disk OHLCV cache in
+    `chunk_rows` chunks through StreamingFeeds, with preload/runonce off and
+    bounded line buffers (exactbars=1) unless the strategy needs full history.
+    Nothing is kept per bar (a daily equity curve, trimmed order history), so
+    peak memory stays flat as the date range grows. Raises ValueError on bad input.
+    """
+    StrategyClass = STRATEGY_REGISTRY.get(strategy_id)
+    if not StrategyClass: raise ValueError(f"Strategy '{strategy_id}' not found.")
+    if not symbols: raise ValueError("No symbols provided.")
+    failures = ensure_cached(symbols, start_date, end_date, resolution)
+    if failures:
+        details = "; ".join(f"{symbol} ({reason})" for symbol, reason in failures.items())
+        raise ValueError(f"Could not fetch data for {len(failures)} symbol(s): {details}.")
+
+    def source(symbol):
+        return lambda: data_cache.iter_chunks(symbol, resolution, start_date, end_date, chunk_rows)
+    feeds = [StreamingFeed(chunks=source(symbol), name=symbol) for symbol in symbols]
+    exactbars = 0 if strategy_id in STREAMING_UNBOUNDED else 1
+    print(f"--- Streaming backtest: {strategy_id} on {len(symbols)} feed(s), exactbars={exactbars} ---")
+    metrics = _run_cerebro(StrategyClass, feeds, params_dict, bounded_memory=True, preload=False, runonce=False, exactbars=exactbars)
+    metrics["engine"] = "backtrader-streaming"
+    params = vector_engine.strategy_params(strategy_id, params_dict)
+    return BacktestResult.from_metrics(strategy_id, symbols, params, metrics)
+
+def run_backtest_internal(strategy_id: str, data_feeds: List[pd.DataFrame], params_dict: Dict[str, Any], engine: Optional[str] = None, symbols: Optional[List[str]] = None, profile: bool = BACKTEST_PROFILE, monte_carlo: int = 0) -> str:
+    """
+    Internal backtest runner; stores the run in the results warehouse and
+    returns the summary string for the agent. With `profile`, the run goes
+    through backtrader uncached and a hot-path profile is appended. With
+    `monte_carlo` > 0, that many resamples' confidence intervals are appended.
+    """
+
+    if strategy_id not in STRATEGY_REGISTRY: return f"Error: Strategy '{strategy_id}' not found."
+    if not data_feeds or all(df.empty for df in data_feeds): return "Error: No data provided."
+
+    print(f"--- Running Backtest: {strategy_id} ---")
+    report = None
     try:
-        if isinstance(drawdown_analysis, dict):
-            drawdown_pct = drawdown_analysis.get('max', {}).get('drawdown', 'N/A')
+        if profile:
+            metrics, report = run_profiled_backtest(strategy_id, data_feeds, params_dict)
+            if metrics is None:
+                return f"Error: Backtest failed.\n{format_profile(report)}"
+            labels = [s for s, df in zip(symbols or [f"feed{i}" for i in range(len(data_feeds))], data_feeds) if not df.empty]
+            result = BacktestResult.from_metrics(strategy_id, labels, vector_engine.strategy_params(strategy_id, params_dict), metrics)
         else:
-            drawdown_pct = getattr(drawdown_analysis, 'max', {}).get('drawdown', 'N/A')
-    except Exception:
-        drawdown_pct = 'N/A'
-    
-    result_str = (
-        f"Backtest for '{strategy_id}' Complete.\n"
-        f"  Final Portfolio Value: ₹{final_value:,.2f}\n"
-        f"  Total Return: {((final_value - start_cash) / start_cash) * 100:,.2f}%\n"
-        f"  Sharpe Ratio: {sharpe_val}\n"
-        f"  Max. Drawdown: {drawdown_pct}\n"
-        f"  Total Trades: {total_trades}\n"
-        f"  Win Rate: {win_rate:,.2f}%"
-    )
+            result = run_backtest_result(strategy_id, data_feeds, params_dict, engine, symbols, use_cache=RESULT_CACHE_ENABLED)
+    except ValueError as e:
+        return f"Error: {e}"
+
+    if RESULTS_STORE_ENABLED:
+        results_store.save(result)
+    result_str = result.summary()
+    if report is not None:
+        result_str += "\n" + format_profile(report)
+    if monte_carlo > 0:
+        result_str += "\n" + format_monte_carlo(run_monte_carlo(result, n_resamples=monte_carlo))
     print(result_str)
-    return result_str
\ No newline at end of file
+    return result_str
+
+def should_stream(resolution: str) -> bool:
+    """ Whether a run at `resolution` uses the streaming mode (config.BACKTEST_STREAMING). """
+    if BACKTEST_STREAMING == "always":
+        return True
+    return BACKTEST_STREAMING == "intraday" and str(resolution).upper() not in ("D", "1D")
+
+def run_streaming_backtest_internal(strategy_id: str, symbols: List[str], start_date: str, end_date: str, params_dict: Dict[str, Any], resolution: str = "D") -> str:
+    """ Streaming counterpart of run_backtest_internal; returns the summary string for the agent. """
+    print(f"--- Running Streaming Backtest: {strategy_id} ({resolution}) ---")
+    try:
+        result = run_streaming_backtest(strategy_id, symbols, start_date, end_date, params_dict, resolution)
+    except ValueError as e:
+        return f"Error: {e}"
+
+    if RESULTS_STORE_ENABLED:
+        results_store.save(result)
+    result_str = result.summary()
+    print(result_str)
+    return result_str
+
+def run_symbols_backtest_internal(strategy_id: str, symbols: List[str], start_date: str, end_date: str, params_dict: Dict[str, Any], resolution: str = "D") -> str:
+    """ Fetches `symbols` and runs the backtest (streaming or in-memory); returns the summary string for the agent. """
+    # Long / intraday runs stream bars from the on-disk cache instead of holding them in memory
+    if should_stream(resolution):
+        return run_streaming_backtest_internal(strategy_id, symbols, start_date, end_date, params_dict, resolution)
+
+    # Fetch all feeds concurrently; order matches `symbols` (trade symbol last)
+    data_feeds, failures = load_data_feeds(symbols, start_date, end_date, resolution)
+    if failures:
+        details = "; ".join(f"{symbol} ({reason})" for symbol, reason in failures.items())
+        return f"Error: Could not fetch data for {len(failures)} symbol(s): {details}."
+
+    return run_backtest_internal(
+        strategy_id=strategy_id,
+        data_feeds=data_feeds,
+        params_dict=params_dict,
+        symbols=symbols
+    )
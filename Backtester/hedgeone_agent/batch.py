@@ -0,0 +1,153 @@
+import csv
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+# Import from our package
+from .backtest_engine import run_backtest_result
+from .data_provider import get_historical_data
+from .optimizer import SWEEP_METRICS, rank_results
+from .results import BacktestResult
+from .results_store import results_store
+from .config import BATCH_RESULTS_DIR, SYMBOL_FETCH_MAX_WORKERS, RESULTS_STORE_ENABLED
+
+RESULT_FIELDS = ["symbol", "status", "error"] + SWEEP_METRICS
+
+
+def _column(df: pd.DataFrame, name: str) -> Optional[str]:
+    """ Case-insensitive column lookup ('Company Name' vs 'Company name'). """
+    return next((c for c in df.columns if c.strip().lower() == name.lower()), None)
+
+
+def load_universe(csv_path: str, name_filter: Optional[str] = None, limit: Optional[int] = None) -> List[str]:
+    """
+    Reads the Symbol column of a universe CSV (symbols.csv, F&O_symbols.csv).
+    `name_filter` is a case-insensitive regex matched against the company
+    name or the symbol; `limit` keeps the first N matches.
+    """
+    df = pd.read_csv(csv_path)
+    symbol_col, name_col = _column(df, "Symbol"), _column(df, "Company Name")
+    if symbol_col is None:
+        raise ValueError(f"'{csv_path}' has no 'Symbol' column.")
+    df = df.dropna(subset=[symbol_col])
+    if name_filter:
+        pattern = re.compile(name_filter, re.IGNORECASE)
+        haystack = df[symbol_col].astype(str)
+        if name_col is not None:
+            haystack = haystack + " " + df[name_col].astype(str)
+        df = df[haystack.map(lambda text: bool(pattern.search(text)))]
+    symbols = list(dict.fromkeys(df[symbol_col].astype(str).str.strip()))
+    return symbols[:limit] if limit else symbols
+
+
+def load_completed(output_path: str) -> List[Dict[str, Any]]:
+    """ The "ok" rows of an earlier batch's output CSV (none when it does not exist yet). """
+    if not os.path.exists(output_path):
+        return []
+    try:
+        table = pd.read_csv(output_path)
+    except pd.errors.EmptyDataError:
+        return []
+    if "symbol" not in table or "status" not in table:
+        raise ValueError(f"'{output_path}' is not a batch results CSV.")
+    table = table[table["status"] == "ok"].drop_duplicates("symbol", keep="last")
+    return table.astype(object).where(table.notna(), None).to_dict("records")
+
+
+def _backtest_symbol(strategy_id: str, symbol: str, df: pd.DataFrame, params_dict: Dict[str, Any], engine: Optional[str]) -> BacktestResult:
+    """ Process-pool task: one full backtest of one symbol. """
+    return run_backtest_result(strategy_id, [df], params_dict, engine, symbols=[symbol])
+
+
+def default_output_path(strategy_id: str) -> str:
+    """ A fresh timestamped CSV path under BATCH_RESULTS_DIR (the directory is created). """
+    os.makedirs(BATCH_RESULTS_DIR, exist_ok=True)
+    return os.path.join(BATCH_RESULTS_DIR, f"{strategy_id}_{datetime.now():%Y%m%d_%H%M%S}.csv")
+
+
+def run_universe_backtest(
+    strategy_id: str,
+    params_dict: Dict[str, Any],
+    symbols: List[str],
+    start_date: str,
+    end_date: str,
+    output_path: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    engine: Optional[str] = None,
+    store: bool = RESULTS_STORE_ENABLED,
+    resume: bool = False,
+) -> pd.DataFrame:
+    """
+    Backtests one strategy / parameter set on every symbol. Data is fetched
+    on a thread pool (sharing the rate-limited Fyers gateway) and each frame
+    is handed to a process pool as soon as it arrives; every per-symbol
+    result is appended to `output_path` (CSV) the moment it finishes and,
+    with `store`, saved to the results warehouse. With `resume`, symbols
+    already "ok" in an existing `output_path` are skipped and the new rows
+    appended to it (failed symbols are retried). Returns all rows ranked by
+    total return.
+    """
+    if output_path is None:
+        if resume:
+            raise ValueError("resume needs the output_path of the interrupted batch.")
+        output_path = default_output_path(strategy_id)
+    workers = max_workers or os.cpu_count() or 1
+
+    rows = load_completed(output_path) if resume else []
+    done_symbols = {row["symbol"] for row in rows}
+    total = len(symbols)
+    symbols = [symbol for symbol in symbols if symbol not in done_symbols]
+    if rows:
+        print(f"--- Batch: resuming {output_path}, {total - len(symbols)} symbol(s) already done ---")
+    print(f"--- Batch: {strategy_id} on {len(symbols)} symbols, {workers} worker(s), writing {output_path} ---")
+
+    with open(output_path, "w", newline="") as out, \
+            ThreadPoolExecutor(max_workers=SYMBOL_FETCH_MAX_WORKERS) as fetch_pool, \
+            ProcessPoolExecutor(max_workers=workers) as backtest_pool:
+        writer = csv.DictWriter(out, fieldnames=RESULT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        # The file is rewritten with the completed rows first, so failed rows from the earlier run do not pile up
+        writer.writerows(rows)
+        out.flush()
+
+        def record(row: Dict[str, Any]) -> None:
+            rows.append(row)
+            writer.writerow(row)
+            out.flush()
+            print(f"--- Batch: {len(rows)}/{total} done ({row['symbol']}: {row['status']}) ---")
+
+        fetches = {fetch_pool.submit(get_historical_data, symbol, start_date, end_date): symbol for symbol in symbols}
+        backtests = {}
+        pending = set(fetches)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in fetches:
+                    symbol = fetches[future]
+                    try:
+                        df = future.result()
+                    except Exception as e:
+                        record({"symbol": symbol, "status": "error", "error": f"fetch failed: {e}"})
+                        continue
+                    if df.empty:
+                        record({"symbol": symbol, "status": "error", "error": "no data returned"})
+                        continue
+                    task = backtest_pool.submit(_backtest_symbol, strategy_id, symbol, df, params_dict, engine)
+                    backtests[task] = symbol
+                    pending.add(task)
+                else:
+                    symbol = backtests[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        record({"symbol": symbol, "status": "error", "error": str(e)})
+                        continue
+                    if store:
+                        results_store.save(result)
+                    record({"symbol": symbol, "status": "ok", **{name: result.metrics[name] for name in SWEEP_METRICS}})
+
+    return rank_results(rows, "total_return_pct")
@@ -1,6 +1,7 @@
 import os
 from dotenv import load_dotenv
 from fyers_apiv3 import fyersModel
+from .fyers_gateway import FyersGateway, account_bucket_path
 
 # --- 2. API & CONFIGURATION ---
 load_dotenv()
@@ -8,15 +9,81 @@ GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
 FYERS_CLIENT_ID = os.environ.get("FYERS_CLIENT_ID")
 FYERS_TOKEN = os.environ.get("FYERS_TOKEN")
 
-# Global Fyers Model
-fyers = fyersModel.FyersModel(
+# Global Fyers Model, behind the shared rate-limited / retrying gateway; the
+# account-wide bucket is shared with every other process using this account
+fyers = FyersGateway(fyersModel.FyersModel(
     client_id=FYERS_CLIENT_ID,
     token=FYERS_TOKEN,
     is_async=False,
     log_path=""
-)
+), shared_state=account_bucket_path(FYERS_CLIENT_ID))
+
+# Symbol master CSVs ship at the repository root; a copy in the working directory wins
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _data_file(name: str) -> str:
+    return name if os.path.exists(name) else os.path.join(REPO_ROOT, name)
+
 
 # Global RAG Config
 STRATEGY_VECTOR_STORE_PATH = "faiss_index_strategies"
 SYMBOL_VECTOR_STORE_PATH = "faiss_index_symbols"
-SYMBOL_CSV_PATH = "symbols.csv"
\ No newline at end of file
+SYMBOL_CSV_PATH = os.environ.get("HEDGEONE_SYMBOL_CSV_PATH", _data_file("symbols.csv"))
+EMBEDDING_MODEL_NAME = os.environ.get("HEDGEONE_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+FNO_SYMBOL_CSV_PATH = os.environ.get("HEDGEONE_FNO_SYMBOL_CSV_PATH", _data_file("F&O_symbols.csv"))
+RETRIEVAL_CACHE_MAX_ENTRIES = int(os.environ.get("HEDGEONE_RETRIEVAL_CACHE_MAX_ENTRIES", "512"))
+INDEX_BUILD_BATCH_SIZE = int(os.environ.get("HEDGEONE_INDEX_BUILD_BATCH_SIZE", "256"))
+INDEX_BUILD_WORKERS = int(os.environ.get("HEDGEONE_INDEX_BUILD_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Historical Data Cache
+DATA_CACHE_DIR = os.environ.get("HEDGEONE_DATA_CACHE_DIR", "ohlcv_cache")
+HISTORY_MAX_WORKERS = int(os.environ.get("HEDGEONE_HISTORY_MAX_WORKERS", "4"))
+SYMBOL_FETCH_MAX_WORKERS = int(os.environ.get("HEDGEONE_SYMBOL_FETCH_MAX_WORKERS", "8"))
+
+# Backtest engine: "backtrader" (default) or "vectorized"
+BACKTEST_ENGINE = os.environ.get("HEDGEONE_BACKTEST_ENGINE", "backtrader")
+
+# Multi-feed backtests: calendar the feeds are aligned on before Cerebro
+# ("union", "intersection" or "none" to let backtrader synchronise them);
+# a feed's missing bars are forward-filled
+FEED_CALENDAR = os.environ.get("HEDGEONE_FEED_CALENDAR", "union")
+
+# Shared indicator cache (per process)
+INDICATOR_CACHE_MAX_MB = int(os.environ.get("HEDGEONE_INDICATOR_CACHE_MAX_MB", "256"))
+
+# Parameter sweeps
+SWEEP_ENGINE = os.environ.get("HEDGEONE_SWEEP_ENGINE", "vectorized")
+SWEEP_MAX_COMBINATIONS = int(os.environ.get("HEDGEONE_SWEEP_MAX_COMBINATIONS", "5000"))
+
+# Universe batch backtests
+BATCH_RESULTS_DIR = os.environ.get("HEDGEONE_BATCH_RESULTS_DIR", "batch_results")
+
+# Backtest result cache (in-memory LRU in front of a SQLite file)
+RESULT_CACHE_ENABLED = os.environ.get("HEDGEONE_RESULT_CACHE", "1") != "0"
+RESULT_CACHE_PATH = os.environ.get("HEDGEONE_RESULT_CACHE_PATH", "backtest_cache.sqlite")
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get("HEDGEONE_RESULT_CACHE_MAX_ENTRIES", "128"))
+
+# Backtest results warehouse (every agent run is stored for later queries)
+RESULTS_STORE_ENABLED = os.environ.get("HEDGEONE_RESULTS_STORE", "1") != "0"
+RESULTS_DB_PATH = os.environ.get("HEDGEONE_RESULTS_DB_PATH", "backtest_results.sqlite")
+
+# Streaming (low-memory) backtests: "always", "intraday" (non-daily resolutions) or "never"
+BACKTEST_STREAMING = os.environ.get("HEDGEONE_BACKTEST_STREAMING", "intraday")
+
+# Background backtest jobs: pre-warmed worker processes, per-job timeout and
+# how long run_strategy_backtest waits before handing back a job id instead
+JOB_WORKERS = int(os.environ.get("HEDGEONE_JOB_WORKERS", "2"))
+JOB_TIMEOUT_SECONDS = float(os.environ.get("HEDGEONE_JOB_TIMEOUT_SECONDS", "1800"))
+JOB_INLINE_WAIT_SECONDS = float(os.environ.get("HEDGEONE_JOB_INLINE_WAIT_SECONDS", "20"))
+
+# Multi-node backtests (run_cluster.py): coordinator address, tasks per
+# worker pull, seconds before a silent worker's tasks are requeued, retries
+CLUSTER_HOST = os.environ.get("HEDGEONE_CLUSTER_HOST", "127.0.0.1")
+CLUSTER_PORT = int(os.environ.get("HEDGEONE_CLUSTER_PORT", "8765"))
+CLUSTER_BATCH_SIZE = int(os.environ.get("HEDGEONE_CLUSTER_BATCH_SIZE", "4"))
+CLUSTER_LEASE_SECONDS = float(os.environ.get("HEDGEONE_CLUSTER_LEASE_SECONDS", "600"))
+CLUSTER_MAX_ATTEMPTS = int(os.environ.get("HEDGEONE_CLUSTER_MAX_ATTEMPTS", "3"))
+
+# Append a strategy hot-path profile (__init__ / next() timings) to every agent backtest
+BACKTEST_PROFILE = os.environ.get("HEDGEONE_BACKTEST_PROFILE", "0") == "1"
@@ -0,0 +1,170 @@
+import os
+import re
+import json
+import threading
+from datetime import date, timedelta
+from typing import Iterator, List, Tuple
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Fyers candle timestamps are UTC epochs; a daily NSE candle is stamped at
+# IST midnight (18:30 UTC the day before), so dates are taken in IST.
+EXCHANGE_UTC_OFFSET = pd.Timedelta(hours=5, minutes=30)
+
+# Parquet row-group size; row groups are the unit iter_chunks() streams
+ROW_GROUP_ROWS = 50_000
+
+
+def _to_date(value) -> date:
+    """ Accepts 'YYYY-MM-DD' strings, datetimes or dates and returns a date. """
+    return pd.Timestamp(value).date()
+
+
+def _merge_intervals(intervals: List[Tuple[date, date]]) -> List[Tuple[date, date]]:
+    """ Merges overlapping or adjacent inclusive date intervals. """
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class OHLCVCache:
+    """
+    On-disk columnar (Parquet) cache of OHLCV frames, one file per
+    (symbol, resolution). A JSON sidecar records which calendar date ranges
+    have already been fetched, so holidays and empty ranges are not
+    re-requested and only the missing sub-ranges go to the network.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    # --- Paths & locking ---
+    def _key_dir(self, resolution: str) -> str:
+        return os.path.join(self.root, re.sub(r'[^A-Za-z0-9]', '_', str(resolution)))
+
+    def _paths(self, symbol: str, resolution: str) -> Tuple[str, str]:
+        safe_symbol = re.sub(r'[^A-Za-z0-9._&-]', '_', symbol)
+        base = os.path.join(self._key_dir(resolution), safe_symbol)
+        return base + ".parquet", base + ".coverage.json"
+
+    def lock(self, symbol: str, resolution: str) -> threading.Lock:
+        """ Per-key lock so concurrent fetches of one symbol don't race on disk. """
+        with self._locks_guard:
+            return self._locks.setdefault((symbol, resolution), threading.Lock())
+
+    # --- Coverage bookkeeping ---
+    def coverage(self, symbol: str, resolution: str) -> List[Tuple[date, date]]:
+        """ Returns the merged list of inclusive date ranges already cached. """
+        _, coverage_path = self._paths(symbol, resolution)
+        if not os.path.exists(coverage_path):
+            return []
+        try:
+            with open(coverage_path) as f:
+                raw = json.load(f)
+            return _merge_intervals([(_to_date(s), _to_date(e)) for s, e in raw])
+        except Exception as e:
+            print(f"Ignoring unreadable cache coverage for {symbol}: {e}")
+            return []
+
+    def missing_ranges(self, symbol: str, resolution: str, start_date, end_date) -> List[Tuple[str, str]]:
+        """ Returns the 'YYYY-MM-DD' sub-ranges of [start_date, end_date] not yet cached. """
+        start, end = _to_date(start_date), _to_date(end_date)
+        missing = []
+        cursor = start
+        for c_start, c_end in self.coverage(symbol, resolution):
+            if c_end < cursor:
+                continue
+            if c_start > end:
+                break
+            if c_start > cursor:
+                missing.append((cursor, c_start - timedelta(days=1)))
+            cursor = max(cursor, c_end + timedelta(days=1))
+            if cursor > end:
+                break
+        if cursor <= end:
+            missing.append((cursor, end))
+        return [(s.isoformat(), e.isoformat()) for s, e in missing]
+
+    # --- Reads & writes ---
+    def load(self, symbol: str, resolution: str) -> pd.DataFrame:
+        """ Loads every cached row for a key (empty frame if nothing is cached). """
+        data_path, _ = self._paths(symbol, resolution)
+        if not os.path.exists(data_path):
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+        return pd.read_parquet(data_path)
+
+    def read(self, symbol: str, resolution: str, start_date, end_date) -> pd.DataFrame:
+        """ Returns cached rows whose date falls within [start_date, end_date]. """
+        df = self.load(symbol, resolution)
+        if df.empty:
+            return df
+        days = (df.index + EXCHANGE_UTC_OFFSET).normalize()
+        mask = (days >= pd.Timestamp(start_date)) & (days <= pd.Timestamp(end_date))
+        return df[mask]
+
+    def iter_chunks(self, symbol: str, resolution: str, start_date, end_date, chunk_rows: int = ROW_GROUP_ROWS) -> Iterator[pd.DataFrame]:
+        """
+        Yields cached rows within [start_date, end_date] as frames of at most
+        `chunk_rows` rows, reading the Parquet file one row group at a time so
+        only one group is in memory at once.
+        """
+        data_path, _ = self._paths(symbol, resolution)
+        if not os.path.exists(data_path):
+            return
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        parquet_file = pq.ParquetFile(data_path, pre_buffer=False)
+        for group in range(parquet_file.num_row_groups):
+            df = parquet_file.read_row_group(group).to_pandas()
+            if 'datetime' in df.columns:
+                df = df.set_index('datetime')
+            days = (df.index + EXCHANGE_UTC_OFFSET).normalize()
+            if len(days) and days[0] > end:
+                return
+            df = df[(days >= start) & (days <= end)]
+            for i in range(0, len(df), chunk_rows):
+                yield df.iloc[i:i + chunk_rows]
+
+    def merge(self, symbol: str, resolution: str, df: pd.DataFrame, start_date, end_date) -> None:
+        """ Writes freshly fetched rows and marks [start_date, end_date] as covered. """
+        self.write_rows(symbol, resolution, df)
+        self.mark_covered(symbol, resolution, start_date, end_date)
+
+    def write_rows(self, symbol: str, resolution: str, df: pd.DataFrame) -> None:
+        """ Merges rows into the cached frame, later rows winning on duplicate timestamps. """
+        if df is None or df.empty:
+            return
+        data_path, _ = self._paths(symbol, resolution)
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        existing = self.load(symbol, resolution)
+        combined = pd.concat([existing, df[OHLCV_COLUMNS]]) if not existing.empty else df[OHLCV_COLUMNS]
+        combined = combined[~combined.index.duplicated(keep='last')].sort_index()
+        tmp_path = data_path + ".tmp"
+        combined.to_parquet(tmp_path, row_group_size=ROW_GROUP_ROWS)
+        os.replace(tmp_path, data_path)
+
+    def mark_covered(self, symbol: str, resolution: str, start_date, end_date) -> None:
+        """
+        Records [start_date, end_date] as fetched. Ranges reaching today or
+        later are only marked up to yesterday, since the current session's
+        candles are still changing.
+        """
+        _, coverage_path = self._paths(symbol, resolution)
+        os.makedirs(os.path.dirname(coverage_path), exist_ok=True)
+        start = _to_date(start_date)
+        end = min(_to_date(end_date), date.today() - timedelta(days=1))
+        if end < start:
+            return
+        intervals = _merge_intervals(self.coverage(symbol, resolution) + [(start, end)])
+        tmp_path = coverage_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump([[s.isoformat(), e.isoformat()] for s, e in intervals], f)
+        os.replace(tmp_path, coverage_path)
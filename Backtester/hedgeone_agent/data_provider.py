@@ -1,23 +1,38 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
-from .config import fyers # Import the global fyers client
+from .config import fyers, DATA_CACHE_DIR, HISTORY_MAX_WORKERS, SYMBOL_FETCH_MAX_WORKERS # Import the global fyers client
+from .data_cache import OHLCVCache
 
-def get_historical_data(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
-    """ Fetches historical data from Fyers and formats it for Backtrader. """
+# Process-wide on-disk OHLCV cache
+data_cache = OHLCVCache(DATA_CACHE_DIR)
+
+def _fetch_history(symbol: str, start_date: str, end_date: str, resolution: str = "D") -> Optional[pd.DataFrame]:
+    """
+    Fetches one range from Fyers and formats it for Backtrader.
+    Returns an empty frame when the range legitimately has no candles and
+    None when the request failed (so the caller does not cache the gap).
+    """
     print(f"Fetching data for {symbol} from {start_date} to {end_date}...")
     try:
         historical_data = {
-            "symbol": symbol, "resolution": "D", "date_format": "1",
+            "symbol": symbol, "resolution": resolution, "date_format": "1",
             "range_from": start_date, "range_to": end_date, "cont_flag": "1"
         }
         response = fyers.history(data=historical_data)
         
         if not response:
             print(f"No response from Fyers for {symbol}.")
+            return None
+
+        if response.get("s") == "no_data":
+            print(f"No candle data returned for {symbol}.")
             return pd.DataFrame()
 
         if response.get("s") != "ok":
             print(f"Error fetching data for {symbol}: {response.get('message')}")
-            return pd.DataFrame()
+            return None
         
         # --- 1. GET THE LIST OF CANDLES ---
         candles = response.get('candles', [])
@@ -65,10 +80,120 @@ def get_historical_data(symbol: str, start_date: str, end_date: str) -> pd.DataF
         # This check is now more accurate.
         if 'Open' not in df.columns:
              print(f"Data fetched for {symbol}, but 'Open' column is missing after processing.")
-             return pd.DataFrame()
+             return None
              
         print(f"Successfully fetched {len(df)} rows for {symbol}.")
         return df
     except Exception as e:
         print(f"Exception in get_historical_data: {e}")
-        return pd.DataFrame()
\ No newline at end of file
+        return None
+
+# Max calendar days Fyers returns per history call, by resolution
+# (daily candles: one year; any intraday resolution: 100 days).
+HISTORY_WINDOW_DAYS = {"D": 366, "1D": 366}
+INTRADAY_WINDOW_DAYS = 100
+
+def _split_windows(start_date: str, end_date: str, resolution: str) -> List[Tuple[str, str]]:
+    """ Splits an inclusive date range into broker-sized 'YYYY-MM-DD' windows. """
+    span = HISTORY_WINDOW_DAYS.get(str(resolution).upper(), INTRADAY_WINDOW_DAYS)
+    start, end = pd.Timestamp(start_date).date(), pd.Timestamp(end_date).date()
+    windows = []
+    while start <= end:
+        window_end = min(start + timedelta(days=span - 1), end)
+        windows.append((start.isoformat(), window_end.isoformat()))
+        start = window_end + timedelta(days=1)
+    return windows
+
+def _fetch_windows(symbol: str, windows: List[Tuple[str, str]], resolution: str) -> List[Optional[pd.DataFrame]]:
+    """ Fetches each window on a bounded thread pool; results keep the window order. """
+    if len(windows) <= 1:
+        return [_fetch_history(symbol, s, e, resolution) for s, e in windows]
+    with ThreadPoolExecutor(max_workers=min(HISTORY_MAX_WORKERS, len(windows))) as pool:
+        return list(pool.map(lambda w: _fetch_history(symbol, w[0], w[1], resolution), windows))
+
+def _stitch(frames: List[Optional[pd.DataFrame]]) -> pd.DataFrame:
+    """ Concatenates window frames into one sorted frame without duplicate bars. """
+    frames = [df for df in frames if df is not None and not df.empty]
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames)
+    return df[~df.index.duplicated(keep='last')].sort_index()
+
+def _fill_cache(symbol: str, start_date: str, end_date: str, resolution: str) -> None:
+    """ Fetches the date sub-ranges the cache is missing and stores them (caller holds the key lock). """
+    missing = data_cache.missing_ranges(symbol, resolution, start_date, end_date)
+    if not missing:
+        print(f"Cache hit for {symbol} ({resolution}) from {start_date} to {end_date}.")
+    windows = [w for s, e in missing for w in _split_windows(s, e, resolution)]
+    frames = _fetch_windows(symbol, windows, resolution)
+    data_cache.write_rows(symbol, resolution, _stitch(frames))
+    for (range_from, range_to), window_df in zip(windows, frames):
+        if window_df is not None:
+            data_cache.mark_covered(symbol, resolution, range_from, range_to)
+
+def get_historical_data(symbol: str, start_date: str, end_date: str, resolution: str = "D", use_cache: bool = True) -> pd.DataFrame:
+    """
+    Returns OHLCV data for Backtrader, serving whatever is already in the
+    on-disk cache and fetching only the missing date sub-ranges from Fyers.
+    Missing ranges are split into broker-sized windows fetched concurrently.
+    """
+    if not use_cache:
+        return _stitch(_fetch_windows(symbol, _split_windows(start_date, end_date, resolution), resolution))
+
+    try:
+        with data_cache.lock(symbol, resolution):
+            _fill_cache(symbol, start_date, end_date, resolution)
+            df = data_cache.read(symbol, resolution, start_date, end_date)
+    except Exception as e:
+        print(f"Exception in get_historical_data: {e}")
+        return pd.DataFrame()
+
+    if df.empty:
+        print(f"No data available for {symbol} from {start_date} to {end_date}.")
+        return pd.DataFrame()
+    return df
+
+def load_data_feeds(symbols: List[str], start_date: str, end_date: str, resolution: str = "D") -> Tuple[List[pd.DataFrame], Dict[str, str]]:
+    """
+    Fetches every symbol concurrently. Frames come back in the same order as
+    `symbols` (so a trade symbol passed last stays last), together with a
+    {symbol: reason} dict of every symbol that could not be loaded.
+    """
+    if not symbols:
+        return [], {}
+    workers = min(SYMBOL_FETCH_MAX_WORKERS, len(symbols))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(get_historical_data, symbol, start_date, end_date, resolution) for symbol in symbols]
+
+    frames, failures = [], {}
+    for symbol, future in zip(symbols, futures):
+        try:
+            df = future.result()
+        except Exception as e:
+            df, failures[symbol] = pd.DataFrame(), str(e)
+        if df.empty and symbol not in failures:
+            failures[symbol] = "no data returned"
+        frames.append(df)
+    return frames, failures
+
+def ensure_cached(symbols: List[str], start_date: str, end_date: str, resolution: str = "D") -> Dict[str, str]:
+    """
+    Makes sure every symbol's range is in the on-disk cache without loading
+    it into memory (for streaming backtests). Returns {symbol: reason} for
+    symbols that could not be fetched or have no data in the range.
+    """
+    def fill(symbol: str) -> Optional[str]:
+        try:
+            with data_cache.lock(symbol, resolution):
+                _fill_cache(symbol, start_date, end_date, resolution)
+        except Exception as e:
+            return str(e)
+        if next(data_cache.iter_chunks(symbol, resolution, start_date, end_date), None) is None:
+            return "no data returned"
+        return None
+
+    if not symbols:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(SYMBOL_FETCH_MAX_WORKERS, len(symbols))) as pool:
+        reasons = list(pool.map(fill, symbols))
+    return {symbol: reason for symbol, reason in zip(symbols, reasons) if reason}
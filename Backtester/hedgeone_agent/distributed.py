@@ -0,0 +1,376 @@
+import base64
+import io
+import json
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+# Import from our package
+from .backtest_engine import run_backtest_result
+from .data_cache import OHLCVCache
+from .data_provider import data_cache, ensure_cached
+from .optimizer import SWEEP_METRICS, rank_results
+from .results import BacktestResult
+from .results_store import results_store
+from .config import CLUSTER_BATCH_SIZE, CLUSTER_LEASE_SECONDS, CLUSTER_MAX_ATTEMPTS, RESULTS_STORE_ENABLED
+
+# --- MULTI-NODE BACKTESTS ---
+# A coordinator holds a queue of (strategy, params, symbol) tasks and serves
+# them over plain TCP, one JSON object per line. Workers on any host connect,
+# pull batches, read OHLCV from the shared cache directory (the coordinator
+# fills it first, so workers need no Fyers credentials) and stream each
+# BacktestResult back; the coordinator writes them into one results store.
+# Tasks leased to a worker that disconnects or exceeds its lease are
+# requeued, up to CLUSTER_MAX_ATTEMPTS times. A worker that loses the
+# coordinator reconnects with exponential backoff and pulls again.
+#
+# Protocol (worker -> coordinator, reply on the same line-oriented socket):
+#   {"op": "hello", "worker": name}                      -> {"op": "welcome"}
+#   {"op": "pull", "max": n}                             -> {"op": "tasks", "tasks": [...]}
+#                                                         | {"op": "wait", "seconds": s} | {"op": "done"}
+#   {"op": "result", "task_id": id, "status": "ok", "result": {...}}
+#   {"op": "result", "task_id": id, "status": "error", "error": msg}  -> {"op": "ack"}
+
+ROW_FIELDS = ["symbol", "params", "status", "error", "worker"] + SWEEP_METRICS
+
+# Seconds a worker is told to wait when every task is leased out
+WAIT_SECONDS = 1.0
+# Worker reconnect backoff: first delay, doubled per failed attempt up to the cap
+RECONNECT_DELAY_SECONDS = 0.5
+RECONNECT_MAX_DELAY_SECONDS = 8.0
+
+
+def make_tasks(strategy_id: str, symbols: List[str], param_grid: List[Dict[str, Any]], start_date: str, end_date: str,
+               resolution: str = "D", engine: Optional[str] = None) -> List[Dict[str, Any]]:
+    """ One task per (params, symbol) pair. """
+    return [
+        {"task_id": i, "strategy_id": strategy_id, "params": params, "symbol": symbol,
+         "start_date": start_date, "end_date": end_date, "resolution": resolution, "engine": engine}
+        for i, (params, symbol) in enumerate((p, s) for p in param_grid for s in symbols)
+    ]
+
+
+# --- Wire format ---
+def _jsonable(value: Any) -> Any:
+    """ json.dumps fallback for numpy scalars and timestamps. """
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+def _send(stream, message: Dict[str, Any]) -> None:
+    stream.write((json.dumps(message, default=_jsonable) + "\n").encode())
+    stream.flush()
+
+
+def _receive(stream) -> Optional[Dict[str, Any]]:
+    line = stream.readline()
+    return json.loads(line) if line else None
+
+
+def _expect(stream, ops: tuple) -> Dict[str, Any]:
+    """
+    The coordinator's next reply, which must be one of `ops`. A closed
+    connection raises ConnectionError; an error or unexpected reply raises
+    RuntimeError, since retrying the same message would fail the same way.
+    """
+    reply = _receive(stream)
+    if reply is None:
+        raise ConnectionError("coordinator closed the connection")
+    if reply.get("op") not in ops:
+        raise RuntimeError(f"Coordinator replied {reply.get('op')!r} ({reply.get('error', 'no details')}), expected {' / '.join(ops)}.")
+    return reply
+
+
+def _frame_to_text(frame: pd.DataFrame) -> str:
+    buffer = io.BytesIO()
+    frame.to_parquet(buffer, index=False)
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def _frame_from_text(text: str) -> pd.DataFrame:
+    return pd.read_parquet(io.BytesIO(base64.b64decode(text)))
+
+
+def encode_result(result: BacktestResult) -> Dict[str, Any]:
+    """ A BacktestResult as a JSON-safe dict (equity curve and trades as base64 Parquet). """
+    return {
+        "strategy_id": result.strategy_id, "symbols": result.symbols, "params": result.params,
+        "engine": result.engine, "metrics": result.metrics,
+        "equity": _frame_to_text(result.equity_curve.rename("value").rename_axis("datetime").reset_index()),
+        "trades": _frame_to_text(result.trades),
+    }
+
+
+def decode_result(payload: Dict[str, Any]) -> BacktestResult:
+    equity = _frame_from_text(payload["equity"])
+    return BacktestResult(
+        strategy_id=payload["strategy_id"], symbols=payload["symbols"], params=payload["params"],
+        engine=payload["engine"], metrics=payload["metrics"],
+        equity_curve=equity.set_index("datetime")["value"], trades=_frame_from_text(payload["trades"]),
+    )
+
+
+# --- Coordinator ---
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class Coordinator:
+    """ Serves `tasks` to TCP workers until every task has a result; see run(). """
+
+    def __init__(self, tasks: List[Dict[str, Any]], host: str, port: int, lease_seconds: float = CLUSTER_LEASE_SECONDS,
+                 max_attempts: int = CLUSTER_MAX_ATTEMPTS, store: bool = RESULTS_STORE_ENABLED):
+        self.tasks = {task["task_id"]: task for task in tasks}
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.store = store
+        self.rows: List[Dict[str, Any]] = []
+        self._pending = deque(self.tasks)
+        self._leases: Dict[int, tuple] = {}  # task_id -> (session, deadline)
+        self._attempts: Dict[int, int] = {}
+        self._finished = set()
+        self._lock = threading.Lock()
+        self._all_done = threading.Event()
+        self._unsaved: List[BacktestResult] = []
+
+        coordinator = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                coordinator._serve_session(self)
+
+        self.server = _Server((host, port), Handler)
+        self.address = self.server.server_address
+        if not self.tasks:
+            self._all_done.set()
+
+    def run(self, timeout: Optional[float] = None) -> pd.DataFrame:
+        """ Serves until every task is finished (or `timeout` seconds pass); returns the rows ranked by total return. """
+        print(f"--- Coordinator: {len(self.tasks)} task(s) on {self.address[0]}:{self.address[1]} ---")
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.2}, daemon=True).start()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while not self._all_done.wait(1.0):
+                self._expire_leases()
+                if deadline is not None and time.monotonic() > deadline:
+                    print("--- Coordinator: timed out with tasks outstanding ---")
+                    break
+        finally:
+            # Give waiting workers time to poll again and hear "done" before the socket closes
+            time.sleep(WAIT_SECONDS + 0.5)
+            self.server.shutdown()
+            self.server.server_close()
+            self._flush(force=True)
+        return rank_results(self.rows, "total_return_pct")
+
+    def _serve_session(self, handler) -> None:
+        session = object()
+        worker = f"{handler.client_address[0]}:{handler.client_address[1]}"
+        try:
+            while True:
+                message = _receive(handler.rfile)
+                if message is None:
+                    break
+                op = message.get("op")
+                if op == "hello":
+                    worker = f"{message.get('worker') or 'worker'}@{worker}"
+                    print(f"--- Coordinator: {worker} connected ---")
+                    _send(handler.wfile, {"op": "welcome"})
+                elif op == "pull":
+                    _send(handler.wfile, self._lease(session, max(1, int(message.get("max", 1)))))
+                elif op == "result":
+                    self._complete(worker, message)
+                    _send(handler.wfile, {"op": "ack"})
+                else:
+                    _send(handler.wfile, {"op": "error", "error": f"unknown op '{op}'"})
+        except (ConnectionError, OSError, ValueError) as e:
+            print(f"--- Coordinator: {worker} dropped ({e}) ---")
+        finally:
+            self._release(session, worker)
+
+    def _lease(self, session, limit: int) -> Dict[str, Any]:
+        with self._lock:
+            if self._all_done.is_set():
+                return {"op": "done"}
+            batch = []
+            while self._pending and len(batch) < limit:
+                task_id = self._pending.popleft()
+                if task_id in self._finished:
+                    continue
+                self._leases[task_id] = (session, time.monotonic() + self.lease_seconds)
+                self._attempts[task_id] = self._attempts.get(task_id, 0) + 1
+                batch.append(self.tasks[task_id])
+        return {"op": "tasks", "tasks": batch} if batch else {"op": "wait", "seconds": WAIT_SECONDS}
+
+    def _complete(self, worker: str, message: Dict[str, Any]) -> None:
+        task_id = message["task_id"]
+        with self._lock:
+            # A requeued task can be finished twice; keep the first result
+            if task_id in self._finished or task_id not in self.tasks:
+                return
+            self._finished.add(task_id)
+            self._leases.pop(task_id, None)
+            task = self.tasks[task_id]
+            row = {"symbol": task["symbol"], "params": json.dumps(task["params"], sort_keys=True), "worker": worker}
+            if message.get("status") == "ok":
+                result = decode_result(message["result"])
+                row.update(status="ok", **{name: result.metrics.get(name) for name in SWEEP_METRICS})
+                self._unsaved.append(result)
+            else:
+                row.update(status="error", error=message.get("error"))
+            self.rows.append(row)
+            done = len(self._finished)
+        print(f"--- Coordinator: {done}/{len(self.tasks)} done ({task['symbol']} {row['params']}: {row['status']}) ---")
+        self._flush()
+        if done == len(self.tasks):
+            self._all_done.set()
+
+    def _flush(self, force: bool = False) -> None:
+        """ Writes buffered results to the results store in batches. """
+        with self._lock:
+            if not self._unsaved or (len(self._unsaved) < 20 and not force):
+                return
+            batch, self._unsaved = self._unsaved, []
+        if self.store:
+            results_store.save_many(batch)
+
+    def _requeue(self, task_id: int, reason: str) -> None:
+        """ Puts a lost task back in the queue, or fails it after max_attempts; caller holds the lock. """
+        self._leases.pop(task_id, None)
+        if self._attempts.get(task_id, 0) < self.max_attempts:
+            self._pending.appendleft(task_id)
+            return
+        self._finished.add(task_id)
+        task = self.tasks[task_id]
+        self.rows.append({"symbol": task["symbol"], "params": json.dumps(task["params"], sort_keys=True),
+                          "status": "error", "error": f"{reason} after {self._attempts[task_id]} attempt(s)"})
+
+    def _release(self, session, worker: str) -> None:
+        """ Requeues whatever a disconnected worker still held. """
+        with self._lock:
+            lost = [task_id for task_id, (owner, _) in self._leases.items() if owner is session]
+            for task_id in lost:
+                self._requeue(task_id, "worker lost")
+            all_done = len(self._finished) == len(self.tasks)
+        if lost:
+            print(f"--- Coordinator: {worker} left with {len(lost)} task(s); requeued ---")
+        if all_done:
+            self._all_done.set()
+
+    def _expire_leases(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            expired = [task_id for task_id, (_, deadline) in self._leases.items() if deadline < now]
+            for task_id in expired:
+                self._requeue(task_id, "lease expired")
+            all_done = len(self._finished) == len(self.tasks)
+        if expired:
+            print(f"--- Coordinator: {len(expired)} lease(s) expired; requeued ---")
+        if all_done:
+            self._all_done.set()
+
+
+def run_coordinator(strategy_id: str, symbols: List[str], param_grid: List[Dict[str, Any]], start_date: str, end_date: str,
+                    host: str, port: int, resolution: str = "D", engine: Optional[str] = None, prefetch: bool = True,
+                    timeout: Optional[float] = None, on_listening: Optional[Callable[[], None]] = None) -> pd.DataFrame:
+    """
+    Fills the shared OHLCV cache for `symbols` (unless `prefetch` is off),
+    serves every (params, symbol) task to connecting workers and returns all
+    rows ranked by total return. Symbols that cannot be fetched are reported
+    as error rows without being sent to workers. `on_listening` is called
+    once the coordinator accepts connections (e.g. to start local workers).
+    """
+    failures = ensure_cached(symbols, start_date, end_date, resolution) if prefetch else {}
+    tasks = make_tasks(strategy_id, [s for s in symbols if s not in failures], param_grid, start_date, end_date, resolution, engine)
+    coordinator = Coordinator(tasks, host, port)
+    if on_listening is not None:
+        on_listening()
+    table = coordinator.run(timeout=timeout)
+    if failures:
+        extra = [{"symbol": s, "params": json.dumps(p, sort_keys=True), "status": "error", "error": f"fetch failed: {reason}"}
+                 for s, reason in failures.items() for p in param_grid]
+        table = rank_results(coordinator.rows + extra, "total_return_pct")
+    return table
+
+
+# --- Worker ---
+def _run_task(task: Dict[str, Any], cache: OHLCVCache) -> Dict[str, Any]:
+    reply = {"op": "result", "task_id": task["task_id"]}
+    try:
+        df = cache.read(task["symbol"], task["resolution"], task["start_date"], task["end_date"])
+        if df.empty:
+            return {**reply, "status": "error", "error": "no cached data (is the cache path shared?)"}
+        result = run_backtest_result(task["strategy_id"], [df], task["params"], task["engine"], symbols=[task["symbol"]])
+        return {**reply, "status": "ok", "result": encode_result(result)}
+    except Exception as e:
+        return {**reply, "status": "error", "error": f"{type(e).__name__}: {e}"}
+
+
+def _connect(host: str, port: int, timeout: float) -> socket.socket:
+    """ Connects to the coordinator, retrying with exponential backoff for up to `timeout` seconds. """
+    deadline = time.monotonic() + timeout
+    delay = RECONNECT_DELAY_SECONDS
+    while True:
+        try:
+            connection = socket.create_connection((host, port), timeout=10.0)
+            connection.settimeout(None)
+            return connection
+        except OSError:
+            if time.monotonic() + delay > deadline:
+                raise
+            time.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY_SECONDS)
+
+
+def run_worker(host: str, port: int, batch_size: int = CLUSTER_BATCH_SIZE, cache_dir: Optional[str] = None,
+               name: Optional[str] = None, connect_timeout: float = 60.0) -> int:
+    """
+    Pulls and runs tasks from the coordinator at host:port until it reports
+    that everything is done; returns the number of tasks this worker ran
+    (acknowledged by the coordinator). If the coordinator is not up yet or
+    the connection drops, reconnects with exponential backoff for up to
+    `connect_timeout` seconds; the coordinator requeues whatever the lost
+    session held. Raises OSError if the first connection never succeeds
+    and RuntimeError on an error reply.
+    """
+    cache = OHLCVCache(cache_dir) if cache_dir else data_cache
+    name = name or socket.gethostname()
+    completed = 0
+    connected = False
+    while True:
+        try:
+            connection = _connect(host, port, connect_timeout)
+        except OSError:
+            if not connected:
+                raise
+            # The coordinator most likely finished and shut down while this worker was away
+            print(f"--- Worker {name}: coordinator unreachable for {connect_timeout:.0f}s, stopping ---")
+            break
+        connected = True
+        try:
+            with connection, connection.makefile("rwb") as stream:
+                _send(stream, {"op": "hello", "worker": name})
+                _expect(stream, ("welcome",))
+                while True:
+                    _send(stream, {"op": "pull", "max": batch_size})
+                    reply = _expect(stream, ("tasks", "wait", "done"))
+                    if reply["op"] == "done":
+                        print(f"--- Worker {name}: ran {completed} task(s) ---")
+                        return completed
+                    if reply["op"] == "wait":
+                        time.sleep(reply.get("seconds", WAIT_SECONDS))
+                        continue
+                    for task in reply["tasks"]:
+                        _send(stream, _run_task(task, cache))
+                        _expect(stream, ("ack",))
+                        completed += 1
+        except (OSError, ValueError) as e:
+            # ValueError: a reply line cut short by the disconnect
+            print(f"--- Worker {name}: lost the coordinator ({e}), reconnecting ---")
+    print(f"--- Worker {name}: ran {completed} task(s) ---")
+    return completed
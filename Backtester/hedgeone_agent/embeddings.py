@@ -0,0 +1,47 @@
+import threading
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+from .config import EMBEDDING_MODEL_NAME
+from .retrieval_cache import query_embeddings, query_key
+
+# --- SHARED EMBEDDING MODEL ---
+# One sentence-transformer per process, loaded on first use and shared by
+# every FAISS store (strategies, symbols). Importing this module is cheap:
+# langchain's HuggingFaceEmbeddings (and torch) are only imported when the
+# model is first needed. Query embeddings go through the query_embeddings LRU.
+
+_embeddings = None
+_embeddings_lock = threading.Lock()
+
+
+class CachedEmbeddings(Embeddings):
+    """ Wraps an Embeddings model, caching embed_query by model name and query (see query_key). """
+
+    def __init__(self, model: Embeddings, model_name: str = EMBEDDING_MODEL_NAME):
+        self.model = model
+        self.model_name = model_name
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.model.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = query_key(self.model_name, text)
+        vector = query_embeddings.get(key)
+        if vector is None:
+            vector = self.model.embed_query(text)
+            query_embeddings.put(key, vector)
+        return list(vector)
+
+
+def get_embeddings() -> CachedEmbeddings:
+    """ The process-wide HuggingFaceEmbeddings(EMBEDDING_MODEL_NAME), loaded once. """
+    global _embeddings
+    if _embeddings is None:
+        with _embeddings_lock:
+            if _embeddings is None:
+                from langchain_community.embeddings import HuggingFaceEmbeddings
+                print(f"Loading embedding model '{EMBEDDING_MODEL_NAME}'...")
+                _embeddings = CachedEmbeddings(HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME))
+    return _embeddings
@@ -0,0 +1,290 @@
+import json
+import os
+import random
+import re
+import struct
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Fyers answers throttled / overloaded calls with these codes in the JSON body
+TRANSIENT_CODES = {429, 500, 502, 503, 504}
+# fyers_apiv3 catches network errors itself and returns this code (no HTTP response at all)
+NO_RESPONSE_CODE = 99
+TRANSIENT_EXCEPTIONS = (ConnectionError, TimeoutError, OSError)
+
+# (requests per second, burst size) per endpoint
+DEFAULT_LIMITS = {
+    "history": (5.0, 5),
+    "quotes": (8.0, 8),
+    "optionchain": (5.0, 5),
+}
+# Fyers allows ~10 req/s per account overall, so every call (any endpoint,
+# passed-through ones included) also draws from one shared bucket. With a
+# `shared_state` file that bucket is shared by every process on the host
+# (job-queue workers, batch / optimizer pools, the App), not just threads.
+GLOBAL_LIMIT = (10.0, 10)
+
+
+class TokenBucket:
+    """ Thread-safe token bucket. `acquire` blocks until a token is free. """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """ Takes one token and returns the number of seconds spent waiting. """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                delay = (1.0 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class SharedTokenBucket:
+    """
+    Token bucket whose state (tokens, last refill) lives in a small file,
+    updated under an exclusive file lock, so every process using the same
+    `path` draws from one budget. `acquire` blocks until a token is free.
+    """
+
+    _STATE = struct.Struct("dd")
+
+    def __init__(self, rate: float, capacity: int, path: str):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.path = path
+        # The file lock serialises processes; this one serialises threads of this process first
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _take(self) -> float:
+        """ Takes a token if one is free (returns 0.0), else returns the seconds until one will be. """
+        with self._lock, open(self.path, "a+b") as f:
+            _lock_file(f)
+            try:
+                f.seek(0)
+                now = time.time()
+                try:
+                    tokens, updated = self._STATE.unpack(f.read(self._STATE.size))
+                except struct.error:
+                    # New or unreadable state: start with a full bucket
+                    tokens, updated = self.capacity, now
+                tokens = min(self.capacity, tokens + max(0.0, now - updated) * self.rate)
+                delay = 0.0 if tokens >= 1.0 else (1.0 - tokens) / self.rate
+                if not delay:
+                    tokens -= 1.0
+                f.seek(0)
+                f.truncate()
+                f.write(self._STATE.pack(tokens, now))
+                f.flush()
+            finally:
+                _unlock_file(f)
+        return delay
+
+    def acquire(self) -> float:
+        """ Takes one token and returns the number of seconds spent waiting. """
+        waited = 0.0
+        while True:
+            delay = self._take()
+            if not delay:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+
+def _lock_file(f) -> None:
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def _unlock_file(f) -> None:
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def account_bucket_path(client_id: Optional[str]) -> str:
+    """ The shared_state file of one Fyers account's bucket (HEDGEONE_FYERS_BUCKET_DIR, default the temp dir). """
+    directory = os.environ.get("HEDGEONE_FYERS_BUCKET_DIR", tempfile.gettempdir())
+    account = re.sub(r"[^A-Za-z0-9_-]", "_", client_id or "default")
+    return os.path.join(directory, f"hedgeone_fyers_{account}.bucket")
+
+
+class FyersGateway:
+    """
+    Wraps a `fyersModel.FyersModel` (or any object exposing history / quotes /
+    optionchain, e.g. a client for a local fake server) with a per-endpoint
+    token-bucket limiter under one account-wide bucket, jittered exponential
+    retry on transient failures and coalescing of identical in-flight
+    requests. Any other attribute is passed through to the wrapped client
+    (its methods still draw from the account-wide bucket). Without
+    `shared_state` the account-wide bucket only covers this process; with it
+    (see account_bucket_path) every gateway of the account on the host shares it.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        limits: Optional[Dict[str, Tuple[float, int]]] = None,
+        global_limit: Optional[Tuple[float, int]] = GLOBAL_LIMIT,
+        shared_state: Optional[str] = None,
+        max_retries: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+    ):
+        self.client = client
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._buckets = {
+            endpoint: TokenBucket(rate, burst)
+            for endpoint, (rate, burst) in {**DEFAULT_LIMITS, **(limits or {})}.items()
+        }
+        if not global_limit:
+            self._global_bucket = None
+        elif shared_state:
+            self._global_bucket = SharedTokenBucket(*global_limit, shared_state)
+        else:
+            self._global_bucket = TokenBucket(*global_limit)
+        self._inflight: Dict[Tuple[str, str], Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    # --- Public endpoints (same call shapes as FyersModel) ---
+    def history(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return self._call("history", data)
+
+    def quotes(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return self._call("quotes", data)
+
+    def optionchain(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return self._call("optionchain", data)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes not defined on the gateway itself
+        if name == "client" or name.startswith("_"):
+            raise AttributeError(name)
+        attr = getattr(self.client, name)
+        if not callable(attr):
+            return attr
+
+        def throttled(*args, **kwargs):
+            self._throttle(name)
+            return attr(*args, **kwargs)
+        return throttled
+
+    # --- Counters ---
+    def _count(self, endpoint: str, counter: str, amount: float = 1) -> None:
+        with self._stats_lock:
+            endpoint_stats = self._stats.setdefault(endpoint, {
+                "requests": 0, "retries": 0, "failures": 0, "coalesced": 0,
+                "throttle_waits": 0, "throttle_wait_seconds": 0.0,
+            })
+            endpoint_stats[counter] += amount
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """ Returns a snapshot of the per-endpoint request / retry / throttle counters. """
+        with self._stats_lock:
+            return {endpoint: dict(counters) for endpoint, counters in self._stats.items()}
+
+    # --- Internals ---
+    def _call(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """ Coalesces identical concurrent requests onto one upstream call. """
+        key = (endpoint, json.dumps(data, sort_keys=True, default=str))
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+
+        if not leader:
+            self._count(endpoint, "coalesced")
+            return future.result()
+
+        try:
+            future.set_result(self._call_with_retry(endpoint, data))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+        return future.result()
+
+    def _throttle(self, endpoint: str) -> None:
+        """ Waits for a token from the endpoint's bucket, then from the account-wide one. """
+        waited = 0.0
+        for bucket in (self._buckets.get(endpoint), self._global_bucket):
+            if bucket is not None:
+                waited += bucket.acquire()
+        if waited > 0:
+            self._count(endpoint, "throttle_waits")
+            self._count(endpoint, "throttle_wait_seconds", waited)
+
+    def _call_with_retry(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        method = getattr(self.client, endpoint)
+        attempt = 0
+        while True:
+            self._throttle(endpoint)
+            self._count(endpoint, "requests")
+            try:
+                response = method(data=data)
+                transient = _is_transient_response(response)
+            except TRANSIENT_EXCEPTIONS:
+                if attempt >= self.max_retries:
+                    self._count(endpoint, "failures")
+                    raise
+                transient, response = True, None
+
+            if not transient:
+                return response
+            if attempt >= self.max_retries:
+                self._count(endpoint, "failures")
+                return response
+
+            # Full-jitter exponential backoff
+            attempt += 1
+            self._count(endpoint, "retries")
+            time.sleep(random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt))))
+
+
+def _is_transient_response(response: Any) -> bool:
+    """ True for throttled / server-side error payloads worth retrying. """
+    if not isinstance(response, dict) or response.get("s") == "ok":
+        return False
+    try:
+        code = abs(int(response.get("code", 0)))
+    except (TypeError, ValueError):
+        code = 0
+    message = str(response.get("message", "")).lower()
+    if code == NO_RESPONSE_CODE:
+        # The SDK uses the same code for arguments it could not encode
+        return "invalid input" not in message
+    return code in TRANSIENT_CODES or "limit" in message or "too many" in message
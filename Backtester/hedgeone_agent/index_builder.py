@@ -0,0 +1,102 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import List, Optional
+
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from .config import EMBEDDING_MODEL_NAME, INDEX_BUILD_BATCH_SIZE, INDEX_BUILD_WORKERS
+
+# --- BATCHED INDEX BUILDS ---
+# Embeds documents in fixed-size batches and streams each batch's vectors
+# straight into the FAISS index, so only the batches in flight are ever held
+# as embeddings. Large builds fan the batches out to worker processes that
+# each load the model once (torch threads split between them); small ones
+# embed in-process with the shared model, since starting workers would cost
+# more than it saves. Progress is reported in rows/sec.
+
+# Below this many batches per worker a build stays in-process
+MIN_BATCHES_FOR_WORKERS = 8
+PROGRESS_EVERY_SECONDS = 5.0
+
+_worker_model = None
+
+
+def _init_worker(model_name: str, threads: int) -> None:
+    """ Worker process setup: one model per process, `threads` torch threads. """
+    global _worker_model
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    _worker_model = HuggingFaceEmbeddings(model_name=model_name)
+
+
+def _embed_batch(texts: List[str]) -> np.ndarray:
+    """ Process-pool task: one batch of texts -> float32 vectors. """
+    return np.asarray(_worker_model.embed_documents(texts), dtype=np.float32)
+
+
+def add_to_index(store: Optional[FAISS], ids: List[str], documents: List[Document], embeddings,
+                 batch_size: int = INDEX_BUILD_BATCH_SIZE, workers: int = INDEX_BUILD_WORKERS,
+                 model_name: str = EMBEDDING_MODEL_NAME) -> FAISS:
+    """
+    Embeds `documents` batch by batch and adds them to `store` under `ids`
+    (a new store when `store` is None). `embeddings` is the store's query
+    embedding function and embeds in-process builds; worker processes load
+    `model_name` themselves.
+    """
+    if not documents:
+        return store
+    starts = range(0, len(documents), batch_size)
+    began = last_report = time.perf_counter()
+    done_rows = 0
+
+    def add(start: int, vectors) -> None:
+        nonlocal store, done_rows, last_report
+        batch = documents[start:start + batch_size]
+        pairs = list(zip((d.page_content for d in batch), np.asarray(vectors, dtype=np.float32).tolist()))
+        metadatas = [d.metadata for d in batch]
+        batch_ids = ids[start:start + batch_size]
+        if store is None:
+            store = FAISS.from_embeddings(pairs, embeddings, metadatas=metadatas, ids=batch_ids)
+        else:
+            store.add_embeddings(pairs, metadatas=metadatas, ids=batch_ids)
+        done_rows += len(batch)
+        now = time.perf_counter()
+        if now - last_report >= PROGRESS_EVERY_SECONDS:
+            last_report = now
+            print(f"--- Index build: {done_rows:,}/{len(documents):,} rows, {done_rows / (now - began):,.0f} rows/sec ---")
+
+    workers = max(1, min(workers, len(starts) // MIN_BATCHES_FOR_WORKERS))
+    if workers == 1:
+        for start in starts:
+            add(start, embeddings.embed_documents([d.page_content for d in documents[start:start + batch_size]]))
+    else:
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_worker, initargs=(model_name, threads)) as pool:
+            # At most two batches per worker in flight, so memory stays flat however large the CSV
+            queue = iter(starts)
+            running = {}
+            for start in queue:
+                running[pool.submit(_embed_batch, [d.page_content for d in documents[start:start + batch_size]])] = start
+                if len(running) >= 2 * workers:
+                    break
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    add(running.pop(future), future.result())
+                    start = next(queue, None)
+                    if start is not None:
+                        running[pool.submit(_embed_batch, [d.page_content for d in documents[start:start + batch_size]])] = start
+
+    elapsed = time.perf_counter() - began
+    print(f"--- Index build: {done_rows:,} rows embedded in {elapsed:.1f}s with {workers} worker(s) "
+          f"({done_rows / elapsed if elapsed > 0 else 0:,.0f} rows/sec) ---")
+    return store
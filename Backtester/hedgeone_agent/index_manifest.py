@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from .config import EMBEDDING_MODEL_NAME, INDEX_BUILD_BATCH_SIZE, INDEX_BUILD_WORKERS
+from .index_builder import add_to_index
+
+# --- INCREMENTAL FAISS MAINTENANCE ---
+# Every document is stored under a content hash of its text and metadata, and
+# a manifest of those hashes (plus the embedding model) is saved next to the
+# index. On sync the source rows are hashed again and diffed against the
+# manifest: only new or changed rows are embedded and added, rows that
+# disappeared are deleted, and an unchanged source costs one hash pass. An
+# index without a manifest, with a different model, or whose ids no longer
+# match its manifest is rebuilt from scratch once.
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def document_id(doc: Document) -> str:
+    """ Content hash of one document (page content + metadata). """
+    payload = json.dumps([doc.page_content, doc.metadata], sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def read_manifest(index_path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(index_path, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("version") == MANIFEST_VERSION else None
+
+
+def write_manifest(index_path: str, ids: List[str], model_name: str = EMBEDDING_MODEL_NAME) -> None:
+    """ Writes the manifest atomically, so a crash never leaves a half-written one. """
+    path = os.path.join(index_path, MANIFEST_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump({"version": MANIFEST_VERSION, "embedding_model": model_name, "ids": sorted(ids)}, f)
+    os.replace(path + ".tmp", path)
+
+
+def sync_vector_store(index_path: str, documents: List[Document], embeddings,
+                      model_name: str = EMBEDDING_MODEL_NAME, batch_size: int = INDEX_BUILD_BATCH_SIZE,
+                      workers: int = INDEX_BUILD_WORKERS) -> Tuple[FAISS, Dict[str, int]]:
+    """
+    Brings the index at `index_path` in line with `documents`, embedding
+    only what changed (`batch_size` rows at a time over `workers`
+    processes, see add_to_index), and saves it. Returns the store and the
+    counts {"added", "removed", "unchanged"} ("rebuilt": 1 on a full build).
+    """
+    # Duplicate rows collapse onto one id
+    by_id = {}
+    for doc in documents:
+        by_id.setdefault(document_id(doc), doc)
+
+    manifest = read_manifest(index_path)
+    store = None
+    if manifest is not None and manifest.get("embedding_model") == model_name:
+        try:
+            # allow_dangerous_deserialization kept for compatibility with older saved indexes
+            store = FAISS.load_local(index_path, embeddings, allow_dangerous_deserialization=True)
+        except Exception as e:
+            print(f"Could not load '{index_path}' ({e}); rebuilding.")
+        if store is not None and set(store.index_to_docstore_id.values()) != set(manifest["ids"]):
+            print(f"'{index_path}' does not match its manifest; rebuilding.")
+            store = None
+
+    if store is None:
+        print(f"Embedding {len(by_id)} rows into '{index_path}'...")
+        store = add_to_index(None, list(by_id), list(by_id.values()), embeddings,
+                             batch_size=batch_size, workers=workers, model_name=model_name)
+        counts = {"added": len(by_id), "removed": 0, "unchanged": 0, "rebuilt": 1}
+    else:
+        indexed = set(manifest["ids"])
+        added = [i for i in by_id if i not in indexed]
+        removed = [i for i in indexed if i not in by_id]
+        counts = {"added": len(added), "removed": len(removed), "unchanged": len(indexed) - len(removed), "rebuilt": 0}
+        if not added and not removed:
+            return store, counts
+        print(f"Updating '{index_path}': +{len(added)} / -{len(removed)} rows...")
+        if removed:
+            store.delete(removed)
+        if added:
+            store = add_to_index(store, added, [by_id[i] for i in added], embeddings,
+                                 batch_size=batch_size, workers=workers, model_name=model_name)
+
+    store.save_local(index_path)
+    write_manifest(index_path, list(by_id), model_name)
+    return store, counts
@@ -0,0 +1,106 @@
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from . import indicators as ind
+from .config import INDICATOR_CACHE_MAX_MB
+
+# --- SHARED INDICATOR CACHE ---
+# Indicator series keyed by (data fingerprint, indicator, params) and kept in
+# a process-wide LRU bounded by memory, so e.g. SMA(50) on a given feed is
+# computed once per process no matter how many backtests ask for it.
+# Frames are treated as immutable once handed to a backtest.
+
+Series = Union[np.ndarray, Tuple[np.ndarray, ...]]
+
+# name -> function(df, **params) returning one array or a tuple of arrays
+INDICATOR_FUNCTIONS: Dict[str, Callable[..., Series]] = {
+    "sma": lambda df, period, column="Close": ind.sma(df[column].to_numpy(dtype=float), int(period)),
+    "ema": lambda df, period, column="Close": ind.ema(df[column].to_numpy(dtype=float), int(period)),
+    "rsi": lambda df, period, column="Close": ind.rsi(df[column].to_numpy(dtype=float), int(period)),
+    "highest": lambda df, period, column="High": ind.highest(df[column].to_numpy(dtype=float), int(period)),
+    "lowest": lambda df, period, column="Low": ind.lowest(df[column].to_numpy(dtype=float), int(period)),
+    "macd": lambda df, fast, slow, signal: ind.macd(df["Close"].to_numpy(dtype=float), int(fast), int(slow), int(signal)),
+    "bollinger": lambda df, period, devfactor: ind.bollinger(df["Close"].to_numpy(dtype=float), int(period), float(devfactor)),
+    "stochastic": lambda df, period, period_dfast, period_dslow: ind.stochastic(
+        df["High"].to_numpy(dtype=float), df["Low"].to_numpy(dtype=float), df["Close"].to_numpy(dtype=float),
+        int(period), int(period_dfast), int(period_dslow),
+    ),
+}
+
+
+def _nbytes(value: Series) -> int:
+    return sum(a.nbytes for a in value) if isinstance(value, tuple) else value.nbytes
+
+
+class IndicatorCache:
+    """ Thread-safe LRU of indicator arrays, evicting least-recently-used entries past `max_bytes`. """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.enabled = True
+        self._entries: "OrderedDict[Tuple, Series]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._fingerprints: Dict[int, Tuple[weakref.ref, str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def fingerprint(self, df: pd.DataFrame) -> str:
+        """ Content hash of a frame (index + values), memoised per live frame object. """
+        with self._lock:
+            memo = self._fingerprints.get(id(df))
+            if memo is not None and memo[0]() is df:
+                return memo[1]
+        digest = hashlib.blake2b(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes(), digest_size=16).hexdigest()
+        with self._lock:
+            self._fingerprints = {k: v for k, v in self._fingerprints.items() if v[0]() is not None}
+            self._fingerprints[id(df)] = (weakref.ref(df), digest)
+        return digest
+
+    def get(self, df: pd.DataFrame, name: str, **params) -> Series:
+        """ Returns the cached indicator series, computing and storing it on a miss. """
+        key = (self.fingerprint(df), name, tuple(sorted(params.items())))
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        value = INDICATOR_FUNCTIONS[name](df, **params)
+        for array in (value if isinstance(value, tuple) else (value,)):
+            array.flags.writeable = False  # shared between callers
+        size = _nbytes(value)
+        with self._lock:
+            if key not in self._entries and size <= self.max_bytes:
+                self._entries[key] = value
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._bytes -= _nbytes(evicted)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries), "bytes": self._bytes, "hits": self.hits,
+                "misses": self.misses, "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+# Process-wide instance used by strategies and the vectorized engine
+indicator_cache = IndicatorCache(INDICATOR_CACHE_MAX_MB * 1024 * 1024)
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+# --- NumPy indicator implementations ---
+# Each function mirrors the backtrader indicator of the same name: values are
+# NaN until the indicator's minimum period is reached, and recursive averages
+# are seeded with a simple average exactly as backtrader seeds them.
+
+
+def sma(values: np.ndarray, period: int) -> np.ndarray:
+    """ Simple moving average (bt.indicators.SimpleMovingAverage). """
+    values = np.asarray(values, dtype=float)
+    out = np.full(len(values), np.nan)
+    if period <= len(values):
+        windows = np.lib.stride_tricks.sliding_window_view(values, period)
+        out[period - 1:] = windows.mean(axis=1)
+    return out
+
+
+def _seeded_smoothing(values: np.ndarray, period: int, alpha: float) -> np.ndarray:
+    """
+    Exponential smoothing seeded with the SMA of the first `period` valid
+    values (bt.indicators.ExponentialSmoothing). Leading NaNs are skipped.
+    """
+    values = np.asarray(values, dtype=float)
+    out = np.full(len(values), np.nan)
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) < period:
+        return out
+    first = valid[0]
+    seed_idx = first + period - 1
+    tail = values[seed_idx:].copy()
+    tail[0] = values[first:seed_idx + 1].mean()
+    out[seed_idx:] = pd.Series(tail).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return out
+
+
+def ema(values: np.ndarray, period: int) -> np.ndarray:
+    """ Exponential moving average (bt.indicators.EMA), alpha = 2 / (period + 1). """
+    return _seeded_smoothing(values, period, 2.0 / (period + 1.0))
+
+
+def smma(values: np.ndarray, period: int) -> np.ndarray:
+    """ Wilder's smoothed moving average (bt.indicators.SmoothedMovingAverage). """
+    return _seeded_smoothing(values, period, 1.0 / period)
+
+
+def highest(values: np.ndarray, period: int) -> np.ndarray:
+    """ Rolling maximum over `period` bars including the current one (bt.indicators.Highest). """
+    values = np.asarray(values, dtype=float)
+    out = np.full(len(values), np.nan)
+    if period <= len(values):
+        out[period - 1:] = np.lib.stride_tricks.sliding_window_view(values, period).max(axis=1)
+    return out
+
+
+def lowest(values: np.ndarray, period: int) -> np.ndarray:
+    """ Rolling minimum over `period` bars including the current one (bt.indicators.Lowest). """
+    values = np.asarray(values, dtype=float)
+    out = np.full(len(values), np.nan)
+    if period <= len(values):
+        out[period - 1:] = np.lib.stride_tricks.sliding_window_view(values, period).min(axis=1)
+    return out
+
+
+def shift(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    """ Returns values delayed by `periods` bars (backtrader's line(-periods)). """
+    values = np.asarray(values, dtype=float)
+    out = np.full(len(values), np.nan)
+    if periods < len(values):
+        out[periods:] = values[:len(values) - periods]
+    return out
+
+
+def rsi(close: np.ndarray, period: int) -> np.ndarray:
+    """ Relative Strength Index with Wilder smoothing (bt.indicators.RSI). """
+    change = np.diff(np.asarray(close, dtype=float), prepend=np.nan)
+    up = smma(np.where(np.isnan(change), np.nan, np.maximum(change, 0.0)), period)
+    down = smma(np.where(np.isnan(change), np.nan, np.maximum(-change, 0.0)), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100.0 - 100.0 / (1.0 + up / down)
+
+
+def macd(close: np.ndarray, fast: int, slow: int, signal: int):
+    """ Returns (macd, signal) lines as computed by bt.indicators.MACD. """
+    macd_line = ema(close, fast) - ema(close, slow)
+    return macd_line, ema(macd_line, signal)
+
+
+def bollinger(close: np.ndarray, period: int, devfactor: float):
+    """ Returns (mid, top, bot) bands using the population standard deviation. """
+    close = np.asarray(close, dtype=float)
+    mid = sma(close, period)
+    std = np.sqrt(np.maximum(sma(close * close, period) - mid * mid, 0.0))
+    return mid, mid + devfactor * std, mid - devfactor * std
+
+
+def stochastic(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int, period_dfast: int, period_dslow: int):
+    """ Returns (percK, percD) of the slow stochastic (bt.indicators.Stochastic). """
+    hh, ll = highest(high, period), lowest(low, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        raw_k = 100.0 * (np.asarray(close, dtype=float) - ll) / (hh - ll)
+    perc_k = _nan_aware_sma(raw_k, period_dfast)
+    return perc_k, _nan_aware_sma(perc_k, period_dslow)
+
+
+def _nan_aware_sma(values: np.ndarray, period: int) -> np.ndarray:
+    """ SMA of a line that only becomes valid after a leading run of NaNs. """
+    values = np.asarray(values, dtype=float)
+    out = np.full(len(values), np.nan)
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid):
+        out[valid[0]:] = sma(values[valid[0]:], period)
+    return out
+
+
+def crossover(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    +1 / -1 / 0 cross signal (bt.indicators.CrossOver). Like backtrader, the
+    "before" side uses the last non-zero difference, so touching and then
+    crossing still counts as a cross.
+    """
+    diff = np.asarray(a, dtype=float) - np.asarray(b, dtype=float)
+    valid = np.flatnonzero(~np.isnan(diff))
+    out = np.full(len(diff), np.nan)
+    if len(valid) < 2:
+        return out
+    first = valid[0]
+    nzd = np.where(diff == 0.0, np.nan, diff)
+    nzd[first] = diff[first]
+    nzd = pd.Series(nzd).ffill().to_numpy()
+    prev = shift(nzd, 1)
+    up = (prev < 0.0) & (diff > 0.0)
+    down = (prev > 0.0) & (diff < 0.0)
+    out[first + 1:] = (up.astype(float) - down.astype(float))[first + 1:]
+    return out
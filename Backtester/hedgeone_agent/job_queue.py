@@ -0,0 +1,308 @@
+import multiprocessing
+import multiprocessing.connection
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .config import JOB_WORKERS, JOB_TIMEOUT_SECONDS
+
+# --- BACKGROUND BACKTEST JOBS ---
+# A local job queue in front of a pool of pre-warmed worker processes (each
+# imports backtrader and the strategies once, before its first job). submit()
+# returns a job id immediately; workers report bars processed / total bars
+# while Cerebro runs, and the queue keeps every job's state for polling.
+# Cancelling or timing out a running job terminates its worker, which is then
+# replaced, so a stuck backtest never blocks the CLI or the Streamlit app.
+# Each worker reports over its own event pipe: terminating a process that is
+# writing to a shared multiprocessing.Queue can leave the queue corrupt or its
+# lock held, whereas a killed worker here only breaks its own pipe.
+
+JOB_STATES = ("queued", "running", "done", "error", "cancelled", "timeout")
+FINISHED_STATES = {"done", "error", "cancelled", "timeout"}
+
+
+def _worker_main(conn, events, target: Optional[Callable[..., str]]) -> None:
+    """
+    Worker process loop: pre-warm, then run (job_id, kwargs) tasks until told
+    to stop. Jobs run `target` (run_symbols_backtest_internal by default).
+    """
+    from . import backtest_engine
+
+    target = target or backtest_engine.run_symbols_backtest_internal
+    events.send(("ready", None, os.getpid()))
+    while True:
+        task = conn.recv()
+        if task is None:
+            break
+        job_id, kwargs = task
+        backtest_engine.set_progress_hook(lambda done, total: events.send(("progress", job_id, (done, total))))
+        try:
+            events.send(("done", job_id, target(**kwargs)))
+        except Exception as e:
+            events.send(("error", job_id, f"{type(e).__name__}: {e}"))
+        finally:
+            backtest_engine.set_progress_hook(None)
+
+
+class _Worker:
+    """ One worker process with its task pipe (queue -> worker) and its own event pipe (worker -> queue). """
+
+    def __init__(self, ctx, target: Optional[Callable[..., str]] = None):
+        self.conn, child_conn = ctx.Pipe()
+        self.events, child_events = ctx.Pipe(duplex=False)
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, child_events, target), daemon=True)
+        self.process.start()
+        # The child holds the only write end, so a dead worker reads as EOF
+        child_conn.close()
+        child_events.close()
+        self.job_id: Optional[str] = None
+        self.events_open = True
+
+    def stop(self, kill: bool = False) -> None:
+        if kill:
+            self.process.terminate()
+        else:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                self.process.terminate()
+        self.process.join(timeout=5)
+        self.conn.close()
+        self.events.close()
+
+
+class JobQueue:
+    """
+    Backtest jobs run by `max_workers` pre-warmed processes; thread-safe.
+    `target` replaces run_symbols_backtest_internal as the job function (a
+    picklable module-level callable taking submit()'s arguments).
+    """
+
+    def __init__(self, max_workers: int = JOB_WORKERS, timeout: float = JOB_TIMEOUT_SECONDS,
+                 target: Optional[Callable[..., str]] = None):
+        self.timeout = timeout
+        self._ctx = multiprocessing.get_context("spawn")
+        self._target = target
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._pending: deque = deque()
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._closed = False
+        self._workers = [_Worker(self._ctx, self._target) for _ in range(max(1, max_workers))]
+        threading.Thread(target=self._collect, name="job-queue-collect", daemon=True).start()
+        threading.Thread(target=self._supervise, name="job-queue-supervise", daemon=True).start()
+
+    # --- Public API ---
+    def submit(self, strategy_id: str, symbols: List[str], start_date: str, end_date: str,
+               params_dict: Dict[str, Any], resolution: str = "D", timeout: Optional[float] = None) -> str:
+        """ Queues one backtest and returns its job id without waiting for it. """
+        job_id = uuid.uuid4().hex[:8]
+        kwargs = {
+            "strategy_id": strategy_id, "symbols": list(symbols), "start_date": start_date,
+            "end_date": end_date, "params_dict": dict(params_dict or {}), "resolution": resolution,
+        }
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Job queue is shut down.")
+            self._jobs[job_id] = {
+                "job_id": job_id, "status": "queued", "strategy_id": strategy_id, "symbols": list(symbols),
+                "submitted": time.time(), "started": None, "finished": None,
+                "bars": 0, "total_bars": None, "result": None, "error": None,
+                "timeout": self.timeout if timeout is None else timeout,
+                "_kwargs": kwargs,
+            }
+            self._pending.append(job_id)
+        return job_id
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """ A snapshot of one job (None if the id is unknown). """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._public(job) if job is not None else None
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        """ Snapshots of every job, oldest first. """
+        with self._lock:
+            return [self._public(job) for job in self._jobs.values()]
+
+    def cancel(self, job_id: str) -> bool:
+        """ Cancels a queued or running job; False if it is unknown or already finished. """
+        return self._finish_early(job_id, "cancelled", "Cancelled by user.")
+
+    def wait(self, job_id: str, timeout: Optional[float] = None, poll: float = 0.2) -> Optional[Dict[str, Any]]:
+        """ Blocks until the job finishes or `timeout` seconds pass; returns its latest snapshot. """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.status(job_id)
+            if job is None or job["status"] in FINISHED_STATES:
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                return job
+            time.sleep(poll)
+
+    def watch(self, job_id: str, interval: float = 0.5) -> Iterator[Dict[str, Any]]:
+        """ Yields the job's snapshot whenever its status or progress changes, ending once it finishes. """
+        last = None
+        while True:
+            job = self.status(job_id)
+            if job is None:
+                return
+            key = (job["status"], job["bars"], job["total_bars"])
+            if key != last:
+                last = key
+                yield job
+            if job["status"] in FINISHED_STATES:
+                return
+            time.sleep(interval)
+
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """ Calls `callback(snapshot)` (from a queue thread) whenever a job finishes. """
+        with self._lock:
+            self._listeners.append(callback)
+
+    def shutdown(self) -> None:
+        """ Cancels outstanding jobs and stops the workers. """
+        with self._lock:
+            self._closed = True
+            outstanding = [job_id for job_id, job in self._jobs.items() if job["status"] not in FINISHED_STATES]
+        for job_id in outstanding:
+            self.cancel(job_id)
+        for worker in self._workers:
+            worker.stop()
+
+    # --- Internals ---
+    @staticmethod
+    def _public(job: Dict[str, Any]) -> Dict[str, Any]:
+        snapshot = {key: value for key, value in job.items() if not key.startswith("_")}
+        end = job["finished"] or time.time()
+        snapshot["elapsed"] = end - job["started"] if job["started"] else 0.0
+        return snapshot
+
+    def _notify(self, job: Dict[str, Any]) -> None:
+        snapshot = self._public(job)
+        for callback in list(self._listeners):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"--- Job listener failed: {e} ---")
+
+    def _finish_early(self, job_id: str, status: str, message: str) -> bool:
+        """ Moves a queued/running job to `status`, replacing its worker if it was running. """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] in FINISHED_STATES:
+                return False
+            worker = next((w for w in self._workers if w.job_id == job_id), None)
+            if job_id in self._pending:
+                self._pending.remove(job_id)
+            job.update(status=status, error=message, finished=time.time())
+            if worker is not None and not self._closed:
+                self._workers[self._workers.index(worker)] = _Worker(self._ctx, self._target)
+        if worker is not None:
+            worker.stop(kill=True)
+        print(f"--- Job {job_id} {status} ---")
+        self._notify(job)
+        return True
+
+    def _collect(self) -> None:
+        """ Applies worker events (progress, results) from every worker's pipe to the job table. """
+        while not (self._closed and not any(w.process.is_alive() for w in self._workers)):
+            with self._lock:
+                readers = {w.events: w for w in self._workers if w.events_open}
+            try:
+                ready = multiprocessing.connection.wait(list(readers), timeout=0.2)
+            except (OSError, ValueError):
+                # A pipe was closed under us by a worker being replaced; the next pass skips it
+                continue
+            for reader in ready:
+                try:
+                    event = reader.recv()
+                except (EOFError, OSError):
+                    # That worker died or was stopped; the supervisor deals with its job
+                    readers[reader].events_open = False
+                    continue
+                self._apply(*event)
+
+    def _apply(self, kind: str, job_id: Optional[str], payload: Any) -> None:
+        """ One worker event: "ready", "progress" (bars done, total) or a job's "done" / "error" result. """
+        if kind == "ready":
+            return
+        with self._lock:
+            job = self._jobs.get(job_id)
+            # Events from a job that was cancelled or timed out are stale
+            if job is None or job["status"] != "running":
+                return
+            if kind == "progress":
+                job["bars"], job["total_bars"] = payload
+                return
+            for worker in self._workers:
+                if worker.job_id == job_id:
+                    worker.job_id = None
+            failed = kind == "error" or str(payload).startswith("Error")
+            job.update(
+                status="error" if failed else "done", finished=time.time(),
+                result=None if kind == "error" else payload, error=payload if failed else None,
+            )
+        self._notify(job)
+
+    def _supervise(self) -> None:
+        """ Hands queued jobs to idle workers and enforces timeouts / worker crashes. """
+        while not self._closed:
+            expired, crashed = [], []
+            with self._lock:
+                now = time.time()
+                for i, worker in enumerate(self._workers):
+                    if worker.job_id is None and not worker.process.is_alive():
+                        self._workers[i] = worker = _Worker(self._ctx, self._target)
+                    if worker.job_id is None and self._pending:
+                        job_id = self._pending.popleft()
+                        job = self._jobs[job_id]
+                        job.update(status="running", started=now)
+                        worker.job_id = job_id
+                        worker.conn.send((job_id, job["_kwargs"]))
+                    elif worker.job_id is not None:
+                        job = self._jobs[worker.job_id]
+                        if job["timeout"] and now - job["started"] > job["timeout"]:
+                            expired.append(worker.job_id)
+                        elif not worker.process.is_alive():
+                            crashed.append(worker.job_id)
+            for job_id in expired:
+                self._finish_early(job_id, "timeout", f"Timed out after {self._jobs[job_id]['timeout']:g}s.")
+            for job_id in crashed:
+                self._finish_early(job_id, "error", "Worker process exited unexpectedly.")
+            time.sleep(0.1)
+
+
+def format_progress(job: Dict[str, Any]) -> str:
+    """ "running, 1,000/2,609 bars (38%), 4.3s elapsed" style progress of a job. """
+    if job["status"] != "running":
+        return job["status"]
+    if job["total_bars"]:
+        return f"running, {job['bars']:,}/{job['total_bars']:,} bars ({job['bars'] / job['total_bars']:.0%}), {job['elapsed']:.1f}s elapsed"
+    return f"running, {job['bars']:,} bars, {job['elapsed']:.1f}s elapsed"
+
+
+def format_job(job: Dict[str, Any]) -> str:
+    """ Status of a job for the agent / UI, with its results once done. """
+    head = f"Job {job['job_id']} ({job['strategy_id']} on {', '.join(job['symbols'])}): {format_progress(job)}"
+    if job["status"] == "done":
+        return f"{head} in {job['elapsed']:.1f}s.\n{job['result']}"
+    if job["error"]:
+        return f"{head}. {job['error']}"
+    return head
+
+
+# --- Shared queue (created on first use, so importing this module starts no processes) ---
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue()
+        return _job_queue
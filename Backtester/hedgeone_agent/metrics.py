@@ -0,0 +1,92 @@
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# --- BACKTEST METRICS ---
+# Every engine reports its scalar metrics from the same two inputs, computed
+# here in one vectorized pass: the per-bar equity curve and the closed-trade
+# ledger (plus the entry times of trades still open at the end). Sharpe, max
+# drawdown, trade counts and win rate keep the backtrader analyzers' defaults
+# so stored and cached results stay comparable.
+
+
+def years_spanned(index: pd.DatetimeIndex) -> float:
+    return (index[-1] - index[0]).total_seconds() / (365.25 * 86400) if len(index) > 1 else 0.0
+
+
+def sharpe_ratio(index: pd.DatetimeIndex, value: np.ndarray, start_cash: float, riskfreerate: float = 0.01) -> Optional[float]:
+    """ bt.analyzers.SharpeRatio defaults: yearly returns, population std, not annualized. """
+    year_end = pd.Series(value, index=index).groupby(index.year).last().to_numpy()
+    returns = year_end / np.concatenate(([start_cash], year_end[:-1])) - 1.0
+    excess = returns - riskfreerate
+    std = excess.std()
+    if len(excess) == 0 or std == 0.0:
+        return None
+    return float(excess.mean() / std)
+
+
+def sortino_ratio(value: np.ndarray, periods_per_year: float) -> Optional[float]:
+    """ Annualised mean bar return over downside deviation (zero target). """
+    if len(value) < 2 or periods_per_year <= 0:
+        return None
+    returns = value[1:] / value[:-1] - 1.0
+    downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2))
+    if downside == 0.0:
+        return None
+    return float(returns.mean() / downside * np.sqrt(periods_per_year))
+
+
+def max_drawdown(value: np.ndarray) -> Dict[str, float]:
+    """ Deepest peak-to-trough drop in percent and the longest run of bars spent below a prior peak. """
+    if not len(value):
+        return {"max_drawdown_pct": 0.0, "max_drawdown_bars": 0}
+    peak = np.maximum.accumulate(value)
+    at_peak = np.flatnonzero(value >= peak)
+    underwater = np.diff(np.append(at_peak, len(value))) - 1
+    return {
+        "max_drawdown_pct": float((100.0 * (peak - value) / peak).max()),
+        "max_drawdown_bars": int(underwater.max()),
+    }
+
+
+def exposure_pct(index: pd.DatetimeIndex, trades: pd.DataFrame, open_entries: Sequence[pd.Timestamp] = ()) -> float:
+    """ Percent of bars on which at least one position was held (from its entry bar up to its exit bar). """
+    if not len(index):
+        return 0.0
+    entries = np.concatenate([pd.DatetimeIndex(trades["entry_time"]).to_numpy(), pd.DatetimeIndex(open_entries).to_numpy()])
+    exits = pd.DatetimeIndex(trades["exit_time"]).to_numpy()
+    held = np.zeros(len(index) + 1)
+    np.add.at(held, index.searchsorted(entries), 1)
+    np.add.at(held, index.searchsorted(exits), -1)
+    return float((np.cumsum(held[:-1]) > 0).mean() * 100)
+
+
+def compute_metrics(equity_curve: pd.Series, trades: pd.DataFrame, start_cash: float,
+                    open_entries: Sequence[pd.Timestamp] = ()) -> Dict[str, Any]:
+    """ Scalar metrics of one run from its equity curve, closed-trade ledger and still-open entries. """
+    index = pd.DatetimeIndex(equity_curve.index)
+    value = equity_curve.to_numpy(dtype=float)
+    final_value = float(value[-1]) if len(value) else start_cash
+    years = years_spanned(index)
+
+    pnl = trades["pnl_comm"].to_numpy(dtype=float)
+    # TradeAnalyzer counts open trades in the total and a zero P&L trade as won
+    total_trades = len(pnl) + len(open_entries)
+    won_trades = int((pnl >= 0.0).sum())
+    gross_loss = -pnl[pnl < 0.0].sum()
+
+    return {
+        "start_cash": start_cash,
+        "final_value": final_value,
+        "total_return_pct": (final_value - start_cash) / start_cash * 100,
+        "cagr_pct": ((final_value / start_cash) ** (1.0 / years) - 1.0) * 100 if years > 0 and final_value > 0 else None,
+        "sharpe": sharpe_ratio(index, value, start_cash),
+        "sortino": sortino_ratio(value, (len(value) - 1) / years if years > 0 else 0.0),
+        **max_drawdown(value),
+        "total_trades": total_trades,
+        "won_trades": won_trades,
+        "win_rate": won_trades / total_trades * 100 if total_trades > 0 else 0,
+        "profit_factor": float(pnl[pnl > 0.0].sum() / gross_loss) if gross_loss > 0 else None,
+        "exposure_pct": exposure_pct(index, trades, open_entries),
+    }
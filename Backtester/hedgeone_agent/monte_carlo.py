@@ -0,0 +1,137 @@
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from .results import BacktestResult
+from .metrics import years_spanned
+
+# --- MONTE CARLO ROBUSTNESS ---
+# Resamples one finished backtest thousands of times in batched NumPy instead
+# of re-running Cerebro, and reports confidence intervals for final value,
+# max drawdown and Sharpe:
+#   "shuffle"   - the closed trades' P&L in random order (path dependence);
+#   "bootstrap" - moving-block bootstrap of the equity curve's bar returns;
+#   "skip"      - each closed trade dropped with probability `skip_prob`.
+# Trade-based methods rebuild equity from closed trades only, so a position
+# still open at the end of the run is left out of them.
+
+METHODS = ("shuffle", "bootstrap", "skip")
+MC_METRICS = ("final_value", "max_drawdown_pct", "sharpe")
+
+
+def _path_metrics(equity: np.ndarray, periods_per_year: float) -> Dict[str, np.ndarray]:
+    """ Final value, max drawdown % and annualised Sharpe (zero risk-free rate) of each row of `equity`. """
+    peak = np.maximum.accumulate(equity, axis=1)
+    drawdown = (100.0 * (peak - equity) / peak).max(axis=1)
+    returns = equity[:, 1:] / equity[:, :-1] - 1.0
+    std = returns.std(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 0, returns.mean(axis=1) / std * np.sqrt(periods_per_year), np.nan)
+    return {"final_value": equity[:, -1], "max_drawdown_pct": drawdown, "sharpe": sharpe}
+
+
+def _trade_equity(pnl: np.ndarray, start_cash: float) -> np.ndarray:
+    """ Equity after each closed trade, one row per resample (pnl is (n, trades)). """
+    equity = np.empty((pnl.shape[0], pnl.shape[1] + 1))
+    equity[:, 0] = start_cash
+    np.cumsum(pnl, axis=1, out=equity[:, 1:])
+    equity[:, 1:] += start_cash
+    return equity
+
+
+def _resample_batch(method: str, n: int, rng: np.random.Generator, pnl: np.ndarray, returns: np.ndarray,
+                    start_cash: float, block_size: int, skip_prob: float) -> np.ndarray:
+    """ `n` resampled equity paths for one method. """
+    if method == "shuffle":
+        return _trade_equity(rng.permuted(np.broadcast_to(pnl, (n, len(pnl))), axis=1), start_cash)
+    if method == "skip":
+        return _trade_equity(pnl * (rng.random((n, len(pnl))) >= skip_prob), start_cash)
+    # Moving-block bootstrap: stitch random runs of `block_size` consecutive returns
+    n_blocks = -(-len(returns) // block_size)
+    starts = rng.integers(0, len(returns) - block_size + 1, size=(n, n_blocks))
+    index = (starts[:, :, None] + np.arange(block_size)).reshape(n, -1)[:, :len(returns)]
+    equity = np.empty((n, len(returns) + 1))
+    equity[:, 0] = start_cash
+    np.cumprod(1.0 + returns[index], axis=1, out=equity[:, 1:])
+    equity[:, 1:] *= start_cash
+    return equity
+
+
+def run_monte_carlo(result: BacktestResult, n_resamples: int = 10_000, methods: Iterable[str] = METHODS,
+                    confidence: float = 0.95, block_size: Optional[int] = None, skip_prob: float = 0.1,
+                    seed: Optional[int] = None, batch_size: int = 1_000) -> Dict[str, Any]:
+    """
+    Confidence intervals of one backtest under each resampling method. Returns
+    {"n_resamples", "confidence", "methods": {method: {metric: {"observed",
+    "mean", "low", "median", "high"}, "prob_loss": ..}}}; methods that lack
+    the data they need (no closed trades, too short a curve) are omitted.
+    Resamples are generated `batch_size` at a time to bound memory.
+    """
+    methods = list(methods)
+    unknown = [m for m in methods if m not in METHODS]
+    if unknown:
+        raise ValueError(f"Unknown Monte Carlo method(s) {unknown}; use {METHODS}.")
+    if not 0.0 < confidence < 1.0:
+        raise ValueError("confidence must be between 0 and 1.")
+
+    start_cash = float(result.metrics.get("start_cash") or result.equity_curve.iloc[0])
+    curve = result.equity_curve.to_numpy(dtype=float)
+    returns = curve[1:] / curve[:-1] - 1.0 if len(curve) > 1 else np.empty(0)
+    pnl = result.trades["pnl_comm"].to_numpy(dtype=float) if len(result.trades) else np.empty(0)
+    years = years_spanned(pd.DatetimeIndex(result.equity_curve.index))
+    block_size = block_size or max(1, int(round(np.sqrt(len(returns)))))
+    rng = np.random.default_rng(seed)
+    tail = (1.0 - confidence) / 2.0 * 100.0
+
+    report: Dict[str, Any] = {"n_resamples": n_resamples, "confidence": confidence, "methods": {}}
+    for method in methods:
+        if method == "bootstrap":
+            if len(returns) < 2 or years <= 0:
+                continue
+            observed_equity, periods = curve, len(returns) / years
+            block = min(block_size, len(returns))
+        else:
+            if len(pnl) < 2 or years <= 0:
+                continue
+            observed_equity, periods, block = _trade_equity(pnl[None, :], start_cash)[0], len(pnl) / years, 0
+        observed = {name: float(values[0]) for name, values in _path_metrics(observed_equity[None, :], periods).items()}
+
+        samples = {name: [] for name in MC_METRICS}
+        for done in range(0, n_resamples, batch_size):
+            paths = _resample_batch(method, min(batch_size, n_resamples - done), rng, pnl, returns, start_cash, block, skip_prob)
+            for name, values in _path_metrics(paths, periods).items():
+                samples[name].append(values)
+
+        stats: Dict[str, Any] = {}
+        for name in MC_METRICS:
+            values = np.concatenate(samples[name])
+            values = values[~np.isnan(values)]
+            low, median, high = np.percentile(values, [tail, 50.0, 100.0 - tail]) if len(values) else (np.nan,) * 3
+            stats[name] = {
+                "observed": observed[name],
+                "mean": float(values.mean()) if len(values) else np.nan,
+                "low": float(low), "median": float(median), "high": float(high),
+            }
+        stats["prob_loss"] = float((np.concatenate(samples["final_value"]) < start_cash).mean())
+        report["methods"][method] = stats
+    return report
+
+
+def format_monte_carlo(report: Dict[str, Any]) -> str:
+    """ Renders a run_monte_carlo report as the block appended to the backtest summary. """
+    if not report["methods"]:
+        return "Monte Carlo: not enough closed trades or bars to resample."
+    pct = report["confidence"] * 100
+    lines = [f"Monte Carlo ({report['n_resamples']:,} resamples, {pct:g}% intervals):"]
+    labels = {"shuffle": "Trade order shuffled", "bootstrap": "Block-bootstrapped returns", "skip": "Random trades skipped"}
+    for method, stats in report["methods"].items():
+        fv, dd, sr = stats["final_value"], stats["max_drawdown_pct"], stats["sharpe"]
+        lines += [
+            f"  {labels[method]}:",
+            f"    Final Value: ₹{fv['low']:,.2f} .. ₹{fv['high']:,.2f} (median ₹{fv['median']:,.2f}, observed ₹{fv['observed']:,.2f})",
+            f"    Max. Drawdown: {dd['low']:.2f}% .. {dd['high']:.2f}% (median {dd['median']:.2f}%, observed {dd['observed']:.2f}%)",
+            f"    Sharpe (annualised): {sr['low']:.2f} .. {sr['high']:.2f} (median {sr['median']:.2f}, observed {sr['observed']:.2f})",
+            f"    Probability of a loss: {stats['prob_loss'] * 100:.1f}%",
+        ]
+    return "\n".join(lines)
@@ -0,0 +1,120 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Import from our package
+from .strategies import STRATEGY_METADATA_LIST
+from .backtest_engine import run_backtest_metrics
+from .results import ASCENDING_METRICS
+from .config import SWEEP_ENGINE, SWEEP_MAX_COMBINATIONS
+
+# Metrics reported for every combination
+SWEEP_METRICS = ["final_value", "total_return_pct", "sharpe", "max_drawdown_pct", "total_trades", "win_rate"]
+
+_STRATEGY_METADATA = {s["strategy_id"]: s for s in STRATEGY_METADATA_LIST}
+
+
+def _expand_range(spec: Any, param_type: str) -> List[Any]:
+    """ Turns a {"min", "max", "step"} dict, a list or a scalar into a list of values. """
+    cast = int if param_type == "int" else float
+    if isinstance(spec, dict):
+        lo, hi, step = cast(spec["min"]), cast(spec["max"]), cast(spec.get("step", 1))
+        if step <= 0:
+            raise ValueError(f"Sweep step must be positive, got {step}.")
+        values = np.arange(lo, hi + step / 2.0, step)
+        return [cast(round(v, 10)) for v in values]
+    if isinstance(spec, (list, tuple)):
+        return [cast(v) for v in spec]
+    return [cast(spec)]
+
+
+def build_param_grid(strategy_id: str, param_ranges: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Builds every parameter combination for a strategy. Ranges come from the
+    `sweep` entry of each parameter in STRATEGY_METADATA_LIST, overridden by
+    `param_ranges` ({name: {"min", "max", "step"} | [values] | value}).
+    """
+    metadata = _STRATEGY_METADATA.get(strategy_id)
+    if metadata is None:
+        raise ValueError(f"Strategy '{strategy_id}' not found.")
+    param_ranges = dict(param_ranges or {})
+    known = {p["name"] for p in metadata["parameters"]}
+    unknown = set(param_ranges) - known
+    if unknown:
+        raise ValueError(f"Unknown parameter(s) for {strategy_id}: {', '.join(sorted(unknown))}.")
+
+    names, axes = [], []
+    for param in metadata["parameters"]:
+        spec = param_ranges.get(param["name"], param.get("sweep"))
+        if spec is None:
+            continue
+        names.append(param["name"])
+        axes.append(_expand_range(spec, param["type"]))
+
+    n_combinations = int(np.prod([len(axis) for axis in axes])) if axes else 1
+    if n_combinations > SWEEP_MAX_COMBINATIONS:
+        raise ValueError(f"Sweep has {n_combinations} combinations; the limit is {SWEEP_MAX_COMBINATIONS}. Narrow the ranges.")
+    return [dict(zip(names, combo)) for combo in itertools.product(*axes)]
+
+
+# --- Worker-side state: feeds are sent once per worker, not once per combination ---
+_WORKER_FEEDS: List[pd.DataFrame] = []
+
+
+def _init_worker(data_feeds: List[pd.DataFrame]) -> None:
+    global _WORKER_FEEDS
+    _WORKER_FEEDS = data_feeds
+
+
+def _evaluate(task) -> Dict[str, Any]:
+    strategy_id, params, engine = task
+    try:
+        metrics = run_backtest_metrics(strategy_id, _WORKER_FEEDS, params, engine)
+        row = {name: metrics[name] for name in SWEEP_METRICS}
+    except Exception as e:
+        row = {"error": str(e)}
+    return {**params, **row}
+
+
+def rank_results(rows: List[Dict[str, Any]], rank_by: str, top_n: Optional[int] = None) -> pd.DataFrame:
+    """ Sorts sweep rows best-first by `rank_by`; missing metrics (e.g. Sharpe None) rank last. """
+    table = pd.DataFrame(rows)
+    if rank_by not in table.columns:
+        return table.head(top_n) if top_n else table
+    table[rank_by] = pd.to_numeric(table[rank_by], errors="coerce")
+    table = table.sort_values(rank_by, ascending=rank_by in ASCENDING_METRICS, na_position="last", kind="stable")
+    table = table.reset_index(drop=True)
+    return table.head(top_n) if top_n else table
+
+
+def run_parameter_sweep(
+    strategy_id: str,
+    data_feeds: List[pd.DataFrame],
+    param_ranges: Optional[Dict[str, Any]] = None,
+    rank_by: str = "sharpe",
+    top_n: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    engine: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Backtests every parameter combination across a process pool (all cores
+    by default) and returns a table of params + metrics ranked by `rank_by`.
+    """
+    grid = build_param_grid(strategy_id, param_ranges)
+    engine = engine or SWEEP_ENGINE
+    tasks = [(strategy_id, params, engine) for params in grid]
+    workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    print(f"--- Sweep: {len(tasks)} combinations of {strategy_id} on {workers} worker(s) ---")
+
+    if workers <= 1:
+        _init_worker(data_feeds)
+        rows = [_evaluate(task) for task in tasks]
+    else:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data_feeds,)) as pool:
+            rows = list(pool.map(_evaluate, tasks, chunksize=chunksize))
+    return rank_results(rows, rank_by, top_n)
@@ -0,0 +1,79 @@
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+# --- CALENDAR-ALIGNED PANELS ---
+# Cross-sectional helpers over several OHLCV frames that may trade on
+# different calendars (holidays, suspensions, late listings).
+
+MISSING_POLICIES = ("mask", "ffill")
+CALENDARS = ("union", "intersection")
+
+
+def close_panel(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """ Close prices of every frame as columns over the union of their calendars (NaN where a frame has no bar). """
+    return pd.concat([df['Close'].rename(i) for i, df in enumerate(frames)], axis=1).sort_index()
+
+
+def basket_return(frames: List[pd.DataFrame], calendar: pd.DatetimeIndex, policy: str = "mask") -> np.ndarray:
+    """
+    Equal-weight average one-bar return of `frames`, one value per bar of
+    `calendar`. Each frame's return on a bar is measured from its previous
+    available bar. Missing bars are explicit:
+      "mask"  - a frame without a bar on a date is left out of that date's average;
+      "ffill" - its price is carried forward, so it counts as a zero return.
+    Dates where no frame contributes (e.g. before any listing) are NaN.
+    """
+    if policy not in MISSING_POLICIES:
+        raise ValueError(f"Unknown missing-bar policy '{policy}'; use one of {MISSING_POLICIES}.")
+    if not frames:
+        return np.full(len(calendar), np.nan)
+    if policy == "mask":
+        returns = pd.concat([df['Close'].pct_change().rename(i) for i, df in enumerate(frames)], axis=1)
+    else:
+        closes = close_panel(frames)
+        closes = closes.reindex(closes.index.union(calendar)).ffill()
+        returns = closes.pct_change(fill_method=None)
+    # Under "mask", calendar bars no frame has are missing from `returns` and come back NaN
+    average = returns.mean(axis=1, skipna=True)
+    return average.reindex(calendar).to_numpy(dtype=float)
+
+
+def align_frames(frames: List[pd.DataFrame], calendar: str = "union") -> List[pd.DataFrame]:
+    """
+    Reindexes every frame onto one shared calendar so Cerebro can step the
+    feeds in lockstep instead of synchronising them bar by bar at run time.
+      calendar "union"        - every date any frame trades;
+      calendar "intersection" - only dates every frame trades.
+    Each frame starts at its own first bar, so a late listing stays in
+    prenext until it trades, exactly as with unaligned feeds; after that a
+    missing date gets a flat zero-volume bar at the last close. No frame
+    ever gets a NaN bar.
+    """
+    if calendar not in CALENDARS:
+        raise ValueError(f"Unknown calendar '{calendar}'; use one of {CALENDARS}.")
+    if len(frames) < 2:
+        return list(frames)
+    indexes = [df.index for df in frames]
+    dates = indexes[0]
+    for index in indexes[1:]:
+        dates = dates.intersection(index) if calendar == "intersection" else dates.union(index)
+    dates = dates.sort_values()
+
+    aligned = []
+    for df in frames:
+        own_dates = dates[dates >= df.index[0]] if len(df) else dates[:0]
+        if df.index.equals(own_dates):
+            aligned.append(df)
+            continue
+        out = df.reindex(own_dates)
+        missing = out['Close'].isna().to_numpy()
+        if missing.any():
+            close = out['Close'].ffill()
+            for column in ('Open', 'High', 'Low', 'Close'):
+                out[column] = out[column].where(~missing, close)
+        if 'Volume' in out:
+            out['Volume'] = out['Volume'].fillna(0)
+        aligned.append(out)
+    return aligned
@@ -0,0 +1,65 @@
+import math
+from typing import Any, Dict, List, Optional
+
+from .backtest_engine import run_backtest_metrics
+from .synthetic_data import generate_ohlcv
+from .vector_engine import VECTORIZED_SIGNALS
+from .indicator_cache import indicator_cache
+
+# Metrics compared between engines and their absolute tolerances
+PARITY_TOLERANCES = {
+    "final_value": 1e-6,
+    "max_drawdown_pct": 1e-6,
+    "sharpe": 1e-6,
+    "total_trades": 0,
+    "won_trades": 0,
+}
+
+# Non-default parameter sets exercised alongside each strategy's defaults
+PARITY_PARAMS = {
+    "SmaCrossStrategy": [{"n1": 5, "n2": 20}, {"n1": 50, "n2": 200}],
+    "EmaCrossStrategy": [{"n1": 5, "n2": 30}],
+    "RsiStrategy": [{"period": 7, "oversold": 35, "overbought": 65}],
+    "MACDStrategy": [{"fast_ema": 8, "slow_ema": 21, "signal_ema": 5}],
+    "BollingerBandsReversion": [{"period": 10, "devfactor": 1.5}],
+    "DonchianChannelBreakout": [{"period": 10}],
+    "StochasticStrategy": [{"k_period": 9, "d_period": 3, "oversold": 30, "overbought": 70}],
+}
+
+def _matches(a: Any, b: Any, tol: float) -> bool:
+    if a is None or b is None:
+        return a is None and b is None
+    return math.isclose(float(a), float(b), rel_tol=1e-9, abs_tol=tol)
+
+def check_parity(strategy_ids: Optional[List[str]] = None, seeds: List[int] = (0, 1, 2), n_bars: int = 1500) -> List[Dict[str, Any]]:
+    """
+    Runs every (strategy, params, seed) case through both engines on
+    synthetic data and returns the list of mismatching metrics (empty when
+    the engines agree).
+    """
+    mismatches = []
+    for strategy_id in strategy_ids or list(VECTORIZED_SIGNALS):
+        for params in [{}] + PARITY_PARAMS.get(strategy_id, []):
+            for seed in seeds:
+                df = generate_ohlcv(n_bars, seed=seed)
+                # The reference run uses backtrader's own indicators, not the shared cache
+                indicator_cache.enabled = False
+                try:
+                    reference = run_backtest_metrics(strategy_id, [df], params, engine="backtrader")
+                finally:
+                    indicator_cache.enabled = True
+                candidate = run_backtest_metrics(strategy_id, [df], params, engine="vectorized")
+                for metric, tol in PARITY_TOLERANCES.items():
+                    if not _matches(reference[metric], candidate[metric], tol):
+                        mismatches.append({
+                            "strategy_id": strategy_id, "params": params, "seed": seed, "metric": metric,
+                            "backtrader": reference[metric], "vectorized": candidate[metric],
+                        })
+                # Closed-trade ledgers must agree trade by trade
+                ref_pnl, cand_pnl = reference["trades"]["pnl_comm"].to_numpy(float), candidate["trades"]["pnl_comm"].to_numpy(float)
+                if len(ref_pnl) != len(cand_pnl) or not all(_matches(a, b, 1e-6) for a, b in zip(ref_pnl, cand_pnl)):
+                    mismatches.append({
+                        "strategy_id": strategy_id, "params": params, "seed": seed, "metric": "trades",
+                        "backtrader": len(ref_pnl), "vectorized": len(cand_pnl),
+                    })
+    return mismatches
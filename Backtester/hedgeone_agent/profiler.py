@@ -0,0 +1,91 @@
+import time
+from typing import Any, Dict
+
+# --- STRATEGY HOT-PATH PROFILER ---
+# Wraps a strategy class so a backtest also measures how long __init__ takes,
+# the average cost of next() per bar, and whether the strategy creates
+# indicators / line operations after __init__ (each one is a new object that
+# backtrader then has to advance on every later bar, so creating them inside
+# next() makes the per-bar cost grow with the length of the run).
+
+
+def _lineiterator_count(strategy) -> int:
+    """ Indicators, observers and line operations registered with the strategy. """
+    return sum(len(group) for group in strategy._lineiterators.values())
+
+
+def profiled(StrategyClass):
+    """ Returns a subclass of `StrategyClass` that records hot-path timings (see hot_path_report). """
+
+    class Profiled(StrategyClass):
+        # Last instance built, so a report is available even if the run raises
+        last_instance = None
+
+        def __init__(self, *args, **kwargs):
+            self._profile = {
+                "init_seconds": 0.0,
+                "next_seconds": 0.0,
+                "next_calls": 0,
+                "max_next_seconds": 0.0,
+                "created_after_init": 0,
+                "first_creation_bar": None,
+            }
+            self._profile_baseline = 0
+            type(self).last_instance = self
+            began = time.perf_counter()
+            super().__init__(*args, **kwargs)
+            self._profile["init_seconds"] = time.perf_counter() - began
+
+        def start(self):
+            super().start()
+            # Observers and analyzers are attached after __init__; count from here
+            self._profile_baseline = _lineiterator_count(self)
+
+        def next(self):
+            profile = self._profile
+            began = time.perf_counter()
+            try:
+                super().next()
+            finally:
+                elapsed = time.perf_counter() - began
+                profile["next_seconds"] += elapsed
+                profile["next_calls"] += 1
+                profile["max_next_seconds"] = max(profile["max_next_seconds"], elapsed)
+                created = _lineiterator_count(self) - self._profile_baseline
+                if created > profile["created_after_init"]:
+                    if profile["first_creation_bar"] is None:
+                        profile["first_creation_bar"] = len(self)
+                    profile["created_after_init"] = created
+
+        def hot_path_report(self) -> Dict[str, Any]:
+            profile = self._profile
+            calls = profile["next_calls"]
+            return {
+                "strategy": StrategyClass.__name__,
+                "init_ms": profile["init_seconds"] * 1e3,
+                "next_calls": calls,
+                "next_us_per_bar": profile["next_seconds"] / calls * 1e6 if calls else 0.0,
+                "max_next_us": profile["max_next_seconds"] * 1e6,
+                "created_after_init": profile["created_after_init"],
+                "first_creation_bar": profile["first_creation_bar"],
+            }
+
+    Profiled.__name__ = Profiled.__qualname__ = f"Profiled{StrategyClass.__name__}"
+    return Profiled
+
+
+def format_profile(report: Dict[str, Any]) -> str:
+    """ Renders a hot_path_report as the block appended to the backtest summary. """
+    lines = [
+        f"Profile for '{report['strategy']}':",
+        f"  __init__: {report['init_ms']:,.2f} ms",
+        f"  next(): {report['next_us_per_bar']:,.1f} us/bar over {report['next_calls']} bars (max {report['max_next_us']:,.1f} us)",
+    ]
+    if report["created_after_init"]:
+        lines.append(
+            f"  WARNING: {report['created_after_init']} indicator(s)/line operation(s) created after __init__ "
+            f"(first on bar {report['first_creation_bar']}); build them in __init__ instead."
+        )
+    if report.get("error"):
+        lines.append(f"  Run aborted: {report['error']}")
+    return "\n".join(lines)
@@ -1,22 +1,51 @@
 import os
 import json
+import threading
 import pandas as pd
 
 # RAG / Vector Store
-from langchain_community.vectorstores import FAISS
 from langchain_core.documents import Document
-from langchain_community.embeddings import HuggingFaceEmbeddings
 
 # Import constants from other modules in the package
 from .strategies import STRATEGY_METADATA_LIST
-from .config import STRATEGY_VECTOR_STORE_PATH, SYMBOL_VECTOR_STORE_PATH, SYMBOL_CSV_PATH
+from .config import STRATEGY_VECTOR_STORE_PATH, SYMBOL_VECTOR_STORE_PATH, SYMBOL_CSV_PATH, EMBEDDING_MODEL_NAME
+from .embeddings import get_embeddings
+from .retrieval_cache import retrieval_cache, query_key
+from .index_manifest import sync_vector_store
+
+# Retrievers are built once per process (get_*_retriever may be called from
+# several entry points) and all share the one embedding model. Re-entrant
+# because a get_* call may build the store, which invalidates it.
+_retrievers = {}
+_retrievers_lock = threading.RLock()
+
+
+def invalidate_store(name: str) -> None:
+    """ Forgets the loaded retriever and cached results of a rebuilt store ("strategy", "symbol"). """
+    with _retrievers_lock:
+        _retrievers.pop(name, None)
+        retrieval_cache(name).clear()
+
+
+def retrieve(name: str, query: str) -> list:
+    """ Top-k documents from the "strategy" or "symbol" store, served from its results cache when repeated. """
+    retriever = get_strategy_retriever() if name == "strategy" else get_symbol_retriever()
+    cache = retrieval_cache(name)
+    # The same query at another k is a different result set
+    key = (*query_key(EMBEDDING_MODEL_NAME, query), retriever.search_kwargs.get("k"))
+    documents = cache.get(key)
+    if documents is None:
+        # Use modern retriever invocation if available, fallback to get_relevant_documents
+        try:
+            documents = retriever.invoke(query)
+        except AttributeError:
+            documents = retriever.get_relevant_documents(query)
+        cache.put(key, list(documents))
+    return list(documents)
 
 # --- 4. RAG SETUP FUNCTIONS ---
-def create_strategy_vector_store():
-    """
-    Creates and saves a FAISS vector store from the strategy metadata.
-    """
-    print("Loading strategy metadata...")
+def _strategy_documents():
+    """ One document per registered strategy. """
     documents = []
     for strategy in STRATEGY_METADATA_LIST:
         content = f"Strategy: {strategy['strategy_id']}. Description: {strategy['description']}"
@@ -26,31 +55,33 @@ def create_strategy_vector_store():
             "parameters": json.dumps(strategy['parameters'])
         }
         documents.append(Document(page_content=content, metadata=metadata))
-    
-    print("Creating strategy embeddings... (This may take a moment on first run)")
-    embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-    vector_store = FAISS.from_documents(documents, embeddings)
-    
-    vector_store.save_local(STRATEGY_VECTOR_STORE_PATH)
-    print(f"Strategy vector store saved to {STRATEGY_VECTOR_STORE_PATH}")
+    return documents
 
-def get_strategy_retriever():
+def create_strategy_vector_store():
     """
-    Loads the saved strategy FAISS vector store as a retriever.
+    Creates the strategy FAISS vector store, or brings an existing one up to
+    date with the strategy metadata (only new / changed strategies are embedded).
     """
-    if not os.path.exists(STRATEGY_VECTOR_STORE_PATH):
-        print("Strategy vector store not found. Creating a new one...")
-        create_strategy_vector_store()
-        
-    embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-    # allow_dangerous_deserialization kept for compatibility with older saved indexes
-    vector_store = FAISS.load_local(STRATEGY_VECTOR_STORE_PATH, embeddings, allow_dangerous_deserialization=True)
-    return vector_store.as_retriever(search_kwargs={"k": 1})
+    print("Loading strategy metadata...")
+    vector_store, counts = sync_vector_store(STRATEGY_VECTOR_STORE_PATH, _strategy_documents(), get_embeddings())
+    if counts["added"] or counts["removed"]:
+        invalidate_store("strategy")
+        print(f"Strategy vector store saved to {STRATEGY_VECTOR_STORE_PATH}")
+    return vector_store
 
-def create_symbol_vector_store():
+def get_strategy_retriever():
     """
-    Creates and saves a FAISS vector store from the symbols.csv file.
+    Loads the strategy FAISS vector store as a retriever (once per process),
+    syncing it with the strategy metadata first.
     """
+    with _retrievers_lock:
+        if "strategy" not in _retrievers:
+            vector_store = create_strategy_vector_store()
+            _retrievers["strategy"] = vector_store.as_retriever(search_kwargs={"k": 1})
+        return _retrievers["strategy"]
+
+def _symbol_documents():
+    """ One document per row of symbols.csv. """
     if not os.path.exists(SYMBOL_CSV_PATH):
         print(f"Error: '{SYMBOL_CSV_PATH}' not found.")
         print("Please create this file with 'Company Name,Symbol' columns.")
@@ -66,42 +97,41 @@ def create_symbol_vector_store():
         print(f"Error reading symbols.csv: {e}")
         raise
 
-    documents = []
-    for _, row in df.iterrows():
-        # Ensure data is string and clean
-        company_name = str(row['Company Name']).strip()
-        symbol = str(row['Symbol']).strip()
-        
-        if not company_name or not symbol:
-            continue # Skip empty rows
-
-        content = f"Company Name: {company_name}, Symbol: {symbol}"
-        metadata = {
-            "company_name": company_name,
-            "symbol": symbol
-        }
-        documents.append(Document(page_content=content, metadata=metadata))
+    # Column-wise string ops instead of a Python loop per row
+    company_names = df['Company Name'].astype(str).str.strip()
+    symbols = df['Symbol'].astype(str).str.strip()
+    keep = (company_names != "") & (symbols != "")  # Skip empty rows
+    company_names, symbols = company_names[keep], symbols[keep]
+    contents = "Company Name: " + company_names + ", Symbol: " + symbols
+    documents = [
+        Document(page_content=content, metadata={"company_name": company_name, "symbol": symbol})
+        for content, company_name, symbol in zip(contents, company_names, symbols)
+    ]
     
     if not documents:
         print(f"No valid data found in {SYMBOL_CSV_PATH}.")
         raise ValueError(f"No documents to process from {SYMBOL_CSV_PATH}")
+    return documents
 
-    print("Creating symbol embeddings... (This may take a moment)")
-    embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-    vector_store = FAISS.from_documents(documents, embeddings)
-    
-    vector_store.save_local(SYMBOL_VECTOR_STORE_PATH)
-    print(f"Symbol vector store saved to {SYMBOL_VECTOR_STORE_PATH}")
+def create_symbol_vector_store():
+    """
+    Creates the symbol FAISS vector store from symbols.csv, or applies only
+    the rows added / changed / removed since it was last synced.
+    """
+    vector_store, counts = sync_vector_store(SYMBOL_VECTOR_STORE_PATH, _symbol_documents(), get_embeddings())
+    if counts["added"] or counts["removed"]:
+        invalidate_store("symbol")
+        print(f"Symbol vector store saved to {SYMBOL_VECTOR_STORE_PATH}")
+    return vector_store
 
 def get_symbol_retriever():
     """
-    Loads the saved symbol FAISS vector store as a retriever.
+    Loads the symbol FAISS vector store as a retriever (once per process),
+    syncing it with symbols.csv first.
     """
-    if not os.path.exists(SYMBOL_VECTOR_STORE_PATH):
-        print("Symbol vector store not found. Creating a new one...")
-        create_symbol_vector_store()
-        
-    embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-    vector_store = FAISS.load_local(SYMBOL_VECTOR_STORE_PATH, embeddings, allow_dangerous_deserialization=True)
-    # Returns top 3 matches as requested
-    return vector_store.as_retriever(search_kwargs={"k": 3})
\ No newline at end of file
+    with _retrievers_lock:
+        if "symbol" not in _retrievers:
+            vector_store = create_symbol_vector_store()
+            # Returns top 3 matches as requested
+            _retrievers["symbol"] = vector_store.as_retriever(search_kwargs={"k": 3})
+        return _retrievers["symbol"]
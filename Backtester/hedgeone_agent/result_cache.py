@@ -0,0 +1,203 @@
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from .indicator_cache import indicator_cache
+from .config import RESULT_CACHE_PATH, RESULT_CACHE_MAX_ENTRIES
+
+# --- BACKTEST RESULT CACHE ---
+# A backtest is deterministic given (strategy source, params, data, cash,
+# stake, commission, engine), so its metrics are stored under a content hash
+# of exactly those inputs: an in-memory LRU in front of a SQLite file that
+# survives restarts. Editing a strategy class, or any engine module its
+# results depend on, changes its source hash, so old entries simply stop
+# matching; they are pruned the first time the new source is seen.
+
+# Bump when the cached metrics dict changes shape
+CACHE_FORMAT_VERSION = 3
+
+# Modules (and strategies.py helpers) whose code shapes every result: indicators,
+# the precomputed-line bridge, vectorized signal builders, alignment and metrics
+ENGINE_MODULES = ("indicators", "indicator_cache", "vector_engine", "panel", "metrics", "backtest_engine")
+ENGINE_HELPERS = (("strategies", "PrecomputedLine"), ("strategies", "cached_lines"))
+
+_engine_hash: Optional[str] = None
+
+
+def engine_source_hash() -> str:
+    """ Hash of the engine modules' source (computed once per process). """
+    global _engine_hash
+    if _engine_hash is None:
+        digest = hashlib.blake2b(digest_size=16)
+        for name in ENGINE_MODULES:
+            module = importlib.import_module(f"{__package__}.{name}")
+            try:
+                digest.update(inspect.getsource(module).encode())
+            except (OSError, TypeError):
+                digest.update(name.encode())
+        for name, attr in ENGINE_HELPERS:
+            obj = getattr(importlib.import_module(f"{__package__}.{name}"), attr)
+            try:
+                digest.update(inspect.getsource(obj).encode())
+            except (OSError, TypeError):
+                digest.update(attr.encode())
+        _engine_hash = digest.hexdigest()
+    return _engine_hash
+
+
+def strategy_source_hash(StrategyClass) -> str:
+    """ Hash of the strategy class source, any of its bases defined in this package, and the engine source. """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(engine_source_hash().encode())
+    for cls in StrategyClass.__mro__:
+        if not cls.__module__.startswith(__package__):
+            continue
+        try:
+            digest.update(inspect.getsource(cls).encode())
+        except (OSError, TypeError):
+            digest.update(cls.__qualname__.encode())
+    return digest.hexdigest()
+
+
+def cache_key(strategy_id: str, source_hash: str, data_feeds: List[pd.DataFrame], params: Dict[str, Any],
+              cash: float, stake: int, commission: float, engine: str, alignment: Optional[str] = None) -> str:
+    """ Content hash identifying one backtest. `params` should already include the class defaults. """
+    payload = {
+        "version": CACHE_FORMAT_VERSION,
+        "strategy": strategy_id,
+        "source": source_hash,
+        "params": params,
+        "data": [indicator_cache.fingerprint(df) for df in data_feeds],
+        "cash": cash,
+        "stake": stake,
+        "commission": commission,
+        "engine": engine,
+        "alignment": alignment,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=20).hexdigest()
+
+
+class ResultCache:
+    """ LRU of metrics dicts backed by a SQLite table; safe to share between threads and processes. """
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.enabled = True
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._checked_sources: Dict[str, str] = {}
+        self._initialised = False
+        self.hits = 0
+        self.misses = 0
+
+    # --- SQLite store ---
+    def _connect(self) -> sqlite3.Connection:
+        """ A new connection (close it with contextlib.closing); creates the file's directory and table on first use. """
+        if not self._initialised:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._initialised:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, strategy_id TEXT NOT NULL, source_hash TEXT NOT NULL,"
+                " created REAL NOT NULL, payload BLOB NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_strategy ON results (strategy_id, source_hash)")
+            self._initialised = True
+        return conn
+
+    def prune_stale(self, strategy_id: str, source_hash: str) -> None:
+        """ Drops stored results of `strategy_id` computed with any other source; runs once per source per process. """
+        if self._checked_sources.get(strategy_id) == source_hash:
+            return
+        try:
+            with closing(self._connect()) as conn, conn:
+                removed = conn.execute(
+                    "DELETE FROM results WHERE strategy_id = ? AND source_hash != ?", (strategy_id, source_hash)
+                ).rowcount
+            if removed:
+                print(f"--- Result cache: dropped {removed} stale result(s) for {strategy_id} (source changed) ---")
+        except (sqlite3.Error, OSError) as e:
+            print(f"Result cache unavailable: {e}")
+        self._checked_sources[strategy_id] = source_hash
+
+    # --- Lookup / store ---
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            metrics = self._memory.get(key)
+            if metrics is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return metrics
+        row = None
+        try:
+            with closing(self._connect()) as conn, conn:
+                row = conn.execute("SELECT payload FROM results WHERE key = ?", (key,)).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            print(f"Result cache unavailable: {e}")
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        metrics = pickle.loads(row[0])
+        self._remember(key, metrics)
+        return metrics
+
+    def put(self, key: str, strategy_id: str, source_hash: str, metrics: Dict[str, Any]) -> None:
+        self._remember(key, metrics)
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results (key, strategy_id, source_hash, created, payload) VALUES (?, ?, ?, ?, ?)",
+                    (key, strategy_id, source_hash, time.time(), pickle.dumps(metrics, protocol=pickle.HIGHEST_PROTOCOL)),
+                )
+        except (sqlite3.Error, OSError) as e:
+            print(f"Result cache unavailable: {e}")
+
+    def _remember(self, key: str, metrics: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[key] = metrics
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        """ Empties both the in-memory LRU and the SQLite store. """
+        with self._lock:
+            self._memory.clear()
+            self.hits = self.misses = 0
+        self._checked_sources.clear()
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM results")
+        except (sqlite3.Error, OSError) as e:
+            print(f"Result cache unavailable: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "memory_entries": len(self._memory), "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+# Process-wide instance used by run_backtest_internal
+result_cache = ResultCache(RESULT_CACHE_PATH, RESULT_CACHE_MAX_ENTRIES)
@@ -0,0 +1,86 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+# --- STRUCTURED BACKTEST RESULTS ---
+# Every run produces a BacktestResult (metrics + equity curve + trade ledger);
+# the agent's summary string is rendered from it and the results warehouse
+# stores it.
+
+# Scalar metrics every engine reports
+METRIC_FIELDS = [
+    "start_cash", "final_value", "total_return_pct", "sharpe", "max_drawdown_pct",
+    "total_trades", "won_trades", "win_rate",
+    "cagr_pct", "sortino", "max_drawdown_bars", "profit_factor", "exposure_pct",
+]
+# Metrics where lower is better; everything else ranks descending
+ASCENDING_METRICS = {"max_drawdown_pct", "max_drawdown_bars"}
+
+# Closed trades, one row each; `feed` is the position of the traded feed in data_feeds
+TRADE_COLUMNS = ["feed", "entry_time", "exit_time", "size", "entry_price", "exit_price", "pnl", "pnl_comm", "bars"]
+
+
+def empty_trades() -> pd.DataFrame:
+    return pd.DataFrame(columns=TRADE_COLUMNS)
+
+
+def _optional(value: Any, spec: str, unit: str = "") -> str:
+    """ Formats a metric that may be undefined (no losing trades, zero-length run, older stored runs). """
+    return "N/A" if value is None or value != value else format(value, spec) + unit
+
+
+@dataclass
+class BacktestResult:
+    """ One backtest run: what was run, its scalar metrics, equity curve and closed-trade ledger. """
+    strategy_id: str
+    symbols: List[str]
+    params: Dict[str, Any]
+    engine: str
+    metrics: Dict[str, Any]
+    equity_curve: pd.Series
+    trades: pd.DataFrame = field(default_factory=empty_trades)
+    run_id: Optional[int] = None
+
+    @classmethod
+    def from_metrics(cls, strategy_id: str, symbols: List[str], params: Dict[str, Any], metrics: Dict[str, Any]) -> "BacktestResult":
+        """ Builds a result from an engine's metrics dict, labelling trades with their symbol. """
+        trades = metrics.get("trades")
+        trades = empty_trades() if trades is None else trades.copy()
+        trades.insert(0, "symbol", [symbols[i] if 0 <= i < len(symbols) else "" for i in trades["feed"].astype(int)])
+        return cls(
+            strategy_id=strategy_id,
+            symbols=list(symbols),
+            params=dict(params or {}),
+            engine=metrics.get("engine", ""),
+            metrics={name: metrics.get(name) for name in METRIC_FIELDS},
+            equity_curve=metrics["equity_curve"],
+            trades=trades.drop(columns="feed"),
+        )
+
+    @property
+    def start(self) -> Optional[pd.Timestamp]:
+        return self.equity_curve.index[0] if len(self.equity_curve) else None
+
+    @property
+    def end(self) -> Optional[pd.Timestamp]:
+        return self.equity_curve.index[-1] if len(self.equity_curve) else None
+
+    def summary(self) -> str:
+        """ The summary string shown to the agent. """
+        m = self.metrics
+        sharpe = m["sharpe"] if m["sharpe"] is not None else "N/A"
+        return (
+            f"Backtest for '{self.strategy_id}' Complete.\n"
+            f"  Final Portfolio Value: ₹{m['final_value']:,.2f}\n"
+            f"  Total Return: {m['total_return_pct']:,.2f}%\n"
+            f"  CAGR: {_optional(m.get('cagr_pct'), ',.2f', '%')}\n"
+            f"  Sharpe Ratio: {sharpe}\n"
+            f"  Sortino Ratio: {_optional(m.get('sortino'), '.2f')}\n"
+            f"  Max. Drawdown: {m['max_drawdown_pct']}\n"
+            f"  Longest Drawdown: {_optional(m.get('max_drawdown_bars'), 'd', ' bars')}\n"
+            f"  Total Trades: {m['total_trades']}\n"
+            f"  Win Rate: {m['win_rate']:,.2f}%\n"
+            f"  Profit Factor: {_optional(m.get('profit_factor'), '.2f')}\n"
+            f"  Exposure: {_optional(m.get('exposure_pct'), '.2f', '%')}"
+        )
@@ -0,0 +1,226 @@
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from .results import BacktestResult, METRIC_FIELDS, ASCENDING_METRICS
+from .config import RESULTS_DB_PATH
+
+# --- BACKTEST RESULTS WAREHOUSE ---
+# One row per run in an indexed SQLite table (strategy, params, engine, date
+# range and every scalar metric), a run -> symbol table for symbol filters,
+# and the equity curve + trade ledger of each run as Parquet blobs. Filters
+# and top-N queries only touch the indexed run table.
+
+_RUN_COLUMNS = ["run_id", "created", "strategy_id", "symbols", "params", "engine", "start_date", "end_date"] + METRIC_FIELDS
+
+_INT_METRICS = {"total_trades", "won_trades", "max_drawdown_bars"}
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS runs ("
+    " run_id INTEGER PRIMARY KEY AUTOINCREMENT, created REAL NOT NULL, strategy_id TEXT NOT NULL,"
+    " symbols TEXT NOT NULL, params TEXT NOT NULL, engine TEXT, start_date TEXT, end_date TEXT, "
+    + ", ".join(f"{name} REAL" for name in METRIC_FIELDS) + ")",
+    "CREATE TABLE IF NOT EXISTS run_symbols (run_id INTEGER NOT NULL, symbol TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS run_series (run_id INTEGER PRIMARY KEY, equity BLOB, trades BLOB)",
+    "CREATE INDEX IF NOT EXISTS runs_strategy_params ON runs (strategy_id, params)",
+    "CREATE INDEX IF NOT EXISTS runs_dates ON runs (start_date, end_date)",
+    "CREATE INDEX IF NOT EXISTS run_symbols_symbol ON run_symbols (symbol, run_id)",
+]
+
+
+def _to_parquet(frame: pd.DataFrame) -> bytes:
+    buffer = io.BytesIO()
+    frame.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+def _from_parquet(blob: Optional[bytes]) -> pd.DataFrame:
+    return pd.read_parquet(io.BytesIO(blob)) if blob else pd.DataFrame()
+
+
+def _number(value: Any) -> Optional[float]:
+    """ Metrics may be None or 'N/A' (backtrader analyzers); those are stored as NULL. """
+    try:
+        return None if value is None else float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _date(value: Any) -> Optional[str]:
+    return None if value is None else pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+class ResultsStore:
+    """ SQLite-backed warehouse of BacktestResults with indexed filters and top-N queries. """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._initialised = False
+        self._init_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """ A new connection (close it with contextlib.closing); creates the file's directory and schema on first use. """
+        with self._init_lock:
+            if not self._initialised:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            if not self._initialised:
+                try:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    for statement in _SCHEMA:
+                        conn.execute(statement)
+                    # Warehouses created before a metric was added get its column (NULL for old runs)
+                    existing = {row[1] for row in conn.execute("PRAGMA table_info(runs)")}
+                    for name in METRIC_FIELDS:
+                        if name not in existing:
+                            conn.execute(f"ALTER TABLE runs ADD COLUMN {name} REAL")
+                    conn.commit()
+                except sqlite3.Error:
+                    conn.close()
+                    raise
+                self._initialised = True
+        return conn
+
+    # --- Writes ---
+    def save(self, result: BacktestResult) -> Optional[int]:
+        """ Stores one run and returns its run_id (also set on the result). """
+        run_ids = self.save_many([result])
+        return run_ids[0] if run_ids else None
+
+    def save_many(self, results: Iterable[BacktestResult]) -> List[int]:
+        """ Stores several runs in one transaction. """
+        run_ids = []
+        try:
+            with closing(self._connect()) as conn, conn:
+                for result in results:
+                    row = [
+                        time.time(), result.strategy_id, ",".join(result.symbols),
+                        json.dumps(result.params, sort_keys=True, default=str), result.engine,
+                        _date(result.start), _date(result.end),
+                    ] + [_number(result.metrics.get(name)) for name in METRIC_FIELDS]
+                    cursor = conn.execute(
+                        f"INSERT INTO runs ({', '.join(_RUN_COLUMNS[1:])}) VALUES ({', '.join('?' * (len(_RUN_COLUMNS) - 1))})", row
+                    )
+                    run_id = cursor.lastrowid
+                    conn.executemany("INSERT INTO run_symbols (run_id, symbol) VALUES (?, ?)", [(run_id, s) for s in result.symbols])
+                    equity = result.equity_curve.rename("value").rename_axis("datetime").reset_index()
+                    conn.execute(
+                        "INSERT INTO run_series (run_id, equity, trades) VALUES (?, ?, ?)",
+                        (run_id, _to_parquet(equity), _to_parquet(result.trades)),
+                    )
+                    result.run_id = run_id
+                    run_ids.append(run_id)
+        except (sqlite3.Error, OSError) as e:
+            print(f"Results store unavailable: {e}")
+        return run_ids
+
+    # --- Reads ---
+    def query(
+        self,
+        strategy_id: Optional[str] = None,
+        symbol: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        engine: Optional[str] = None,
+        order_by: str = "sharpe",
+        top_n: Optional[int] = None,
+        min_trades: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Returns matching runs (one row each, params decoded) best-first by
+        `order_by`. `params` matches runs whose params contain those values;
+        `start_date` / `end_date` keep runs lying inside that window.
+        """
+        if order_by not in _RUN_COLUMNS:
+            raise ValueError(f"Cannot order by '{order_by}'.")
+        where, args = [], []
+        if strategy_id:
+            where.append("r.strategy_id = ?"); args.append(strategy_id)
+        if symbol:
+            where.append("r.run_id IN (SELECT run_id FROM run_symbols WHERE symbol = ?)"); args.append(symbol)
+        for name, value in (params or {}).items():
+            where.append("json_extract(r.params, ?) = ?"); args += [f"$.{name}", value]
+        if start_date:
+            where.append("r.start_date >= ?"); args.append(_date(start_date))
+        if end_date:
+            where.append("r.end_date <= ?"); args.append(_date(end_date))
+        if engine:
+            where.append("r.engine = ?"); args.append(engine)
+        if min_trades is not None:
+            where.append("r.total_trades >= ?"); args.append(min_trades)
+
+        direction = "ASC" if order_by in ASCENDING_METRICS else "DESC"
+        sql = f"SELECT {', '.join('r.' + c for c in _RUN_COLUMNS)} FROM runs r"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY r.{order_by} IS NULL, r.{order_by} {direction}, r.run_id"
+        if top_n:
+            sql += " LIMIT ?"; args.append(int(top_n))
+
+        conn = None
+        try:
+            conn = self._connect()
+            table = pd.DataFrame(conn.execute(sql, args).fetchall(), columns=_RUN_COLUMNS)
+        except (sqlite3.Error, OSError) as e:
+            print(f"Results store unavailable: {e}")
+            return pd.DataFrame(columns=_RUN_COLUMNS)
+        finally:
+            if conn is not None:
+                conn.close()
+        table["params"] = table["params"].map(json.loads)
+        return table
+
+    def load(self, run_id: int) -> Optional[BacktestResult]:
+        """ Rebuilds the full BacktestResult (equity curve and trades included) of one run. """
+        conn = None
+        try:
+            conn = self._connect()
+            row = conn.execute(f"SELECT {', '.join(_RUN_COLUMNS)} FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            series = conn.execute("SELECT equity, trades FROM run_series WHERE run_id = ?", (run_id,)).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            print(f"Results store unavailable: {e}")
+            return None
+        finally:
+            if conn is not None:
+                conn.close()
+        if row is None:
+            return None
+        record = dict(zip(_RUN_COLUMNS, row))
+        equity = _from_parquet(series[0] if series else None)
+        curve = equity.set_index("datetime")["value"] if not equity.empty else pd.Series(dtype=float)
+        return BacktestResult(
+            strategy_id=record["strategy_id"],
+            symbols=record["symbols"].split(",") if record["symbols"] else [],
+            params=json.loads(record["params"]),
+            engine=record["engine"],
+            metrics={name: (int(record[name]) if name in _INT_METRICS and record[name] is not None else record[name]) for name in METRIC_FIELDS},
+            equity_curve=curve,
+            trades=_from_parquet(series[1] if series else None),
+            run_id=run_id,
+        )
+
+    def count(self) -> int:
+        conn = None
+        try:
+            conn = self._connect()
+            return conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+        except (sqlite3.Error, OSError) as e:
+            print(f"Results store unavailable: {e}")
+            return 0
+        finally:
+            if conn is not None:
+                conn.close()
+
+
+# Process-wide instance used by run_backtest_internal and batch runs
+results_store = ResultsStore(RESULTS_DB_PATH)
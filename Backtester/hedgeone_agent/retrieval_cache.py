@@ -0,0 +1,105 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from .config import RETRIEVAL_CACHE_MAX_ENTRIES
+
+# --- RETRIEVAL CACHES ---
+# The same names come up again and again ("Reliance", "TCS", "golden cross"),
+# so two kinds of bounded LRU sit in front of the FAISS stores:
+#   query_embeddings      - (model, query) -> embedding vector, shared by
+#                           every store because they share one model;
+#   retrieval_cache(name) - (model, query, k) -> top-k documents, one per
+#                           store, cleared whenever that store is rebuilt.
+# Queries are only case-folded / whitespace-collapsed for models whose
+# tokenizer lower-cases anyway (UNCASED_MODELS); others are keyed verbatim.
+# Each keeps hit / miss counters (see cache_stats) for sizing.
+
+
+# Sentence-transformers built on uncased BERT tokenizers: "Reliance" and "reliance" embed identically
+UNCASED_MODELS = {
+    "all-MiniLM-L6-v2", "all-MiniLM-L12-v2", "paraphrase-MiniLM-L6-v2",
+    "paraphrase-MiniLM-L3-v2", "multi-qa-MiniLM-L6-cos-v1",
+}
+
+
+def normalize_query(text: str) -> str:
+    """ Case-folded with whitespace collapsed, so "  Reliance " and "reliance" share an entry. """
+    return " ".join(str(text).casefold().split())
+
+
+def query_key(model_name: str, text: str) -> Tuple[str, str]:
+    """ Cache key of a query under `model_name`: normalized for uncased models, the raw text otherwise. """
+    uncased = model_name.rsplit("/", 1)[-1] in UNCASED_MODELS
+    return model_name, normalize_query(text) if uncased else str(text)
+
+
+class QueryCache:
+    """ Thread-safe LRU of at most `max_entries` values, with hit / miss counters. """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """ Drops every entry (counters are kept, so hit rates span rebuilds). """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits,
+                "misses": self.misses, "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+# Process-wide instances
+query_embeddings = QueryCache(RETRIEVAL_CACHE_MAX_ENTRIES)
+_retrieval_caches: Dict[str, QueryCache] = {}
+_retrieval_caches_lock = threading.Lock()
+
+
+def retrieval_cache(name: str) -> QueryCache:
+    """ The top-k results cache of one store ("strategy", "symbol"). """
+    with _retrieval_caches_lock:
+        if name not in _retrieval_caches:
+            _retrieval_caches[name] = QueryCache(RETRIEVAL_CACHE_MAX_ENTRIES)
+        return _retrieval_caches[name]
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """ Stats of the embedding cache and of every store's results cache. """
+    with _retrieval_caches_lock:
+        caches = dict(_retrieval_caches)
+    return {"query_embeddings": query_embeddings.stats(), **{f"{name}_results": c.stats() for name, c in caches.items()}}
+
+
+def format_cache_stats() -> str:
+    lines = []
+    for name, s in cache_stats().items():
+        lines.append(f"  {name:<18} {s['entries']:>5}/{s['max_entries']:<5} hits {s['hits']:>6}  misses {s['misses']:>6}  hit rate {s['hit_rate']:.0%}")
+    return "\n".join(lines)
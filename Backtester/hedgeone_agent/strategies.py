@@ -1,5 +1,9 @@
 import backtrader as bt
 import numpy as np
+import pandas as pd
+
+from .indicator_cache import indicator_cache
+from .panel import basket_return
 
 # --- 3. RAG METADATA (Replaces strategy_metadata.json) ---
 STRATEGY_METADATA_LIST = [
@@ -7,17 +11,17 @@ STRATEGY_METADATA_LIST = [
         "strategy_id": "SmaCrossStrategy",
         "description": "A simple trend-following strategy. It buys when a short-term moving average (n1) crosses above a long-term one (n2) and sells on the reverse cross. Best for simple, trending markets. Also known as a 'Golden Cross' or 'Death Cross'.",
         "parameters": [
-            {"name": "n1", "type": "int", "description": "The period for the fast moving average, e.g., 50"},
-            {"name": "n2", "type": "int", "description": "The period for the slow moving average, e.g., 200"}
+            {"name": "n1", "type": "int", "description": "The period for the fast moving average, e.g., 50", "sweep": {"min": 5, "max": 100, "step": 5}},
+            {"name": "n2", "type": "int", "description": "The period for the slow moving average, e.g., 200", "sweep": {"min": 20, "max": 250, "step": 10}}
         ]
     },
     {
         "strategy_id": "RsiStrategy",
         "description": "A mean-reversion strategy. It buys when the Relative Strength Index (RSI) crosses below an 'oversold' level (e.g., 30) and sells when it crosses above an 'overbought' level (e.g., 70).",
         "parameters": [
-            {"name": "period", "type": "int", "description": "The lookback period for the RSI, typically 14."},
-            {"name": "oversold", "type": "int", "description": "The RSI level considered oversold, typically 30."},
-            {"name": "overbought", "type": "int", "description": "The RSI level considered overbought, typically 70."}
+            {"name": "period", "type": "int", "description": "The lookback period for the RSI, typically 14.", "sweep": {"min": 5, "max": 30, "step": 1}},
+            {"name": "oversold", "type": "int", "description": "The RSI level considered oversold, typically 30.", "sweep": {"min": 15, "max": 40, "step": 5}},
+            {"name": "overbought", "type": "int", "description": "The RSI level considered overbought, typically 70.", "sweep": {"min": 60, "max": 85, "step": 5}}
         ]
     },
     {
@@ -29,67 +33,100 @@ STRATEGY_METADATA_LIST = [
         "strategy_id": "BollingerBandsReversion",
         "description": "A mean-reversion strategy. It buys when the price touches or crosses below the lower Bollinger Band and sells when it touches or crosses above the upper Bollinger Band.",
         "parameters": [
-            {"name": "period", "type": "int", "description": "The lookback period for the moving average, typically 20."},
-            {"name": "devfactor", "type": "float", "description": "The number of standard deviations for the bands, typically 2.0."}
+            {"name": "period", "type": "int", "description": "The lookback period for the moving average, typically 20.", "sweep": {"min": 10, "max": 50, "step": 5}},
+            {"name": "devfactor", "type": "float", "description": "The number of standard deviations for the bands, typically 2.0.", "sweep": {"min": 1.0, "max": 3.0, "step": 0.25}}
         ]
     },
     {
         "strategy_id": "MACDStrategy",
         "description": "A trend-following strategy based on the Moving Average Convergence Divergence (MACD). It buys when the MACD line crosses above the signal line and sells when it crosses below.",
         "parameters": [
-            {"name": "fast_ema", "type": "int", "description": "The period for the fast EMA, typically 12."},
-            {"name": "slow_ema", "type": "int", "description": "The period for the slow EMA, typically 26."},
-            {"name": "signal_ema", "type": "int", "description": "The period for the signal line EMA, typically 9."}
+            {"name": "fast_ema", "type": "int", "description": "The period for the fast EMA, typically 12.", "sweep": {"min": 6, "max": 20, "step": 2}},
+            {"name": "slow_ema", "type": "int", "description": "The period for the slow EMA, typically 26.", "sweep": {"min": 20, "max": 40, "step": 2}},
+            {"name": "signal_ema", "type": "int", "description": "The period for the signal line EMA, typically 9.", "sweep": {"min": 5, "max": 15, "step": 2}}
         ]
     },
     {
         "strategy_id": "StochasticStrategy",
         "description": "A momentum oscillator strategy. It buys when the %K line crosses above the %D line in the oversold region (e.g., below 20) and sells when it crosses below in the overbought region (e.g., above 80).",
         "parameters": [
-            {"name": "k_period", "type": "int", "description": "The lookback period for %K, typically 14."},
-            {"name": "d_period", "type": "int", "description": "The smoothing period for %D, typically 3."},
-            {"name": "oversold", "type": "int", "description": "The oversold level, typically 20."},
-            {"name": "overbought", "type": "int", "description": "The overbought level, typically 80."}
+            {"name": "k_period", "type": "int", "description": "The lookback period for %K, typically 14.", "sweep": {"min": 5, "max": 30, "step": 1}},
+            {"name": "d_period", "type": "int", "description": "The smoothing period for %D, typically 3.", "sweep": {"min": 2, "max": 6, "step": 1}},
+            {"name": "oversold", "type": "int", "description": "The oversold level, typically 20.", "sweep": {"min": 10, "max": 30, "step": 5}},
+            {"name": "overbought", "type": "int", "description": "The overbought level, typically 80.", "sweep": {"min": 70, "max": 90, "step": 5}}
         ]
     },
     {
         "strategy_id": "DonchianChannelBreakout",
         "description": "A trend-following breakout strategy (like Turtle Trading). It buys when the price breaks above the upper channel (N-period high) and sells when it breaks below the lower channel (N-period low).",
         "parameters": [
-            {"name": "period", "type": "int", "description": "The lookback period for the channel, typically 20."}
+            {"name": "period", "type": "int", "description": "The lookback period for the channel, typically 20.", "sweep": {"min": 10, "max": 60, "step": 5}}
         ]
     },
     {
         "strategy_id": "EmaCrossStrategy",
         "description": "A simple trend-following strategy using Exponential Moving Averages (EMAs), which are faster to react than SMAs. Buys when the fast EMA (n1) crosses above the slow EMA (n2).",
         "parameters": [
-            {"name": "n1", "type": "int", "description": "The period for the fast EMA, e.g., 12."},
-            {"name": "n2", "type": "int", "description": "The period for the slow EMA, e.g., 26."}
+            {"name": "n1", "type": "int", "description": "The period for the fast EMA, e.g., 12.", "sweep": {"min": 5, "max": 50, "step": 1}},
+            {"name": "n2", "type": "int", "description": "The period for the slow EMA, e.g., 26.", "sweep": {"min": 20, "max": 100, "step": 2}}
         ]
     },
     {
         "strategy_id": "ATRTrailingStopStrategy",
         "description": "A trend-following strategy that uses an Average True Range (ATR) based trailing stop-loss. It buys on a signal (e.g., new high) and holds until the price crosses below the trailing stop.",
         "parameters": [
-            {"name": "atr_period", "type": "int", "description": "The lookback period for the ATR, typically 14."},
-            {"name": "atr_multiplier", "type": "float", "description": "The multiplier for the ATR value, e.g., 3.0."}
+            {"name": "atr_period", "type": "int", "description": "The lookback period for the ATR, typically 14.", "sweep": {"min": 7, "max": 28, "step": 1}},
+            {"name": "atr_multiplier", "type": "float", "description": "The multiplier for the ATR value, e.g., 3.0.", "sweep": {"min": 1.5, "max": 5.0, "step": 0.5}}
         ]
     },
     {
         "strategy_id": "OpeningRangeBreakout",
         "description": "An intraday strategy. It buys if the price breaks above the high of the first N minutes (e.g., 15) and sells/shorts if it breaks below the low. (Note: Requires intraday data).",
         "parameters": [
-            {"name": "minutes", "type": "int", "description": "The opening range period in minutes, e.g., 15 or 30."}
+            {"name": "minutes", "type": "int", "description": "The opening range period in minutes, e.g., 15 or 30.", "sweep": {"min": 5, "max": 60, "step": 5}}
         ]
     }
 ]
 
+# --- 4. CACHED INDICATOR LINES ---
+class PrecomputedLine(bt.Indicator):
+    """ Exposes a precomputed array (one value per bar of its data) as a backtrader line. """
+    lines = ('value',)
+    params = (('values', None),)
+    def __init__(self):
+        valid = np.flatnonzero(~np.isnan(self.p.values))
+        self.addminperiod(int(valid[0]) + 1 if len(valid) else len(self.p.values) + 1)
+    def once(self, start, end):
+        dst = self.lines.value.array
+        for i in range(start, min(end, len(self.p.values))):
+            dst[i] = self.p.values[i]
+    def next(self):
+        self.lines.value[0] = self.p.values[len(self) - 1]
+
+def cached_lines(data, name, **params):
+    """
+    Pulls indicator `name` for a DataFrame-backed feed from the shared
+    indicator cache and wraps each output as a PrecomputedLine. Returns None
+    when the cache is disabled or the feed is not a plain DataFrame feed,
+    in which case the strategy builds the native backtrader indicator.
+    """
+    df = getattr(data.p, 'dataname', None)
+    if not indicator_cache.enabled or not isinstance(df, pd.DataFrame):
+        return None
+    values = indicator_cache.get(df, name, **params)
+    if isinstance(values, tuple):
+        return tuple(PrecomputedLine(data, values=v) for v in values)
+    return PrecomputedLine(data, values=values)
+
 # --- 5. BACKTESTING STRATEGY CLASSES (copy your classes exactly) ---
 class SmaCross(bt.Strategy):
     params = (('n1', 20), ('n2', 50))
     def __init__(self):
-        self.sma_fast = bt.indicators.SimpleMovingAverage(self.data.close, period=self.params.n1)
-        self.sma_slow = bt.indicators.SimpleMovingAverage(self.data.close, period=self.params.n2)
+        self.sma_fast = cached_lines(self.data, 'sma', period=self.params.n1)
+        self.sma_slow = cached_lines(self.data, 'sma', period=self.params.n2)
+        if self.sma_fast is None:
+            self.sma_fast = bt.indicators.SimpleMovingAverage(self.data.close, period=self.params.n1)
+            self.sma_slow = bt.indicators.SimpleMovingAverage(self.data.close, period=self.params.n2)
         self.crossover = bt.indicators.CrossOver(self.sma_fast, self.sma_slow)
     def next(self):
         if not self.position and self.crossover > 0: self.buy()
@@ -104,17 +141,39 @@ class RsiStrategy(bt.Strategy):
         elif self.position and self.rsi > self.params.overbought: self.sell()
 
 class MultiInstrumentSignal(bt.Strategy):
+    # `basket`: precomputed average signal return per trade-feed bar (set by prepare_feeds)
+    params = (('basket', None),)
+    @classmethod
+    def prepare_feeds(cls, frames, params_dict):
+        """
+        With in-memory frames, computes the basket return once over the aligned
+        calendar so only the trade feed (last) is handed to Cerebro. Returns
+        (positions of the frames to add, params).
+        """
+        if len(frames) < 2:
+            return list(range(len(frames))), params_dict
+        basket = basket_return(frames[:-1], frames[-1].index)
+        return [len(frames) - 1], {**(params_dict or {}), 'basket': basket}
     def __init__(self):
         self.trade_data = self.datas[-1]
         self.signal_datas = self.datas[:-1]
+        self.basket = PrecomputedLine(self.trade_data, values=self.p.basket) if self.p.basket is not None else None
+        if self.basket is None:
+            # Streaming feeds: per-signal one-bar returns (also keeps close[-1] in bounded buffers)
+            self.signal_returns = [bt.indicators.PctChange(d.close, period=1) for d in self.signal_datas]
+        self._bars_seen = 0
     def next(self):
-        returns = []
-        for d in self.signal_datas:
-            if len(d) > 1:
-                daily_return = (d.close[0] - d.close[-1]) / d.close[-1]
-                returns.append(daily_return)
-        if not returns: return
-        avg_return = np.mean(returns)
+        # Act once per trade-feed bar, not on bars only other feeds have
+        if len(self.trade_data) == self._bars_seen: return
+        self._bars_seen = len(self.trade_data)
+        if self.basket is not None:
+            avg_return = self.basket[0]
+        else:
+            # Streaming feeds: only signals with a bar on this date count (mask policy)
+            now = self.trade_data.datetime[0]
+            returns = [r[0] for d, r in zip(self.signal_datas, self.signal_returns) if d.datetime[0] == now]
+            avg_return = np.mean(returns) if returns else np.nan
+        if np.isnan(avg_return): return
         if avg_return < -0.005 and not self.getposition(self.trade_data): self.sell(data=self.trade_data)
         elif avg_return > 0.005 and not self.getposition(self.trade_data): self.buy(data=self.trade_data)
         elif abs(avg_return) < 0.001 and self.getposition(self.trade_data): self.close(data=self.trade_data)
@@ -122,16 +181,24 @@ class MultiInstrumentSignal(bt.Strategy):
 class BollingerBandsReversion(bt.Strategy):
     params = (('period', 20), ('devfactor', 2.0))
     def __init__(self):
-        self.bbands = bt.indicators.BollingerBands(self.data.close, period=self.params.period, devfactor=self.params.devfactor)
+        bands = cached_lines(self.data, 'bollinger', period=self.params.period, devfactor=self.params.devfactor)
+        if bands is None:
+            bbands = bt.indicators.BollingerBands(self.data.close, period=self.params.period, devfactor=self.params.devfactor)
+            bands = (bbands.lines.mid, bbands.lines.top, bbands.lines.bot)
+        self.mid, self.top, self.bot = bands
     def next(self):
-        if not self.position and self.data.close < self.bbands.lines.bot: self.buy()
-        elif self.position and self.data.close > self.bbands.lines.top: self.sell()
+        if not self.position and self.data.close < self.bot: self.buy()
+        elif self.position and self.data.close > self.top: self.sell()
 
 class MACDStrategy(bt.Strategy):
     params = (('fast_ema', 12), ('slow_ema', 26), ('signal_ema', 9))
     def __init__(self):
-        self.macd = bt.indicators.MACD(self.data.close, period_me1=self.params.fast_ema, period_me2=self.params.slow_ema, period_signal=self.params.signal_ema)
-        self.crossover = bt.indicators.CrossOver(self.macd.macd, self.macd.signal)
+        lines = cached_lines(self.data, 'macd', fast=self.params.fast_ema, slow=self.params.slow_ema, signal=self.params.signal_ema)
+        if lines is None:
+            macd = bt.indicators.MACD(self.data.close, period_me1=self.params.fast_ema, period_me2=self.params.slow_ema, period_signal=self.params.signal_ema)
+            lines = (macd.macd, macd.signal)
+        self.macd, self.signal = lines
+        self.crossover = bt.indicators.CrossOver(self.macd, self.signal)
     def next(self):
         if not self.position and self.crossover > 0: self.buy()
         elif self.position and self.crossover < 0: self.sell()
@@ -139,7 +206,7 @@ class MACDStrategy(bt.Strategy):
 class StochasticStrategy(bt.Strategy):
     params = (('k_period', 14), ('d_period', 3), ('oversold', 20), ('overbought', 80))
     def __init__(self):
-        self.stoch = bt.indicators.Stochastic(self.data, period=self.params.k_period, period_d=self.params.d_period)
+        self.stoch = bt.indicators.Stochastic(self.data, period=self.params.k_period, period_dslow=self.params.d_period)
     def next(self):
         if not self.position and self.stoch.percK < self.params.oversold and self.stoch.percD < self.params.oversold and self.stoch.percK > self.stoch.percD:
             self.buy()
@@ -149,16 +216,21 @@ class StochasticStrategy(bt.Strategy):
 class DonchianChannelBreakout(bt.Strategy):
     params = (('period', 20),)
     def __init__(self):
-        self.donchian = bt.indicators.DonchianChannels(self.data, period=self.params.period)
+        # Channel over the previous `period` bars (backtrader ships no DonchianChannels)
+        self.dch = bt.indicators.Highest(self.data.high, period=self.params.period)(-1)
+        self.dcl = bt.indicators.Lowest(self.data.low, period=self.params.period)(-1)
     def next(self):
-        if not self.position and self.data.close[0] > self.donchian.dch[0]: self.buy()
-        elif self.position and self.data.close[0] < self.donchian.dcl[0]: self.sell()
+        if not self.position and self.data.close[0] > self.dch[0]: self.buy()
+        elif self.position and self.data.close[0] < self.dcl[0]: self.sell()
 
 class EmaCrossStrategy(bt.Strategy):
     params = (('n1', 12), ('n2', 26))
     def __init__(self):
-        self.ema_fast = bt.indicators.EMA(self.data.close, period=self.params.n1)
-        self.ema_slow = bt.indicators.EMA(self.data.close, period=self.params.n2)
+        self.ema_fast = cached_lines(self.data, 'ema', period=self.params.n1)
+        self.ema_slow = cached_lines(self.data, 'ema', period=self.params.n2)
+        if self.ema_fast is None:
+            self.ema_fast = bt.indicators.EMA(self.data.close, period=self.params.n1)
+            self.ema_slow = bt.indicators.EMA(self.data.close, period=self.params.n2)
         self.crossover = bt.indicators.CrossOver(self.ema_fast, self.ema_slow)
     def next(self):
         if not self.position and self.crossover > 0: self.buy()
@@ -168,11 +240,13 @@ class ATRTrailingStopStrategy(bt.Strategy):
     params = (('atr_period', 14), ('atr_multiplier', 3.0))
     def __init__(self):
         self.atr = bt.indicators.ATR(self.data, period=self.params.atr_period)
+        # Highest high of the previous 20 bars, built once (not on every bar)
+        self.prev_high = bt.indicators.Highest(self.data.high, period=20)(-1)
         self.trailing_stop = 0
         self.is_long = False
     def next(self):
         if not self.is_long:
-            if self.data.close > bt.indicators.Highest(self.data.high, period=20)[-1]:
+            if self.data.close[0] > self.prev_high[0]:
                 self.buy()
                 self.trailing_stop = self.data.close - (self.atr[0] * self.params.atr_multiplier)
                 self.is_long = True
@@ -0,0 +1,55 @@
+from typing import Callable, Iterator
+
+import backtrader as bt
+import pandas as pd
+
+# --- STREAMING DATA FEED ---
+# Feeds bars to Cerebro one at a time from an iterator of OHLCV DataFrame
+# chunks (e.g. Parquet row groups from the on-disk cache), so only the
+# current chunk is ever held in memory. Meant for Cerebro(preload=False,
+# runonce=False, exactbars=1).
+
+
+class StreamingFeed(bt.feed.DataBase):
+    """
+    Backtrader feed backed by `chunks`, a zero-argument callable returning an
+    iterator of DataFrames (DatetimeIndex + Open/High/Low/Close/Volume) in
+    time order. A callable rather than an iterator so the feed can restart.
+    """
+    params = (('chunks', None),)
+
+    def start(self):
+        super().start()
+        self._chunks: Iterator[pd.DataFrame] = iter(self.p.chunks())
+        self._rows = iter(())
+
+    def _next_row(self):
+        while True:
+            row = next(self._rows, None)
+            if row is not None:
+                return row
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return None
+            if chunk.empty:
+                continue
+            self._rows = zip(
+                [bt.date2num(ts) for ts in chunk.index.to_pydatetime()],
+                chunk['Open'].to_numpy(dtype=float), chunk['High'].to_numpy(dtype=float),
+                chunk['Low'].to_numpy(dtype=float), chunk['Close'].to_numpy(dtype=float),
+                chunk['Volume'].to_numpy(dtype=float),
+            )
+
+    def _load(self):
+        row = self._next_row()
+        if row is None:
+            return False
+        lines = self.lines
+        lines.datetime[0], lines.open[0], lines.high[0], lines.low[0], lines.close[0], lines.volume[0] = row
+        lines.openinterest[0] = 0.0
+        return True
+
+
+def frame_chunks(df: pd.DataFrame, chunk_rows: int) -> Callable[[], Iterator[pd.DataFrame]]:
+    """ Chunk source over an in-memory frame (for tests and parity checks). """
+    return lambda: (df.iloc[i:i + chunk_rows] for i in range(0, len(df), chunk_rows))
@@ -0,0 +1,246 @@
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from .config import SYMBOL_CSV_PATH, FNO_SYMBOL_CSV_PATH
+
+# --- SYMBOL INDEX ---
+# A deterministic in-memory index over symbols.csv / F&O_symbols.csv that
+# answers most symbol lookups without embedding the query:
+#   exact  - the full symbol ("NSE:TCS-EQ"), the bare ticker ("TCS") or the
+#            whole normalized company name;
+#   prefix - a trie over normalized company names, keyed from every word, so
+#            "Reliance" and "Consultancy" both reach their company;
+#   fuzzy  - character trigram overlap (Dice coefficient) for typos, scored
+#            against the ticker and each name separately and, word by word,
+#            against the words of the name (every query word must be close
+#            to one of them); a record keeps its best score.
+# Tiers are tried in that order; an empty result means the caller should
+# fall back to the FAISS vector search.
+
+MATCH_TYPES = ("exact", "prefix", "fuzzy")
+FUZZY_MIN_SCORE = 0.5
+
+
+def normalize(text: str) -> str:
+    """ Upper-case, '&' spelled out, punctuation dropped, whitespace collapsed. """
+    text = str(text).upper().replace("&", " AND ")
+    return " ".join(re.sub(r"[^A-Z0-9]+", " ", text).split())
+
+
+def ticker_of(symbol: str) -> str:
+    """ "NSE:TCS-EQ" -> "TCS" (exchange prefix and series suffix removed). """
+    ticker = str(symbol).strip().upper().split(":", 1)[-1]
+    return ticker.rsplit("-", 1)[0] if "-" in ticker else ticker
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _column(df: pd.DataFrame, name: str) -> Optional[str]:
+    """ Case-insensitive column lookup ('Company Name' vs 'Company name'). """
+    return next((c for c in df.columns if c.strip().lower() == name.lower()), None)
+
+
+class SymbolIndex:
+    """ Exact / prefix / trigram lookup over symbol records; read-only once built, so thread-safe. """
+
+    def __init__(self, records: Iterable[Dict[str, Any]]):
+        self.records: List[Dict[str, Any]] = []
+        self._by_symbol: Dict[str, List[int]] = defaultdict(list)
+        self._by_ticker: Dict[str, List[int]] = defaultdict(list)
+        self._by_name: Dict[str, List[int]] = defaultdict(list)
+        self._trie: Dict[str, Any] = {}
+        # Fuzzy keys: the ticker and every whole name (-> record), and every distinct name word (-> records)
+        self._key_grams: Dict[str, List[int]] = defaultdict(list)
+        self._key_sizes: List[int] = []
+        self._key_records: List[int] = []
+        self._word_ids: Dict[str, int] = {}
+        self._word_grams: Dict[str, List[int]] = defaultdict(list)
+        self._word_sizes: List[int] = []
+        self._word_records: List[set] = []
+
+        # One record per symbol: the first file's name is kept, later names become aliases
+        by_symbol: Dict[str, Dict[str, Any]] = {}
+        for record in records:
+            key = record["symbol"].upper()
+            if key not in by_symbol:
+                by_symbol[key] = {**record, "aliases": [record["company_name"]]}
+                self.records.append(by_symbol[key])
+                continue
+            merged = by_symbol[key]
+            if record["company_name"] not in merged["aliases"]:
+                merged["aliases"].append(record["company_name"])
+            if "lot_size" in record:
+                merged.setdefault("lot_size", record["lot_size"])
+
+        for i, record in enumerate(self.records):
+            ticker = ticker_of(record["symbol"])
+            self._by_symbol[record["symbol"].upper()].append(i)
+            self._by_ticker[ticker].append(i)
+            self._add_key(ticker, i)
+            for alias in record.pop("aliases"):
+                name = normalize(alias)
+                self._by_name[name].append(i)
+                self._add_key(name, i)
+                words = name.split()
+                for w in range(len(words)):
+                    self._insert(" ".join(words[w:]), (i, w, len(name)))
+                    self._add_word(words[w], i)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _add_key(self, text: str, i: int) -> None:
+        grams = _trigrams(text)
+        for gram in grams:
+            self._key_grams[gram].append(len(self._key_sizes))
+        self._key_sizes.append(len(grams))
+        self._key_records.append(i)
+
+    def _add_word(self, word: str, i: int) -> None:
+        if word not in self._word_ids:
+            self._word_ids[word] = len(self._word_sizes)
+            grams = _trigrams(word)
+            for gram in grams:
+                self._word_grams[gram].append(self._word_ids[word])
+            self._word_sizes.append(len(grams))
+            self._word_records.append(set())
+        self._word_records[self._word_ids[word]].add(i)
+
+    @staticmethod
+    def _dice(text: str, postings: Dict[str, List[int]], sizes: List[int]) -> Dict[int, float]:
+        """ Dice coefficient of `text` against every key sharing at least one trigram with it. """
+        grams = _trigrams(text)
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for key in postings.get(gram, ()):
+                shared[key] += 1
+        return {key: 2.0 * n / (len(grams) + sizes[key]) for key, n in shared.items()}
+
+    def _insert(self, key: str, entry: tuple) -> None:
+        node = self._trie
+        for char in key:
+            node = node.setdefault(char, {})
+            # Each node lists (record, word offset, name length) of every key passing through it
+            node.setdefault("", []).append(entry)
+
+    def _rank(self, i: int) -> tuple:
+        """ Tie-break: equities before other series, then shorter names, then file order. """
+        record = self.records[i]
+        return (not record["symbol"].upper().endswith("-EQ"), len(record["company_name"]), i)
+
+    def exact(self, query: str) -> List[int]:
+        raw = query.strip().upper()
+        hits = self._by_symbol.get(raw) or self._by_ticker.get(ticker_of(raw)) or self._by_name.get(normalize(query)) or []
+        return sorted(set(hits), key=self._rank)
+
+    def prefix(self, query: str) -> List[int]:
+        node = self._trie
+        for char in normalize(query):
+            node = node.get(char)
+            if node is None:
+                return []
+        best: Dict[int, tuple] = {}
+        for i, word, length in node.get("", []):
+            best[i] = min((word > 0, length), best.get(i, (word > 0, length)))
+        # Matches at the start of a name beat matches on a later word, then the shortest matching name wins
+        return sorted(best, key=lambda i: (best[i][0], self._rank(i)[0], best[i][1], i))
+
+    def fuzzy(self, query: str, min_score: float = FUZZY_MIN_SCORE) -> List[int]:
+        name = normalize(query)
+        if not name:
+            return []
+        whole: Dict[int, float] = defaultdict(float)
+        for key, score in self._dice(name, self._key_grams, self._key_sizes).items():
+            i = self._key_records[key]
+            whole[i] = max(whole[i], score)
+        # Word by word: every query word must be close to some word of the name; the closest ones are averaged
+        words = name.split()
+        by_words: Optional[Dict[int, float]] = None
+        for word in words:
+            closest: Dict[int, float] = {}
+            for key, score in self._dice(word, self._word_grams, self._word_sizes).items():
+                if score >= min_score:
+                    for i in self._word_records[key]:
+                        closest[i] = max(closest.get(i, 0.0), score)
+            if by_words is None:
+                by_words = {i: score / len(words) for i, score in closest.items()}
+            else:
+                by_words = {i: total + closest[i] / len(words) for i, total in by_words.items() if i in closest}
+        by_words = by_words or {}
+        scores = {i: max(whole.get(i, 0.0), by_words.get(i, 0.0)) for i in set(whole) | set(by_words)}
+        # Ties (e.g. the same misspelt first word) go to the closer ticker or whole name
+        return sorted((i for i, s in scores.items() if s >= min_score),
+                      key=lambda i: (-scores[i], -whole.get(i, 0.0)) + self._rank(i))
+
+    def search(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
+        """
+        Up to k records for `query`, exact matches first, then prefix, then
+        fuzzy; each is a copy of the record with a "match" key. Empty when
+        nothing is close enough (fall back to vector search).
+        """
+        if not query or not query.strip():
+            return []
+        results, taken = [], set()
+        for match, lookup in zip(MATCH_TYPES, (self.exact, self.prefix, self.fuzzy)):
+            # Fuzzy hits only stand in when nothing matched exactly or by prefix
+            if match == "fuzzy" and results:
+                break
+            for i in lookup(query):
+                if i not in taken:
+                    taken.add(i)
+                    results.append({**self.records[i], "match": match})
+                    if len(results) >= k:
+                        return results
+        return results
+
+
+def load_symbol_records(csv_path: str) -> List[Dict[str, Any]]:
+    """ (company_name, symbol[, lot_size]) records from a symbols CSV. """
+    df = pd.read_csv(csv_path)
+    name_col, symbol_col, lot_col = _column(df, "Company Name"), _column(df, "Symbol"), _column(df, "Lot size")
+    if name_col is None or symbol_col is None:
+        raise ValueError(f"'{csv_path}' must have 'Company Name' and 'Symbol' columns.")
+    records = []
+    for row in df.to_dict("records"):
+        company_name, symbol = str(row[name_col]).strip(), str(row[symbol_col]).strip()
+        if not company_name or not symbol or company_name == "nan" or symbol == "nan":
+            continue
+        record = {"company_name": company_name, "symbol": symbol}
+        if lot_col is not None and pd.notna(row[lot_col]):
+            record["lot_size"] = int(row[lot_col])
+        records.append(record)
+    return records
+
+
+def build_symbol_index(csv_paths: Iterable[str]) -> SymbolIndex:
+    """ One index over every CSV in `csv_paths` that exists; a symbol listed twice keeps its first name. """
+    records = []
+    for path in csv_paths:
+        if not os.path.exists(path):
+            print(f"--- Symbol index: '{path}' not found, skipped ---")
+            continue
+        records.extend(load_symbol_records(path))
+    index = SymbolIndex(records)
+    print(f"--- Symbol index: {len(index)} symbols indexed ---")
+    return index
+
+
+# --- Shared index (built on first use) ---
+_symbol_index: Optional[SymbolIndex] = None
+_symbol_index_lock = threading.Lock()
+
+
+def get_symbol_index() -> SymbolIndex:
+    global _symbol_index
+    with _symbol_index_lock:
+        if _symbol_index is None:
+            _symbol_index = build_symbol_index([SYMBOL_CSV_PATH, FNO_SYMBOL_CSV_PATH])
+        return _symbol_index
@@ -0,0 +1,18 @@
+import numpy as np
+import pandas as pd
+
+def generate_ohlcv(n_bars: int, seed: int = 0, start: str = "2000-01-03", freq: str = "B") -> pd.DataFrame:
+    """
+    Seeded geometric-random-walk OHLCV frame in the same shape as
+    get_historical_data output. Used by the parity check and benchmarks so
+    they run offline; use an intraday `freq` (e.g. "min") for long series.
+    """
+    rng = np.random.default_rng(seed)
+    drift = rng.normal(0.0002, 0.0004)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(drift, 0.015, n_bars)))
+    open_ = close * np.exp(rng.normal(0.0, 0.004, n_bars))
+    high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0.0, 0.006, n_bars)))
+    low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0.0, 0.006, n_bars)))
+    volume = rng.integers(1_000, 100_000, n_bars).astype(float)
+    index = pd.date_range(start, periods=n_bars, freq=freq, name="datetime")
+    return pd.DataFrame({'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume}, index=index)
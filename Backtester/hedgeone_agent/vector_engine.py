@@ -0,0 +1,191 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, Tuple
+
+from . import indicators as ind
+from .indicator_cache import indicator_cache
+from .strategies import STRATEGY_REGISTRY
+from .results import TRADE_COLUMNS
+from .metrics import compute_metrics
+
+# --- VECTORIZED BACKTEST ENGINE ---
+# Array-based equivalent of the backtrader run for the single-instrument,
+# long-only signal strategies. Semantics follow backtrader's defaults:
+# signals are evaluated on the bar's close, market orders fill at the next
+# bar's open, the fixed stake is bought when flat and sold when long, and an
+# order is rejected if cash would go negative at submission or execution.
+
+
+def strategy_params(strategy_id: str, params_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """ Strategy class defaults overlaid with the caller's params. """
+    params = dict(STRATEGY_REGISTRY[strategy_id].params._getpairs())
+    params.update(params_dict or {})
+    return params
+
+
+# --- Signal builders: return (entry, exit) boolean arrays ---
+def _cross_signals(cross: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    return cross > 0, cross < 0
+
+
+# Indicator series come from the shared per-process indicator cache
+def _sma_cross(df: pd.DataFrame, p: Dict[str, Any]):
+    fast = indicator_cache.get(df, 'sma', period=int(p['n1']))
+    slow = indicator_cache.get(df, 'sma', period=int(p['n2']))
+    return _cross_signals(ind.crossover(fast, slow))
+
+
+def _ema_cross(df: pd.DataFrame, p: Dict[str, Any]):
+    fast = indicator_cache.get(df, 'ema', period=int(p['n1']))
+    slow = indicator_cache.get(df, 'ema', period=int(p['n2']))
+    return _cross_signals(ind.crossover(fast, slow))
+
+
+def _rsi(df: pd.DataFrame, p: Dict[str, Any]):
+    rsi = indicator_cache.get(df, 'rsi', period=int(p['period']))
+    return rsi < p['oversold'], rsi > p['overbought']
+
+
+def _macd(df: pd.DataFrame, p: Dict[str, Any]):
+    macd_line, signal = indicator_cache.get(df, 'macd', fast=int(p['fast_ema']), slow=int(p['slow_ema']), signal=int(p['signal_ema']))
+    return _cross_signals(ind.crossover(macd_line, signal))
+
+
+def _bollinger(df: pd.DataFrame, p: Dict[str, Any]):
+    close = df['Close'].to_numpy(dtype=float)
+    _, top, bot = indicator_cache.get(df, 'bollinger', period=int(p['period']), devfactor=float(p['devfactor']))
+    return close < bot, close > top
+
+
+def _donchian(df: pd.DataFrame, p: Dict[str, Any]):
+    close = df['Close'].to_numpy(dtype=float)
+    period = int(p['period'])
+    dch = ind.shift(indicator_cache.get(df, 'highest', period=period))
+    dcl = ind.shift(indicator_cache.get(df, 'lowest', period=period))
+    return close > dch, close < dcl
+
+
+def _stochastic(df: pd.DataFrame, p: Dict[str, Any]):
+    k, d = indicator_cache.get(df, 'stochastic', period=int(p['k_period']), period_dfast=3, period_dslow=int(p['d_period']))
+    oversold, overbought = p['oversold'], p['overbought']
+    return (k < oversold) & (d < oversold) & (k > d), (k > overbought) & (d > overbought) & (k < d)
+
+
+VECTORIZED_SIGNALS: Dict[str, Callable] = {
+    "SmaCrossStrategy": _sma_cross,
+    "EmaCrossStrategy": _ema_cross,
+    "RsiStrategy": _rsi,
+    "MACDStrategy": _macd,
+    "BollingerBandsReversion": _bollinger,
+    "DonchianChannelBreakout": _donchian,
+    "StochasticStrategy": _stochastic,
+}
+
+
+def supports(strategy_id: str) -> bool:
+    return strategy_id in VECTORIZED_SIGNALS
+
+
+# --- Order simulation ---
+def _fills_vectorized(entry: np.ndarray, exit_: np.ndarray):
+    """
+    Entry / exit fill bars assuming no order is rejected. Entry and exit
+    conditions of the supported strategies are mutually exclusive, so the
+    desired position is simply the last signal seen (forward-filled).
+    """
+    n = len(entry)
+    events = np.where(entry, 1.0, np.where(exit_, 0.0, np.nan))
+    desired = pd.Series(events).ffill().fillna(0.0).to_numpy()
+    change = np.diff(desired, prepend=0.0)
+    order_bars = np.flatnonzero(change != 0.0)
+    order_bars = order_bars[order_bars < n - 1]  # an order on the last bar never fills
+    fills = order_bars + 1
+    return fills[change[order_bars] > 0], fills[change[order_bars] < 0]
+
+
+def _fills_sequential(entry, exit_, open_, close, cash, stake, commission):
+    """ Event-by-event fallback used when some entry would be rejected for lack of cash. """
+    n = len(entry)
+    entries, exits = [], []
+    long = False
+    for i in np.flatnonzero(entry | exit_):
+        if i >= n - 1:
+            break
+        if not long and entry[i]:
+            cost_submit = stake * close[i] * (1.0 + commission)
+            cost_fill = stake * open_[i + 1] * (1.0 + commission)
+            if cash - cost_submit >= 0.0 and cash - cost_fill >= 0.0:
+                entries.append(i + 1)
+                cash -= cost_fill
+                long = True
+        elif long and exit_[i]:
+            exits.append(i + 1)
+            cash += stake * open_[i + 1] * (1.0 - commission)
+            long = False
+    return np.array(entries, dtype=int), np.array(exits, dtype=int)
+
+
+def simulate(df: pd.DataFrame, entry: np.ndarray, exit_: np.ndarray, cash: float, stake: int, commission: float) -> Dict[str, Any]:
+    """ Turns entry/exit signals into fills, a per-bar value curve and trade PnLs. """
+    open_ = df['Open'].to_numpy(dtype=float)
+    close = df['Close'].to_numpy(dtype=float)
+    n = len(close)
+
+    entries, exits = _fills_vectorized(entry, exit_)
+    closed = len(exits)
+    pnl = stake * (open_[exits] - open_[entries[:closed]]) - commission * stake * (open_[exits] + open_[entries[:closed]])
+    cash_before = cash + np.concatenate(([0.0], np.cumsum(pnl)))[:len(entries)]
+    affordable = (
+        (cash_before - stake * close[entries - 1] * (1.0 + commission) >= 0.0)
+        & (cash_before - stake * open_[entries] * (1.0 + commission) >= 0.0)
+    )
+    if not affordable.all():
+        entries, exits = _fills_sequential(entry, exit_, open_, close, cash, stake, commission)
+        closed = len(exits)
+        pnl = stake * (open_[exits] - open_[entries[:closed]]) - commission * stake * (open_[exits] + open_[entries[:closed]])
+
+    flows = np.zeros(n)
+    np.add.at(flows, entries, -stake * open_[entries] * (1.0 + commission))
+    np.add.at(flows, exits, stake * open_[exits] * (1.0 - commission))
+    held = np.zeros(n)
+    np.add.at(held, entries, stake)
+    np.add.at(held, exits, -stake)
+    value = cash + np.cumsum(flows) + np.cumsum(held) * close
+
+    return {
+        "value": value,
+        "entries": entries,
+        "exits": exits,
+        "trade_pnl": pnl,
+        "open_trades": len(entries) - closed,
+    }
+
+
+def run_vectorized_backtest(strategy_id: str, df: pd.DataFrame, params_dict: Dict[str, Any], cash: float, stake: int, commission: float) -> Dict[str, Any]:
+    """ Runs one supported strategy on one OHLCV frame and returns the metrics dict. """
+    params = strategy_params(strategy_id, params_dict)
+    entry, exit_ = VECTORIZED_SIGNALS[strategy_id](df, params)
+    sim = simulate(df, np.asarray(entry, dtype=bool), np.asarray(exit_, dtype=bool), cash, stake, commission)
+
+    value = sim["value"]
+    open_ = df['Open'].to_numpy(dtype=float)
+    entries, exits = sim["entries"][:len(sim["exits"])], sim["exits"]
+    trades = pd.DataFrame({
+        "feed": 0,
+        "entry_time": df.index[entries],
+        "exit_time": df.index[exits],
+        "size": stake,
+        "entry_price": open_[entries],
+        "exit_price": open_[exits],
+        "pnl": stake * (open_[exits] - open_[entries]),
+        "pnl_comm": sim["trade_pnl"],
+        "bars": exits - entries,
+    }, columns=TRADE_COLUMNS)
+
+    equity_curve = pd.Series(value, index=df.index, dtype=float)
+    open_entries = df.index[sim["entries"][len(exits):]]
+    return {
+        **compute_metrics(equity_curve, trades, cash, open_entries),
+        "equity_curve": equity_curve,
+        "trades": trades,
+    }
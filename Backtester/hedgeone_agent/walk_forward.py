@@ -0,0 +1,163 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+# Import from our package
+from .backtest_engine import run_backtest_metrics, START_CASH
+from .optimizer import build_param_grid, rank_results, SWEEP_METRICS
+from .config import SWEEP_ENGINE
+
+# --- WALK-FORWARD OPTIMIZATION ---
+# Each fold optimises parameters on an in-sample window and then evaluates
+# the winner on the following out-of-sample window. The out-of-sample run
+# covers in-sample + out-of-sample bars so indicators are warmed up, and
+# only the out-of-sample segment of its equity curve is kept; a position
+# still open at the boundary is therefore carried into the OOS window.
+
+
+def make_folds(index: pd.DatetimeIndex, in_sample_bars: int, out_of_sample_bars: int, step_bars: Optional[int] = None) -> List[Tuple[int, int, int]]:
+    """
+    Rolling (in_sample_start, oos_start, oos_end) bar positions over `index`;
+    oos_end is exclusive. Folds advance by `step_bars` (default: one OOS window).
+    """
+    step = step_bars or out_of_sample_bars
+    folds = []
+    start = 0
+    while start + in_sample_bars < len(index):
+        oos_start = start + in_sample_bars
+        folds.append((start, oos_start, min(oos_start + out_of_sample_bars, len(index))))
+        start += step
+    return folds
+
+
+# --- Worker-side state: feeds are sent once per worker ---
+_WORKER_FEEDS: List[pd.DataFrame] = []
+
+
+def _init_worker(data_feeds: List[pd.DataFrame]) -> None:
+    global _WORKER_FEEDS
+    _WORKER_FEEDS = data_feeds
+
+
+def _slice_feeds(start: pd.Timestamp, end: pd.Timestamp) -> List[pd.DataFrame]:
+    """ Bars with start <= datetime < end from every worker feed. """
+    return [df[(df.index >= start) & (df.index < end)] for df in _WORKER_FEEDS]
+
+
+def _failed_fold(fold: int, is_start, oos_start, oos_end, error: str) -> Dict[str, Any]:
+    return {
+        "fold": fold, "status": "error", "error": error,
+        "in_sample_start": is_start, "oos_start": oos_start, "oos_end": oos_end,
+        "params": None, "oos_return_pct": None, "oos_returns": pd.Series(dtype=float),
+    }
+
+
+def _run_fold(task) -> Dict[str, Any]:
+    fold, strategy_id, grid, rank_by, engine, is_start, oos_start, oos_end = task
+
+    # 1. Optimise on the in-sample window; combinations that fail are never chosen
+    in_sample = _slice_feeds(is_start, oos_start)
+    rows, errors = [], []
+    for params in grid:
+        try:
+            metrics = run_backtest_metrics(strategy_id, in_sample, params, engine)
+            rows.append({**params, **{name: metrics[name] for name in SWEEP_METRICS}})
+        except Exception as e:
+            errors.append(str(e))
+    if not rows:
+        return _failed_fold(fold, is_start, oos_start, oos_end,
+                            f"All {len(errors)} combination(s) failed in-sample: {errors[0] if errors else 'empty grid'}")
+    best = rank_results(rows, rank_by).iloc[0]
+    best_params = {name: best[name] for name in grid[0]} if grid[0] else {}
+    best_params = {k: (v.item() if hasattr(v, "item") else v) for k, v in best_params.items()}
+
+    # 2. Evaluate the winner out-of-sample (warmed up on the in-sample bars)
+    try:
+        metrics = run_backtest_metrics(strategy_id, _slice_feeds(is_start, oos_end), best_params, engine)
+    except Exception as e:
+        return _failed_fold(fold, is_start, oos_start, oos_end, f"Out-of-sample run failed: {e}")
+    curve = metrics["equity_curve"]
+    before = curve[curve.index < oos_start]
+    oos_curve = curve[curve.index >= oos_start]
+    base = before.iloc[-1] if len(before) else START_CASH
+    previous = oos_curve.shift(1)
+    if len(previous):
+        previous.iloc[0] = base
+    oos_returns = oos_curve / previous - 1.0
+
+    return {
+        "fold": fold,
+        "status": "ok",
+        "error": None,
+        "in_sample_start": is_start,
+        "oos_start": oos_start,
+        "oos_end": oos_curve.index[-1] if len(oos_curve) else oos_end,
+        "params": best_params,
+        f"in_sample_{rank_by}": best.get(rank_by),
+        "oos_return_pct": float((oos_curve.iloc[-1] / base - 1.0) * 100) if len(oos_curve) else 0.0,
+        "oos_returns": oos_returns,
+    }
+
+
+def run_walk_forward(
+    strategy_id: str,
+    data_feeds: List[pd.DataFrame],
+    in_sample_bars: int = 504,
+    out_of_sample_bars: int = 126,
+    param_ranges: Optional[Dict[str, Any]] = None,
+    rank_by: str = "sharpe",
+    step_bars: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    engine: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Runs walk-forward optimisation with folds in parallel across cores. Fold
+    boundaries follow the first feed's calendar. Returns {"folds": table of
+    per-fold chosen params and results, "equity_curve": the stitched
+    out-of-sample equity curve starting from START_CASH, "oos_return_pct"}.
+    A fold where every combination failed is kept with status "error" and
+    left out of the stitched curve.
+    """
+    feeds = [df for df in data_feeds if not df.empty]
+    if not feeds:
+        raise ValueError("No data provided.")
+    grid = build_param_grid(strategy_id, param_ranges)
+    index = feeds[0].index
+    folds = make_folds(index, in_sample_bars, out_of_sample_bars, step_bars)
+    if not folds:
+        raise ValueError(f"Need more than {in_sample_bars} bars for one fold; got {len(index)}.")
+
+    engine = engine or SWEEP_ENGINE
+    # oos_end is passed as an exclusive timestamp (the next bar, or just past the last one)
+    bounds = list(index) + [index[-1] + pd.Timedelta(microseconds=1)]
+    tasks = [
+        (i, strategy_id, grid, rank_by, engine, bounds[s], bounds[o], bounds[e])
+        for i, (s, o, e) in enumerate(folds)
+    ]
+    workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    print(f"--- Walk-forward: {len(tasks)} folds x {len(grid)} combinations of {strategy_id} on {workers} worker(s) ---")
+
+    if workers <= 1:
+        _init_worker(feeds)
+        results = [_run_fold(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(feeds,)) as pool:
+            results = list(pool.map(_run_fold, tasks))
+
+    # Stitch OOS returns in time order; overlapping folds (step < OOS window) keep the earliest
+    fold_returns = [r.pop("oos_returns") for r in results]
+    failed = [r for r in results if r["status"] != "ok"]
+    for r in failed:
+        print(f"--- Walk-forward: fold {r['fold']} failed: {r['error']} ---")
+    if len(failed) == len(results):
+        raise RuntimeError(f"Every walk-forward fold failed; first error: {failed[0]['error']}")
+    returns = pd.concat([r for r in fold_returns if len(r)] or [pd.Series(dtype=float)])
+    returns = returns[~returns.index.duplicated(keep="first")].sort_index()
+    equity_curve = START_CASH * (1.0 + returns).cumprod()
+    return {
+        "folds": pd.DataFrame(results),
+        "equity_curve": equity_curve,
+        "oos_return_pct": float((equity_curve.iloc[-1] / START_CASH - 1.0) * 100) if len(equity_curve) else 0.0,
+    }
@@ -0,0 +1,37 @@
+import sys
+import os
+import json
+import argparse
+
+# Add the package to the Python path
+sys.path.append(os.path.dirname(__file__))
+
+from hedgeone_agent.batch import load_universe, run_universe_backtest
+from hedgeone_agent.config import SYMBOL_CSV_PATH
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest one strategy across a symbol universe.")
+    parser.add_argument("strategy_id")
+    parser.add_argument("--start", required=True, help="Start date, YYYY-MM-DD")
+    parser.add_argument("--end", required=True, help="End date, YYYY-MM-DD")
+    parser.add_argument("--params", default="{}", help="Strategy params as JSON, e.g. '{\"n1\": 20, \"n2\": 50}'")
+    parser.add_argument("--universe", default=SYMBOL_CSV_PATH, help="CSV with a Symbol column (symbols.csv, F&O_symbols.csv)")
+    parser.add_argument("--filter", default=None, help="Case-insensitive regex on company name / symbol")
+    parser.add_argument("--limit", type=int, default=None, help="Only the first N matching symbols")
+    parser.add_argument("--out", default=None, help="Output CSV (default: batch_results/<strategy>_<timestamp>.csv)")
+    parser.add_argument("--workers", type=int, default=None, help="Backtest processes (default: all cores)")
+    parser.add_argument("--engine", default=None, choices=["backtrader", "vectorized"])
+    parser.add_argument("--resume", action="store_true", help="Skip symbols already done in --out and append the rest")
+    args = parser.parse_args()
+    if args.resume and not args.out:
+        parser.error("--resume needs --out (the CSV of the interrupted batch)")
+
+    symbols = load_universe(args.universe, args.filter, args.limit)
+    table = run_universe_backtest(
+        args.strategy_id, json.loads(args.params), symbols, args.start, args.end,
+        output_path=args.out, max_workers=args.workers, engine=args.engine, resume=args.resume,
+    )
+    print(table.head(20).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
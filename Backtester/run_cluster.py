@@ -0,0 +1,96 @@
+import sys
+import os
+import csv
+import json
+import argparse
+import subprocess
+
+# Add the package to the Python path
+sys.path.append(os.path.dirname(__file__))
+
+from hedgeone_agent.batch import load_universe
+from hedgeone_agent.distributed import run_coordinator, run_worker, ROW_FIELDS
+from hedgeone_agent.optimizer import build_param_grid
+from hedgeone_agent.config import SYMBOL_CSV_PATH, CLUSTER_HOST, CLUSTER_PORT, CLUSTER_BATCH_SIZE
+
+# --- MULTI-NODE UNIVERSE x PARAMETER SWEEPS ---
+#   python run_cluster.py coordinator RsiStrategy --start 2020-01-01 --end 2024-12-31 --host 0.0.0.0
+#   python run_cluster.py worker --host <coordinator host>          (on every worker host)
+#   python run_cluster.py local RsiStrategy --start ... --end ... --workers 3   (all on localhost)
+# Workers read OHLCV from HEDGEONE_DATA_CACHE_DIR (or --cache-dir), which must
+# point at the same shared directory the coordinator fills.
+
+
+def _param_grid(args):
+    if args.param_ranges:
+        return build_param_grid(args.strategy_id, json.loads(args.param_ranges))
+    return [json.loads(args.params)]
+
+
+def _coordinate(args, on_listening=None):
+    symbols = load_universe(args.universe, args.filter, args.limit)
+    table = run_coordinator(
+        args.strategy_id, symbols, _param_grid(args), args.start, args.end, args.host, args.port,
+        resolution=args.resolution, engine=args.engine, prefetch=not args.no_prefetch, on_listening=on_listening,
+    )
+    if args.out:
+        with open(args.out, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=ROW_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(table.to_dict("records"))
+        print(f"Results written to {args.out}")
+    print(table.head(20).to_string(index=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distribute universe x parameter backtests over TCP workers.")
+    modes = parser.add_subparsers(dest="mode", required=True)
+
+    for mode in ("coordinator", "local"):
+        sub = modes.add_parser(mode)
+        sub.add_argument("strategy_id")
+        sub.add_argument("--start", required=True, help="Start date, YYYY-MM-DD")
+        sub.add_argument("--end", required=True, help="End date, YYYY-MM-DD")
+        sub.add_argument("--params", default="{}", help="One parameter set as JSON")
+        sub.add_argument("--param-ranges", default=None, help="Sweep ranges as JSON, e.g. '{\"period\": {\"min\": 10, \"max\": 20, \"step\": 5}}'")
+        sub.add_argument("--universe", default=SYMBOL_CSV_PATH, help="CSV with a Symbol column (symbols.csv, F&O_symbols.csv)")
+        sub.add_argument("--filter", default=None, help="Case-insensitive regex on company name / symbol")
+        sub.add_argument("--limit", type=int, default=None, help="Only the first N matching symbols")
+        sub.add_argument("--resolution", default="D")
+        sub.add_argument("--engine", default=None, choices=["backtrader", "vectorized"])
+        sub.add_argument("--no-prefetch", action="store_true", help="Assume the shared cache is already filled")
+        sub.add_argument("--host", default=CLUSTER_HOST)
+        sub.add_argument("--port", type=int, default=CLUSTER_PORT)
+        sub.add_argument("--out", default=None, help="Also write all rows to this CSV")
+        if mode == "local":
+            sub.add_argument("--workers", type=int, default=2, help="Worker processes to start on this host")
+
+    sub = modes.add_parser("worker")
+    sub.add_argument("--host", default=CLUSTER_HOST)
+    sub.add_argument("--port", type=int, default=CLUSTER_PORT)
+    sub.add_argument("--batch", type=int, default=CLUSTER_BATCH_SIZE, help="Tasks pulled per request")
+    sub.add_argument("--cache-dir", default=None, help="Shared OHLCV cache (default: HEDGEONE_DATA_CACHE_DIR)")
+    sub.add_argument("--name", default=None)
+    args = parser.parse_args()
+
+    if args.mode == "worker":
+        run_worker(args.host, args.port, args.batch, args.cache_dir, args.name)
+        return
+
+    workers = []
+
+    def start_local_workers():
+        workers.extend(
+            subprocess.Popen([sys.executable, os.path.abspath(__file__), "worker", "--host", args.host,
+                              "--port", str(args.port), "--name", f"local{i}"])
+            for i in range(args.workers)
+        )
+
+    try:
+        _coordinate(args, start_local_workers if args.mode == "local" else None)
+    finally:
+        for worker in workers:
+            worker.wait(timeout=30)
+
+if __name__ == "__main__":
+    main()
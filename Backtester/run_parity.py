@@ -0,0 +1,16 @@
+import sys
+import os
+
+# Add the package to the Python path
+sys.path.append(os.path.dirname(__file__))
+
+from hedgeone_agent.parity import check_parity
+
+if __name__ == "__main__":
+    # Usage: python run_parity.py [StrategyId ...]
+    mismatches = check_parity(sys.argv[1:] or None)
+    for m in mismatches:
+        print(f"MISMATCH {m['strategy_id']} {m['params']} seed={m['seed']} {m['metric']}: "
+              f"backtrader={m['backtrader']} vectorized={m['vectorized']}")
+    print(f"Engine parity: {'OK' if not mismatches else f'{len(mismatches)} mismatch(es)'}")
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Tests never write the backtest result cache or results warehouse next to the checkout
+os.environ.setdefault("HEDGEONE_RESULT_CACHE", "0")
+os.environ.setdefault("HEDGEONE_RESULTS_STORE", "0")
+
+# Add the package to the Python path (same as the run_*.py scripts)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
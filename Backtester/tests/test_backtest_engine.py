@@ -0,0 +1,61 @@
+import backtrader as bt
+import pytest
+
+from hedgeone_agent import backtest_engine
+from hedgeone_agent.strategies import STRATEGY_REGISTRY
+from hedgeone_agent.synthetic_data import generate_ohlcv
+
+
+@pytest.mark.parametrize("strategy_id", ["SmaCrossStrategy", "RsiStrategy"])
+def test_bounded_memory_curve_keeps_bar_metrics(strategy_id):
+    df = generate_ohlcv(4000, seed=5, freq="15min")
+
+    def run(bounded_memory):
+        return backtest_engine._run_cerebro(STRATEGY_REGISTRY[strategy_id], [bt.feeds.PandasData(dataname=df)], {},
+                                            bounded_memory=bounded_memory)
+
+    full, daily = run(False), run(True)
+    assert full["total_trades"] > 0
+
+    # One point per day (plus the first bar) instead of one per bar
+    assert len(daily["equity_curve"]) == df.index.normalize().nunique() + 1
+    assert daily["equity_curve"].iloc[-1] == full["equity_curve"].iloc[-1]
+    for name in ("final_value", "total_trades", "sharpe", "cagr_pct", "max_drawdown_bars"):
+        assert daily[name] == full[name]
+    assert daily["trades"].equals(full["trades"])
+    for name in ("sortino", "max_drawdown_pct", "exposure_pct"):
+        assert daily[name] == pytest.approx(full[name])
+
+
+class BracketStrategy(bt.Strategy):
+    """ Whenever flat, buys at market with a stop loss and a take profit `band` away. """
+    params = (("every", 5), ("band", 0.01))
+
+    def __init__(self):
+        self.pending = []
+
+    def notify_order(self, order):
+        if not order.alive() and order in self.pending:
+            self.pending.remove(order)
+
+    def next(self):
+        if self.position or self.pending or len(self) % self.p.every:
+            return
+        price = self.data.close[0]
+        self.pending = list(self.buy_bracket(exectype=bt.Order.Market, stopprice=price * (1 - self.p.band),
+                                             limitprice=price * (1 + self.p.band)))
+
+
+def test_history_trim_keeps_bracket_orders_working(monkeypatch):
+    # Trim every few bars so it regularly lands while a bracket's children are still live
+    monkeypatch.setattr(backtest_engine, "TRIM_EVERY_BARS", 7)
+    df = generate_ohlcv(4000, seed=11, freq="15min")
+
+    def run(bounded_memory):
+        return backtest_engine._run_cerebro(BracketStrategy, [bt.feeds.PandasData(dataname=df)], {},
+                                            bounded_memory=bounded_memory)
+
+    full, trimmed = run(False), run(True)
+    assert full["total_trades"] > 50
+    assert trimmed["trades"].equals(full["trades"])
+    assert trimmed["final_value"] == full["final_value"]
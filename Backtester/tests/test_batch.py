@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+from hedgeone_agent import batch
+from hedgeone_agent.synthetic_data import generate_ohlcv
+
+
+def test_resume_skips_completed_symbols(tmp_path, monkeypatch):
+    fetched = []
+
+    def fake_history(symbol, start_date, end_date):
+        fetched.append(symbol)
+        if symbol == "NSE:BAD-EQ":
+            raise ConnectionError("timeout")
+        return generate_ohlcv(300, seed=len(symbol))
+
+    monkeypatch.setattr(batch, "get_historical_data", fake_history)
+    out = str(tmp_path / "batch.csv")
+    symbols = ["NSE:AAA-EQ", "NSE:BAD-EQ", "NSE:CCCC-EQ"]
+    params = {"n1": 10, "n2": 30}
+
+    first = batch.run_universe_backtest("SmaCrossStrategy", params, symbols[:2], "2020-01-01", "2021-01-01",
+                                        output_path=out, max_workers=1, engine="vectorized", store=False)
+    assert sorted(first["status"]) == ["error", "ok"]
+
+    fetched.clear()
+    second = batch.run_universe_backtest("SmaCrossStrategy", params, symbols, "2020-01-01", "2021-01-01",
+                                         output_path=out, max_workers=1, engine="vectorized", store=False, resume=True)
+
+    # The completed symbol is not fetched again; the failed one is retried
+    assert sorted(fetched) == ["NSE:BAD-EQ", "NSE:CCCC-EQ"]
+    assert len(second) == 3
+    written = pd.read_csv(out)
+    assert sorted(written["symbol"]) == sorted(symbols)
+    assert written.loc[written["symbol"] == "NSE:AAA-EQ", "total_return_pct"].iloc[0] == pytest.approx(
+        first.loc[first["symbol"] == "NSE:AAA-EQ", "total_return_pct"].iloc[0])
+
+
+def test_default_output_path_is_a_fresh_csv_under_the_results_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch, "BATCH_RESULTS_DIR", str(tmp_path / "batches"))
+    monkeypatch.setattr(batch, "get_historical_data", lambda symbol, start_date, end_date: generate_ohlcv(300))
+    out = batch.default_output_path("SmaCrossStrategy")
+
+    assert out.startswith(str(tmp_path / "batches")) and out.endswith(".csv")
+    batch.run_universe_backtest("SmaCrossStrategy", {}, ["NSE:AAA-EQ"], "2020-01-01", "2021-01-01",
+                                output_path=out, max_workers=1, engine="vectorized", store=False)
+    assert list(pd.read_csv(out)["symbol"]) == ["NSE:AAA-EQ"]
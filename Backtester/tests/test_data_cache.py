@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+
+import pandas as pd
+
+from hedgeone_agent.data_cache import OHLCVCache, _merge_intervals
+from hedgeone_agent.synthetic_data import generate_ohlcv
+
+
+def test_merge_intervals_joins_overlapping_and_adjacent_ranges():
+    d = lambda day: date(2024, 1, day)
+    merged = _merge_intervals([(d(10), d(12)), (d(1), d(3)), (d(4), d(5)), (d(11), d(15)), (d(20), d(20))])
+
+    assert merged == [(d(1), d(5)), (d(10), d(15)), (d(20), d(20))]
+
+
+def test_missing_ranges_are_the_gaps_in_coverage(tmp_path):
+    cache = OHLCVCache(str(tmp_path))
+    cache.mark_covered("NSE:TCS-EQ", "D", "2024-01-05", "2024-01-10")
+    cache.mark_covered("NSE:TCS-EQ", "D", "2024-01-15", "2024-01-20")
+
+    assert cache.missing_ranges("NSE:TCS-EQ", "D", "2024-01-01", "2024-01-31") == [
+        ("2024-01-01", "2024-01-04"), ("2024-01-11", "2024-01-14"), ("2024-01-21", "2024-01-31"),
+    ]
+    assert cache.missing_ranges("NSE:TCS-EQ", "D", "2024-01-06", "2024-01-09") == []
+    assert cache.missing_ranges("NSE:TCS-EQ", "D", "2024-01-08", "2024-01-16") == [("2024-01-11", "2024-01-14")]
+    # Other keys have no coverage of their own
+    assert cache.missing_ranges("NSE:INFY-EQ", "D", "2024-01-05", "2024-01-06") == [("2024-01-05", "2024-01-06")]
+
+
+def test_mark_covered_stops_before_today(tmp_path):
+    cache = OHLCVCache(str(tmp_path))
+    today = date.today()
+    cache.mark_covered("NSE:TCS-EQ", "D", today - timedelta(days=3), today + timedelta(days=2))
+
+    assert cache.coverage("NSE:TCS-EQ", "D") == [(today - timedelta(days=3), today - timedelta(days=1))]
+    assert cache.missing_ranges("NSE:TCS-EQ", "D", today - timedelta(days=3), today) == [(today.isoformat(), today.isoformat())]
+
+
+def test_unreadable_coverage_counts_as_nothing_cached(tmp_path):
+    cache = OHLCVCache(str(tmp_path))
+    cache.mark_covered("NSE:TCS-EQ", "D", "2024-01-01", "2024-01-10")
+    _, coverage_path = cache._paths("NSE:TCS-EQ", "D")
+    with open(coverage_path, "w") as f:
+        f.write("{not json")
+
+    assert cache.coverage("NSE:TCS-EQ", "D") == []
+    assert cache.missing_ranges("NSE:TCS-EQ", "D", "2024-01-01", "2024-01-10") == [("2024-01-01", "2024-01-10")]
+
+
+def test_write_rows_merges_with_later_rows_winning(tmp_path):
+    cache = OHLCVCache(str(tmp_path))
+    df = generate_ohlcv(10)
+    cache.write_rows("NSE:TCS-EQ", "D", df.iloc[:6])
+    update = df.iloc[4:].copy()
+    update["Close"] += 1.0
+    cache.write_rows("NSE:TCS-EQ", "D", update)
+
+    stored = cache.load("NSE:TCS-EQ", "D")
+    assert stored.index.equals(df.index)
+    pd.testing.assert_series_equal(stored["Close"].iloc[:4], df["Close"].iloc[:4], check_freq=False)
+    pd.testing.assert_series_equal(stored["Close"].iloc[4:], update["Close"], check_freq=False)
+
+
+def test_iter_chunks_streams_the_same_rows_as_read(tmp_path):
+    cache = OHLCVCache(str(tmp_path))
+    df = generate_ohlcv(3000, freq="min")
+    cache.write_rows("NSE:TCS-EQ", "1", df)
+    start, end = str(df.index[0].date()), str(df.index[1500].date())
+
+    chunks = list(cache.iter_chunks("NSE:TCS-EQ", "1", start, end, chunk_rows=400))
+    assert all(len(chunk) <= 400 for chunk in chunks)
+    pd.testing.assert_frame_equal(pd.concat(chunks), cache.read("NSE:TCS-EQ", "1", start, end), check_freq=False)
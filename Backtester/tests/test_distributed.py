@@ -0,0 +1,158 @@
+import os
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from hedgeone_agent import distributed
+from hedgeone_agent.data_cache import OHLCVCache
+from hedgeone_agent.distributed import Coordinator, make_tasks, run_worker
+from hedgeone_agent.synthetic_data import generate_ohlcv
+
+BACKTESTER_ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(distributed, "RECONNECT_DELAY_SECONDS", 0.05)
+    monkeypatch.setattr(distributed, "RECONNECT_MAX_DELAY_SECONDS", 0.2)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class ScriptedCoordinator(socketserver.ThreadingTCPServer):
+    """ Replies to each connection from `script(connection_number, message)`; None drops the connection. """
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, script, port=0):
+        self.script = script
+        self.connections = 0
+        self.received = []
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                server.connections += 1
+                number = server.connections
+                while True:
+                    message = distributed._receive(self.rfile)
+                    if message is None:
+                        return
+                    server.received.append((number, message["op"]))
+                    reply = server.script(number, message)
+                    if reply is None:
+                        return
+                    distributed._send(self.wfile, reply)
+
+        super().__init__(("127.0.0.1", port), Handler)
+        threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+
+
+def test_worker_reconnects_after_a_dropped_connection(tmp_path):
+    def script(number, message):
+        if message["op"] == "hello":
+            return {"op": "welcome"}
+        # First session dies on its first pull; the second is told everything is done
+        return None if number == 1 else {"op": "done"}
+
+    server = ScriptedCoordinator(script)
+    try:
+        assert run_worker(*server.server_address, cache_dir=str(tmp_path), name="w", connect_timeout=5) == 0
+    finally:
+        server.close()
+    assert server.received == [(1, "hello"), (1, "pull"), (2, "hello"), (2, "pull")]
+
+
+def test_worker_waits_for_a_coordinator_that_starts_late(tmp_path):
+    port = _free_port()
+    servers = []
+    timer = threading.Timer(0.5, lambda: servers.append(ScriptedCoordinator(
+        lambda number, message: {"op": "welcome"} if message["op"] == "hello" else {"op": "done"}, port)))
+    timer.start()
+    try:
+        assert run_worker("127.0.0.1", port, cache_dir=str(tmp_path), name="w", connect_timeout=10) == 0
+    finally:
+        timer.join()
+        for server in servers:
+            server.close()
+
+
+def test_worker_gives_up_when_the_coordinator_never_starts(tmp_path):
+    with pytest.raises(OSError):
+        run_worker("127.0.0.1", _free_port(), cache_dir=str(tmp_path), connect_timeout=0.3)
+
+
+def test_error_reply_to_a_result_is_raised(tmp_path):
+    task = make_tasks("SmaCrossStrategy", ["NSE:NONE-EQ"], [{}], "2020-01-01", "2020-12-31")[0]
+
+    def script(number, message):
+        if message["op"] == "hello":
+            return {"op": "welcome"}
+        if message["op"] == "pull":
+            return {"op": "tasks", "tasks": [task]}
+        return {"op": "error", "error": "result rejected"}
+
+    server = ScriptedCoordinator(script)
+    try:
+        with pytest.raises(RuntimeError, match="result rejected"):
+            run_worker(*server.server_address, cache_dir=str(tmp_path), name="w", connect_timeout=5)
+    finally:
+        server.close()
+
+
+def test_killed_worker_tasks_are_requeued_and_finished(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    cache = OHLCVCache(cache_dir)
+    symbols = [f"NSE:SYN{i}-EQ" for i in range(3)]
+    for i, symbol in enumerate(symbols):
+        cache.write_rows(symbol, "D", generate_ohlcv(1000, seed=i))
+    tasks = make_tasks("SmaCrossStrategy", symbols, [{"n1": n1, "n2": 30} for n1 in (5, 10, 15)],
+                       "2000-01-01", "2004-12-31", engine="backtrader")
+    coordinator = Coordinator(tasks, "127.0.0.1", 0, lease_seconds=600, store=False)
+    host, port = coordinator.address
+    table = {}
+    server = threading.Thread(target=lambda: table.update(result=coordinator.run(timeout=180)), daemon=True)
+    server.start()
+
+    def start_worker(name):
+        code = f"from hedgeone_agent.distributed import run_worker; run_worker({host!r}, {port}, 4, {cache_dir!r}, {name!r})"
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join([BACKTESTER_ROOT, os.environ.get("PYTHONPATH", "")])}
+        return subprocess.Popen([sys.executable, "-c", code], env=env, stdout=subprocess.DEVNULL)
+
+    # The first worker is killed as soon as it holds a batch
+    victim = start_worker("victim")
+    deadline = time.monotonic() + 60
+    while not coordinator._leases:
+        assert time.monotonic() < deadline and victim.poll() is None
+        time.sleep(0.01)
+    victim.send_signal(signal.SIGKILL)
+    victim.wait()
+
+    workers = [start_worker(f"local{i}") for i in range(2)]
+    try:
+        server.join(timeout=180)
+        assert [worker.wait(timeout=30) for worker in workers] == [0, 0]
+    finally:
+        for worker in workers:
+            worker.kill()
+
+    rows = table["result"]
+    assert len(rows) == len(tasks)
+    assert set(rows["status"]) == {"ok"}
+    assert not rows["worker"].str.startswith("victim").any()
+    # The victim's batch went out a second time
+    assert max(coordinator._attempts.values()) == 2
@@ -0,0 +1,252 @@
+import json
+import multiprocessing
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from hedgeone_agent.fyers_gateway import FyersGateway, SharedTokenBucket, TokenBucket, account_bucket_path
+
+
+class FakeFyers:
+    """ Stands in for fyersModel.FyersModel: records call times, replays scripted responses. """
+
+    def __init__(self, responses=None, delay=0.0):
+        self.responses = list(responses or [])
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _respond(self, endpoint, data):
+        with self._lock:
+            self.calls.append((endpoint, time.monotonic()))
+            response = self.responses.pop(0) if self.responses else {"s": "ok", "data": data}
+        time.sleep(self.delay)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def history(self, data):
+        return self._respond("history", data)
+
+    def quotes(self, data):
+        return self._respond("quotes", data)
+
+    def get_profile(self):
+        return self._respond("get_profile", None)
+
+
+def test_token_bucket_bursts_then_paces():
+    bucket = TokenBucket(rate=50.0, capacity=3)
+    began = time.monotonic()
+    waits = [bucket.acquire() for _ in range(6)]
+
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert all(w > 0 for w in waits[3:])
+    # Three tokens beyond the burst at 50/s take about 60 ms
+    assert time.monotonic() - began >= 0.05
+
+
+def test_global_bucket_caps_all_endpoints_together():
+    client = FakeFyers()
+    gateway = FyersGateway(client, limits={"history": (100.0, 10), "quotes": (100.0, 10)}, global_limit=(20.0, 2))
+    began = time.monotonic()
+    for i in range(6):
+        gateway.history({"symbol": f"H{i}"})
+        gateway.quotes({"symbols": f"Q{i}"})
+    gateway.get_profile()
+    elapsed = time.monotonic() - began
+
+    # 13 calls, 2 of them burst, the rest at 20/s: at least 0.55 s however the endpoints are mixed
+    assert len(client.calls) == 13
+    assert elapsed >= 0.5
+    assert gateway.stats()["history"]["throttle_waits"] > 0
+    assert gateway.stats()["get_profile"]["throttle_waits"] > 0
+
+
+def test_without_global_bucket_endpoints_are_independent():
+    client = FakeFyers()
+    gateway = FyersGateway(client, limits={"history": (1000.0, 10), "quotes": (1000.0, 10)}, global_limit=None)
+    began = time.monotonic()
+    for i in range(5):
+        gateway.history({"symbol": f"H{i}"})
+        gateway.quotes({"symbols": f"Q{i}"})
+
+    assert time.monotonic() - began < 0.2
+
+
+def test_retries_transient_responses():
+    client = FakeFyers([{"s": "error", "code": 429, "message": "request limit reached"}, {"s": "error", "code": -503}])
+    gateway = FyersGateway(client, base_delay=0.001, max_delay=0.01)
+
+    assert gateway.history({"symbol": "X"})["s"] == "ok"
+    assert gateway.stats()["history"]["retries"] == 2
+    assert len(client.calls) == 3
+
+
+def test_non_transient_error_is_returned_without_retry():
+    client = FakeFyers([{"s": "error", "code": -300, "message": "invalid symbol"}])
+    gateway = FyersGateway(client, base_delay=0.001)
+
+    assert gateway.history({"symbol": "X"})["code"] == -300
+    assert len(client.calls) == 1
+
+
+def test_gives_up_after_max_retries():
+    client = FakeFyers([ConnectionError("reset")] * 3)
+    gateway = FyersGateway(client, max_retries=2, base_delay=0.001, max_delay=0.01)
+
+    with pytest.raises(ConnectionError):
+        gateway.history({"symbol": "X"})
+    assert gateway.stats()["history"]["failures"] == 1
+    assert len(client.calls) == 3
+
+
+def test_identical_inflight_requests_are_coalesced():
+    client = FakeFyers(delay=0.2)
+    gateway = FyersGateway(client)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(gateway.history({"symbol": "X"}))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(client.calls) == 1
+    assert len(results) == 4
+    assert gateway.stats()["history"]["coalesced"] == 3
+
+
+def test_no_response_code_from_the_sdk_is_retried():
+    client = FakeFyers([{"s": "error", "code": -99, "message": "Bad request"}])
+    gateway = FyersGateway(client, base_delay=0.001)
+
+    assert gateway.history({"symbol": "X"})["s"] == "ok"
+    assert len(client.calls) == 2
+
+    client = FakeFyers([{"s": "error", "code": -99, "message": "invalid input please check your input"}])
+    assert FyersGateway(client, base_delay=0.001).history({"symbol": "X"})["code"] == -99
+    assert len(client.calls) == 1
+
+
+# --- Shared account bucket across processes ---
+def _drain_shared_bucket(path, n):
+    bucket = SharedTokenBucket(20.0, 2, path)
+    for _ in range(n):
+        bucket.acquire()
+    return time.monotonic()
+
+
+def test_shared_bucket_paces_several_processes_together(tmp_path):
+    path = str(tmp_path / "account.bucket")
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(3) as pool:
+        # Import cost stays outside the timing
+        pool.map(time.sleep, [0.1] * 3)
+        began = time.monotonic()
+        finished = pool.starmap(_drain_shared_bucket, [(path, 4)] * 3)
+
+    # 12 tokens, 2 of them burst, the rest at 20/s overall: at least 0.5 s, not the 0.1 s a per-process bucket allows
+    assert max(finished) - began >= 0.45
+
+
+def test_gateways_sharing_state_share_the_budget(tmp_path):
+    path = str(tmp_path / "account.bucket")
+    client = FakeFyers()
+    gateways = [FyersGateway(client, limits={"history": (1000.0, 100)}, global_limit=(20.0, 2), shared_state=path) for _ in range(2)]
+    began = time.monotonic()
+    for i in range(6):
+        gateways[i % 2].history({"symbol": f"H{i}"})
+
+    assert time.monotonic() - began >= 0.18
+    assert account_bucket_path("XJ1234-100") != account_bucket_path("AB9876-100")
+    assert account_bucket_path("../x").endswith("hedgeone_fyers____x.bucket")
+
+
+# --- Real fyers_apiv3 client against a local fake Fyers server ---
+class FakeFyersServer(ThreadingHTTPServer):
+    """ Serves GET /data/history, replaying (status, body) from `script`; body None drops the connection. """
+    daemon_threads = True
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.requests.append(self.path)
+                status, body = server.script.pop(0) if server.script else (200, {"s": "ok", "code": 200, "candles": [[1, 2, 3, 1, 2, 10]]})
+                if body is None:
+                    self.close_connection = True
+                    return
+                payload = json.dumps(body).encode() if isinstance(body, dict) else body.encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json" if isinstance(body, dict) else "text/html")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        super().__init__(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+
+@pytest.fixture
+def fyers_server(monkeypatch, tmp_path):
+    fyers_model = pytest.importorskip("fyers_apiv3.fyersModel")
+    servers = []
+
+    def start(script):
+        server = FakeFyersServer(script)
+        servers.append(server)
+        monkeypatch.setattr(fyers_model.Config, "DATA_API", f"http://127.0.0.1:{server.server_address[1]}/data")
+        client = fyers_model.FyersModel(client_id="TEST-100", token="token", is_async=False, log_path=str(tmp_path))
+        return server, FyersGateway(client, base_delay=0.001, max_delay=0.01)
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+HISTORY_REQUEST = {"symbol": "NSE:TCS-EQ", "resolution": "D", "date_format": "1", "range_from": "2024-01-01", "range_to": "2024-01-31"}
+
+
+def test_http_429_and_5xx_are_retried_over_the_wire(fyers_server):
+    server, gateway = fyers_server([
+        (429, {"s": "error", "code": 429, "message": "request limit reached"}),
+        (503, "<html>Service Unavailable</html>"),
+        (502, {"s": "error", "code": 502, "message": "bad gateway"}),
+    ])
+    response = gateway.history(HISTORY_REQUEST)
+
+    assert response["s"] == "ok" and response["candles"]
+    assert len(server.requests) == 4
+    assert server.requests[0].startswith("/data/history?symbol=NSE%3ATCS-EQ")
+    assert gateway.stats()["history"]["retries"] == 3
+
+
+def test_dropped_connection_is_retried_over_the_wire(fyers_server):
+    server, gateway = fyers_server([(200, None)])
+
+    assert gateway.history(HISTORY_REQUEST)["s"] == "ok"
+    assert len(server.requests) == 2
+
+
+def test_client_errors_come_back_without_retry_over_the_wire(fyers_server):
+    server, gateway = fyers_server([(400, {"s": "error", "code": -300, "message": "invalid symbol"})] * 3)
+
+    assert gateway.history(HISTORY_REQUEST)["code"] == -300
+    assert len(server.requests) == 1
+
+
+def test_persistent_throttling_gives_up_with_the_last_response(fyers_server):
+    server, gateway = fyers_server([(429, {"s": "error", "code": 429, "message": "request limit reached"})] * 10)
+
+    assert gateway.history(HISTORY_REQUEST)["code"] == 429
+    assert len(server.requests) == gateway.max_retries + 1
+    assert gateway.stats()["history"]["failures"] == 1
@@ -0,0 +1,83 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("faiss")
+pytest.importorskip("langchain_community")
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from hedgeone_agent.index_manifest import MANIFEST_FILE, document_id, sync_vector_store
+
+
+class CountingEmbeddings(Embeddings):
+    """ Deterministic toy vectors; records every text it embeds. """
+
+    def __init__(self):
+        self.embedded = []
+
+    def embed_documents(self, texts):
+        self.embedded += texts
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), float(sum(map(ord, text)) % 997), 1.0]
+
+
+def _docs(*texts):
+    return [Document(page_content=text) for text in texts]
+
+
+def test_first_sync_builds_and_writes_the_manifest(tmp_path):
+    path, embeddings = str(tmp_path / "index"), CountingEmbeddings()
+    store, counts = sync_vector_store(path, _docs("TCS,NSE:TCS-EQ", "INFY,NSE:INFY-EQ", "TCS,NSE:TCS-EQ"), embeddings, model_name="toy")
+
+    assert counts == {"added": 2, "removed": 0, "unchanged": 0, "rebuilt": 1}
+    assert sorted(embeddings.embedded) == ["INFY,NSE:INFY-EQ", "TCS,NSE:TCS-EQ"]
+    with open(os.path.join(path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    assert manifest["embedding_model"] == "toy"
+    assert manifest["ids"] == sorted(document_id(d) for d in _docs("TCS,NSE:TCS-EQ", "INFY,NSE:INFY-EQ"))
+
+
+def test_resync_embeds_only_the_diff(tmp_path):
+    path = str(tmp_path / "index")
+    sync_vector_store(path, _docs("a", "b", "c"), CountingEmbeddings(), model_name="toy")
+
+    embeddings = CountingEmbeddings()
+    store, counts = sync_vector_store(path, _docs("a", "c", "d"), embeddings, model_name="toy")
+    assert counts == {"added": 1, "removed": 1, "unchanged": 2, "rebuilt": 0}
+    assert embeddings.embedded == ["d"]
+    assert sorted(d.page_content for d in store.docstore._dict.values()) == ["a", "c", "d"]
+
+    embeddings = CountingEmbeddings()
+    _, counts = sync_vector_store(path, _docs("a", "c", "d"), embeddings, model_name="toy")
+    assert counts == {"added": 0, "removed": 0, "unchanged": 3, "rebuilt": 0}
+    assert embeddings.embedded == []
+
+
+def test_metadata_changes_count_as_changed_rows(tmp_path):
+    path = str(tmp_path / "index")
+    sync_vector_store(path, [Document(page_content="a", metadata={"lot": 1})], CountingEmbeddings(), model_name="toy")
+
+    _, counts = sync_vector_store(path, [Document(page_content="a", metadata={"lot": 2})], CountingEmbeddings(), model_name="toy")
+    assert counts == {"added": 1, "removed": 1, "unchanged": 0, "rebuilt": 0}
+
+
+def test_model_change_or_broken_manifest_rebuilds(tmp_path):
+    path = str(tmp_path / "index")
+    sync_vector_store(path, _docs("a", "b"), CountingEmbeddings(), model_name="toy")
+
+    _, counts = sync_vector_store(path, _docs("a", "b"), CountingEmbeddings(), model_name="other")
+    assert counts["rebuilt"] == 1
+
+    with open(os.path.join(path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    manifest["ids"] = manifest["ids"][:1]
+    with open(os.path.join(path, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f)
+    embeddings = CountingEmbeddings()
+    _, counts = sync_vector_store(path, _docs("a", "b"), embeddings, model_name="other")
+    assert counts["rebuilt"] == 1 and sorted(embeddings.embedded) == ["a", "b"]
@@ -0,0 +1,113 @@
+import os
+import time
+
+import pytest
+
+from hedgeone_agent.job_queue import JobQueue
+
+
+def trivial_job(strategy_id, symbols, start_date, end_date, params_dict, resolution):
+    """ Stand-in for run_symbols_backtest_internal; `strategy_id` picks the behaviour. """
+    if strategy_id == "sleep":
+        time.sleep(params_dict.get("seconds", 60))
+    elif strategy_id == "raise":
+        raise ValueError("bad params")
+    elif strategy_id == "crash":
+        os._exit(3)
+    return f"Result of {strategy_id} on {','.join(symbols)} ({os.getpid()})"
+
+
+@pytest.fixture
+def queue():
+    job_queue = JobQueue(max_workers=1, timeout=30, target=trivial_job)
+    yield job_queue
+    job_queue.shutdown()
+
+
+def _submit(job_queue, strategy_id, timeout=None, **params):
+    return job_queue.submit(strategy_id, ["NSE:TCS-EQ"], "2024-01-01", "2024-06-30", params, timeout=timeout)
+
+
+def _wait_running(job_queue, job_id, seconds=30):
+    deadline = time.monotonic() + seconds
+    while job_queue.status(job_id)["status"] == "queued":
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+
+def test_submit_runs_to_done(queue):
+    finished = []
+    queue.add_listener(finished.append)
+    job = queue.wait(_submit(queue, "echo"), timeout=60)
+
+    assert job["status"] == "done"
+    assert job["result"].startswith("Result of echo on NSE:TCS-EQ")
+    assert job["error"] is None and job["finished"] >= job["started"]
+    assert [j["job_id"] for j in finished] == [job["job_id"]]
+
+
+def test_exception_in_job_is_reported_as_error(queue):
+    job = queue.wait(_submit(queue, "raise"), timeout=60)
+
+    assert job["status"] == "error"
+    assert job["error"] == "ValueError: bad params"
+
+
+def test_cancel_queued_job_never_runs_it(queue):
+    running = _submit(queue, "sleep", seconds=2)
+    queued = _submit(queue, "echo")
+
+    assert queue.cancel(queued)
+    assert queue.status(queued)["status"] == "cancelled"
+    assert queue.wait(running, timeout=60)["status"] == "done"
+    assert queue.status(queued)["started"] is None
+    assert not queue.cancel(queued)
+
+
+def test_cancel_running_job_replaces_the_worker(queue):
+    job_id = _submit(queue, "sleep")
+    _wait_running(queue, job_id)
+    old_pid = queue._workers[0].process.pid
+
+    assert queue.cancel(job_id)
+    assert queue.status(job_id)["status"] == "cancelled"
+    # The queue keeps serving on the replacement worker
+    job = queue.wait(_submit(queue, "echo"), timeout=60)
+    assert job["status"] == "done"
+    assert queue._workers[0].process.pid != old_pid
+    assert str(old_pid) not in job["result"]
+
+
+def test_running_job_times_out_and_the_queue_recovers(queue):
+    job = queue.wait(_submit(queue, "sleep", timeout=1.0), timeout=60)
+
+    assert job["status"] == "timeout"
+    assert "Timed out after 1s" in job["error"]
+    assert queue.wait(_submit(queue, "echo"), timeout=60)["status"] == "done"
+
+
+def test_worker_crash_is_reported_as_error(queue):
+    job = queue.wait(_submit(queue, "crash"), timeout=60)
+
+    assert job["status"] == "error"
+    assert job["error"] == "Worker process exited unexpectedly."
+    assert queue.wait(_submit(queue, "echo"), timeout=60)["status"] == "done"
+
+
+def test_killed_worker_does_not_block_the_others():
+    job_queue = JobQueue(max_workers=2, timeout=30, target=trivial_job)
+    try:
+        stuck = _submit(job_queue, "sleep")
+        _wait_running(job_queue, stuck)
+        jobs = [_submit(job_queue, "echo") for _ in range(4)]
+        assert job_queue.cancel(stuck)
+        assert [job_queue.wait(j, timeout=60)["status"] for j in jobs] == ["done"] * 4
+    finally:
+        job_queue.shutdown()
+
+
+def test_submit_after_shutdown_raises():
+    job_queue = JobQueue(max_workers=1, target=trivial_job)
+    job_queue.shutdown()
+    with pytest.raises(RuntimeError):
+        _submit(job_queue, "echo")
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hedgeone_agent.metrics import compute_metrics, max_drawdown
+from hedgeone_agent.results import empty_trades
+
+
+def _trades(rows):
+    trades = empty_trades()
+    for i, (entry, exit_, pnl) in enumerate(rows):
+        trades.loc[i] = [0, pd.Timestamp(entry), pd.Timestamp(exit_), 1, 100.0, 100.0 + pnl, pnl, pnl, 1]
+    return trades
+
+
+def test_compute_metrics_on_a_hand_checked_run():
+    index = pd.date_range("2022-01-03", periods=6, freq="D")
+    curve = pd.Series([1000.0, 1100.0, 990.0, 1045.0, 1200.0, 1150.0], index=index)
+    trades = _trades([("2022-01-03", "2022-01-05", -10.0), ("2022-01-06", "2022-01-07", 200.0), ("2022-01-07", "2022-01-08", 0.0)])
+
+    metrics = compute_metrics(curve, trades, start_cash=1000.0, open_entries=[pd.Timestamp("2022-01-08")])
+
+    assert metrics["final_value"] == 1150.0
+    assert metrics["total_return_pct"] == pytest.approx(15.0)
+    # 1100 -> 990 is the deepest drop; 990 and 1045 sit below the 1100 peak
+    assert metrics["max_drawdown_pct"] == pytest.approx(10.0)
+    assert metrics["max_drawdown_bars"] == 2
+    # The open trade counts towards the total; a zero P&L trade counts as won
+    assert metrics["total_trades"] == 4
+    assert metrics["won_trades"] == 2
+    assert metrics["win_rate"] == pytest.approx(50.0)
+    assert metrics["profit_factor"] == pytest.approx(20.0)
+    # Held from each entry bar up to (not on) its exit bar, and from the open entry on: all but 01-05
+    assert metrics["exposure_pct"] == pytest.approx(5 / 6 * 100)
+    years = 5 / 365.25
+    assert metrics["cagr_pct"] == pytest.approx((1.15 ** (1 / years) - 1) * 100)
+
+
+def test_compute_metrics_handles_a_flat_run_without_trades():
+    curve = pd.Series(1000.0, index=pd.date_range("2022-01-03", periods=5, freq="D"))
+    metrics = compute_metrics(curve, empty_trades(), start_cash=1000.0)
+
+    assert metrics["total_trades"] == 0 and metrics["win_rate"] == 0
+    assert metrics["profit_factor"] is None
+    assert metrics["sortino"] is None
+    assert metrics["max_drawdown_pct"] == 0.0 and metrics["max_drawdown_bars"] == 0
+    assert metrics["exposure_pct"] == 0.0
+    assert metrics["cagr_pct"] == pytest.approx(0.0)
+
+
+def test_sharpe_uses_yearly_returns_against_the_risk_free_rate():
+    index = pd.DatetimeIndex(["2020-06-30", "2020-12-31", "2021-12-31", "2022-12-30"])
+    curve = pd.Series([1000.0, 1100.0, 1210.0, 1089.0], index=index)
+    metrics = compute_metrics(curve, empty_trades(), start_cash=1000.0)
+
+    excess = np.array([0.10, 0.10, -0.10]) - 0.01
+    assert metrics["sharpe"] == pytest.approx(excess.mean() / excess.std())
+
+
+def test_max_drawdown_counts_the_longest_underwater_stretch():
+    dd = max_drawdown(np.array([100.0, 90.0, 95.0, 101.0, 99.0, 98.0, 97.0, 96.0, 102.0]))
+
+    assert dd["max_drawdown_pct"] == pytest.approx(10.0)
+    assert dd["max_drawdown_bars"] == 4
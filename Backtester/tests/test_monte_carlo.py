@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hedgeone_agent.monte_carlo import run_monte_carlo, format_monte_carlo
+from hedgeone_agent.results import BacktestResult, empty_trades
+
+
+def _result(pnl, n_bars=250, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2022-01-03", periods=n_bars, freq="B")
+    curve = pd.Series(100_000.0 * np.cumprod(1.0 + rng.normal(0.0005, 0.01, n_bars)), index=index)
+    trades = empty_trades()
+    for i, value in enumerate(pnl):
+        trades.loc[i] = [0, index[i], index[i + 1], 1, 100.0, 100.0 + value, value, value, 1]
+    return BacktestResult(strategy_id="SmaCrossStrategy", symbols=["NSE:TCS-EQ"], params={}, engine="vectorized",
+                          metrics={"start_cash": 100_000.0}, equity_curve=curve, trades=trades.drop(columns="feed"))
+
+
+def test_shuffle_keeps_the_final_value_and_widens_drawdown():
+    pnl = [500.0, -300.0, 800.0, -1200.0, 400.0, 250.0, -100.0, 900.0]
+    report = run_monte_carlo(_result(pnl), n_resamples=2000, methods=["shuffle"], seed=1)
+
+    stats = report["methods"]["shuffle"]
+    # Reordering trades never changes where the run ends
+    final = 100_000.0 + sum(pnl)
+    assert stats["final_value"]["low"] == pytest.approx(final) and stats["final_value"]["high"] == pytest.approx(final)
+    assert stats["prob_loss"] == 0.0
+    dd = stats["max_drawdown_pct"]
+    assert dd["low"] <= dd["observed"] <= dd["high"]
+    assert dd["low"] < dd["high"]
+
+
+def test_seeded_runs_are_reproducible_and_batch_size_independent():
+    result = _result([500.0, -300.0, 800.0, -1200.0, 400.0])
+    first = run_monte_carlo(result, n_resamples=500, seed=7, batch_size=100)
+    again = run_monte_carlo(result, n_resamples=500, seed=7, batch_size=100)
+
+    assert first == again
+    assert set(first["methods"]) == {"shuffle", "bootstrap", "skip"}
+    for stats in first["methods"].values():
+        for name in ("final_value", "max_drawdown_pct", "sharpe"):
+            assert stats[name]["low"] <= stats[name]["median"] <= stats[name]["high"]
+
+
+def test_bootstrap_observed_metrics_come_from_the_equity_curve():
+    result = _result([])
+    report = run_monte_carlo(result, n_resamples=200, seed=3)
+
+    # No closed trades: only the bootstrap can run
+    assert list(report["methods"]) == ["bootstrap"]
+    curve = result.equity_curve.to_numpy()
+    observed = report["methods"]["bootstrap"]
+    assert observed["final_value"]["observed"] == pytest.approx(curve[-1])
+    peak = np.maximum.accumulate(curve)
+    assert observed["max_drawdown_pct"]["observed"] == pytest.approx((100.0 * (peak - curve) / peak).max())
+
+
+def test_skip_with_zero_probability_replays_the_trades():
+    pnl = [500.0, -300.0, 800.0]
+    report = run_monte_carlo(_result(pnl), n_resamples=100, methods=["skip"], skip_prob=0.0, seed=0)
+
+    fv = report["methods"]["skip"]["final_value"]
+    assert fv["low"] == fv["high"] == pytest.approx(100_000.0 + sum(pnl))
+
+
+def test_rejects_unknown_methods_and_bad_confidence():
+    result = _result([1.0, 2.0])
+    with pytest.raises(ValueError):
+        run_monte_carlo(result, methods=["jackknife"])
+    with pytest.raises(ValueError):
+        run_monte_carlo(result, confidence=1.0)
+
+
+def test_format_reports_when_nothing_can_be_resampled():
+    result = _result([], n_bars=1)
+    assert format_monte_carlo(run_monte_carlo(result, n_resamples=10)).startswith("Monte Carlo: not enough")
@@ -0,0 +1,73 @@
+import math
+
+import pandas as pd
+import pytest
+
+from hedgeone_agent import optimizer
+from hedgeone_agent.backtest_engine import run_backtest_metrics
+from hedgeone_agent.optimizer import build_param_grid, rank_results, run_parameter_sweep
+from hedgeone_agent.synthetic_data import generate_ohlcv
+
+
+def test_default_grid_expands_the_sweep_ranges():
+    grid = build_param_grid("SmaCrossStrategy")
+
+    # n1: 5..100 step 5, n2: 20..250 step 10, both ends inclusive
+    assert len(grid) == 20 * 24
+    assert grid[0] == {"n1": 5, "n2": 20} and grid[1] == {"n1": 5, "n2": 30}
+    assert grid[-1] == {"n1": 100, "n2": 250}
+    assert all(isinstance(v, int) for params in grid for v in params.values())
+
+
+def test_overrides_take_ranges_lists_and_scalars():
+    grid = build_param_grid("BollingerBandsReversion", {"period": [10, 20], "devfactor": {"min": 1.0, "max": 1.5, "step": 0.1}})
+
+    assert [params["devfactor"] for params in grid[:6]] == [1.0, 1.1, 1.2, 1.3, 1.4, 1.5]
+    assert sorted({params["period"] for params in grid}) == [10, 20]
+    assert len(grid) == 12
+    assert build_param_grid("SmaCrossStrategy", {"n1": 10, "n2": "50"})[0] == {"n1": 10, "n2": 50}
+
+
+def test_bad_sweeps_are_rejected(monkeypatch):
+    with pytest.raises(ValueError, match="Unknown parameter"):
+        build_param_grid("SmaCrossStrategy", {"n3": [1]})
+    with pytest.raises(ValueError, match="step must be positive"):
+        build_param_grid("SmaCrossStrategy", {"n1": {"min": 5, "max": 10, "step": 0}})
+    with pytest.raises(ValueError, match="not found"):
+        build_param_grid("NoSuchStrategy")
+    monkeypatch.setattr(optimizer, "SWEEP_MAX_COMBINATIONS", 100)
+    with pytest.raises(ValueError, match="480 combinations; the limit is 100"):
+        build_param_grid("SmaCrossStrategy")
+
+
+def test_rank_results_orders_best_first_with_missing_metrics_last():
+    rows = [
+        {"n1": 1, "sharpe": 0.5, "max_drawdown_pct": 12.0},
+        {"n1": 2, "sharpe": None, "max_drawdown_pct": float("nan")},
+        {"n1": 3, "error": "boom"},
+        {"n1": 4, "sharpe": 1.5, "max_drawdown_pct": 3.0},
+        {"n1": 5, "sharpe": -0.2, "max_drawdown_pct": 8.0},
+    ]
+
+    assert list(rank_results(rows, "sharpe")["n1"]) == [4, 1, 5, 2, 3]
+    # Drawdown is better when smaller
+    assert list(rank_results(rows, "max_drawdown_pct")["n1"]) == [4, 5, 1, 2, 3]
+    assert list(rank_results(rows, "sharpe", top_n=2)["n1"]) == [4, 1]
+    assert math.isnan(rank_results(rows, "sharpe").loc[3, "sharpe"])
+    # An unknown metric leaves the rows in grid order
+    assert list(rank_results(rows, "sortino")["n1"]) == [1, 2, 3, 4, 5]
+
+
+def test_pool_sweep_matches_a_serial_run():
+    feeds = [generate_ohlcv(600, seed=4)]
+    ranges = {"n1": [5, 10, 20], "n2": [30, 60]}
+
+    serial = run_parameter_sweep("SmaCrossStrategy", feeds, ranges, max_workers=1, engine="vectorized")
+    pooled = run_parameter_sweep("SmaCrossStrategy", feeds, ranges, max_workers=2, engine="vectorized")
+
+    assert len(serial) == 6
+    pd.testing.assert_frame_equal(pooled, serial)
+    # Each row is the plain backtest of its combination
+    best = serial.iloc[0]
+    metrics = run_backtest_metrics("SmaCrossStrategy", feeds, {"n1": int(best["n1"]), "n2": int(best["n2"])}, "vectorized")
+    assert metrics["final_value"] == pytest.approx(best["final_value"])
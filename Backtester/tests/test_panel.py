@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hedgeone_agent import backtest_engine
+from hedgeone_agent.panel import align_frames, basket_return
+from hedgeone_agent.synthetic_data import generate_ohlcv
+
+
+def _frame(dates, start=100.0):
+    close = start + np.arange(len(dates), dtype=float)
+    return pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1000.0},
+                        index=pd.DatetimeIndex(dates))
+
+
+def test_union_keeps_bars_before_a_late_listing():
+    early = _frame(["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"])
+    late = _frame(["2024-01-03", "2024-01-05"], start=50.0)
+    a, b = align_frames([early, late])
+
+    assert list(a.index.strftime("%m-%d")) == ["01-01", "01-02", "01-03", "01-04", "01-05"]
+    # The late feed starts at its own first bar and is forward-filled after it
+    assert list(b.index.strftime("%m-%d")) == ["01-03", "01-04", "01-05"]
+    assert b.loc["2024-01-04", ["Open", "High", "Low", "Close"]].tolist() == [50.0] * 4
+    assert b.loc["2024-01-04", "Volume"] == 0
+    assert not a.isna().any().any() and not b.isna().any().any()
+
+
+def test_intersection_keeps_common_dates_only():
+    a, b = align_frames([_frame(["2024-01-01", "2024-01-02", "2024-01-03"]), _frame(["2024-01-02", "2024-01-03"])], calendar="intersection")
+
+    assert list(a.index) == list(b.index) == list(pd.DatetimeIndex(["2024-01-02", "2024-01-03"]))
+
+
+def test_unknown_calendar_rejected():
+    with pytest.raises(ValueError):
+        align_frames([_frame(["2024-01-01"]), _frame(["2024-01-01"])], calendar="mask")
+
+
+def test_basket_return_policies():
+    a = _frame(["2024-01-01", "2024-01-02", "2024-01-03"])
+    b = _frame(["2024-01-01", "2024-01-03"])
+    calendar = a.index
+    masked = basket_return([a, b], calendar, policy="mask")
+    filled = basket_return([a, b], calendar, policy="ffill")
+
+    assert np.isnan(masked[0])
+    assert masked[1] == pytest.approx(1 / 100)
+    assert filled[1] == pytest.approx((1 / 100 + 0.0) / 2)
+
+
+def test_aligned_cerebro_matches_unaligned(monkeypatch):
+    full = generate_ohlcv(400, seed=3)
+    # Second feed lists 100 bars later and misses every tenth bar
+    late = generate_ohlcv(300, seed=4).set_axis(full.index[100:])
+    late = late[np.arange(len(late)) % 10 != 0]
+    params = {"n1": 5, "n2": 20}
+
+    monkeypatch.setattr(backtest_engine, "FEED_CALENDAR", "none")
+    unaligned = backtest_engine.run_backtest_metrics("SmaCrossStrategy", [full, late], params, engine="backtrader")
+    monkeypatch.setattr(backtest_engine, "FEED_CALENDAR", "union")
+    aligned = backtest_engine.run_backtest_metrics("SmaCrossStrategy", [full, late], params, engine="backtrader")
+
+    assert aligned["final_value"] == pytest.approx(unaligned["final_value"])
+    assert aligned["total_trades"] == unaligned["total_trades"]
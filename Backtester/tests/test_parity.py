@@ -0,0 +1,10 @@
+import pytest
+
+from hedgeone_agent.parity import check_parity
+from hedgeone_agent.vector_engine import VECTORIZED_SIGNALS
+
+
+@pytest.mark.parametrize("strategy_id", list(VECTORIZED_SIGNALS))
+def test_vectorized_engine_matches_backtrader(strategy_id):
+    # Default and PARITY_PARAMS sets over the default seeded synthetic series
+    assert check_parity([strategy_id]) == []
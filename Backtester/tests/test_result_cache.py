@@ -0,0 +1,65 @@
+import os
+import sqlite3
+
+from hedgeone_agent import result_cache as rc
+from hedgeone_agent.strategies import SmaCross
+
+
+def test_creates_missing_nested_directory(tmp_path):
+    path = tmp_path / "nested" / "dir" / "cache.sqlite"
+    cache = rc.ResultCache(str(path), max_entries=4)
+    cache.put("key", "SmaCrossStrategy", "src", {"final_value": 1.0})
+    cache._memory.clear()
+
+    assert cache.get("key") == {"final_value": 1.0}
+    assert os.path.exists(path)
+
+
+def test_lru_evicts_but_sqlite_keeps(tmp_path):
+    cache = rc.ResultCache(str(tmp_path / "cache.sqlite"), max_entries=1)
+    cache.put("a", "S", "src", {"v": 1})
+    cache.put("b", "S", "src", {"v": 2})
+
+    assert list(cache._memory) == ["b"]
+    assert cache.get("a") == {"v": 1}
+    assert cache.stats()["hits"] == 1
+
+
+def test_prune_stale_drops_other_sources(tmp_path):
+    cache = rc.ResultCache(str(tmp_path / "cache.sqlite"), max_entries=4)
+    cache.put("old", "S", "v1", {"v": 1})
+    cache.put("new", "S", "v2", {"v": 2})
+    cache._memory.clear()
+    cache.prune_stale("S", "v2")
+
+    assert cache.get("old") is None
+    assert cache.get("new") == {"v": 2}
+
+
+def test_connections_are_closed(tmp_path, monkeypatch):
+    opened = []
+    real_connect = sqlite3.connect
+
+    def tracking_connect(*args, **kwargs):
+        conn = real_connect(*args, **kwargs)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(rc.sqlite3, "connect", tracking_connect)
+    cache = rc.ResultCache(str(tmp_path / "cache.sqlite"), max_entries=4)
+    cache.put("a", "S", "src", {"v": 1})
+    cache.clear()
+
+    for conn in opened:
+        try:
+            conn.execute("SELECT 1")
+        except sqlite3.ProgrammingError:
+            continue
+        raise AssertionError("connection left open")
+
+
+def test_source_hash_covers_engine_modules(monkeypatch):
+    before = rc.strategy_source_hash(SmaCross)
+    monkeypatch.setattr(rc, "_engine_hash", "changed-engine")
+
+    assert rc.strategy_source_hash(SmaCross) != before
@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+from hedgeone_agent.results import BacktestResult, METRIC_FIELDS
+from hedgeone_agent.results_store import ResultsStore
+
+
+def _result(strategy_id="SmaCrossStrategy", symbol="NSE:TCS-EQ", sharpe=1.0):
+    curve = pd.Series([100.0, 101.0, 103.0], index=pd.date_range("2024-01-01", periods=3), name="value")
+    metrics = {name: 0.0 for name in METRIC_FIELDS}
+    metrics.update(sharpe=sharpe, total_trades=2)
+    return BacktestResult(strategy_id, [symbol], {"fast": 10}, "vectorized", metrics, curve)
+
+
+def test_creates_missing_nested_directory(tmp_path):
+    pytest.importorskip("pyarrow")
+    store = ResultsStore(str(tmp_path / "nested" / "dir" / "results.sqlite"))
+    run_id = store.save(_result())
+
+    assert run_id == 1
+    assert store.count() == 1
+
+
+def test_query_orders_and_filters(tmp_path):
+    pytest.importorskip("pyarrow")
+    store = ResultsStore(str(tmp_path / "results.sqlite"))
+    store.save_many([_result(sharpe=0.5), _result(sharpe=2.0), _result(symbol="NSE:INFY-EQ", sharpe=1.0)])
+
+    table = store.query(symbol="NSE:TCS-EQ")
+    assert list(table["sharpe"]) == [2.0, 0.5]
+    assert table["params"].iloc[0] == {"fast": 10}
+    loaded = store.load(int(table["run_id"].iloc[0]))
+    assert loaded.equity_curve.tolist() == [100.0, 101.0, 103.0]
+
+
+def test_reads_report_unavailable_store(tmp_path, capsys):
+    # A directory where the database file should be makes every connection fail
+    path = tmp_path / "results.sqlite"
+    path.mkdir()
+    store = ResultsStore(str(path))
+
+    assert store.query().empty
+    assert store.load(1) is None
+    assert store.count() == 0
+    assert store.save(_result()) is None
+    assert "Results store unavailable" in capsys.readouterr().out
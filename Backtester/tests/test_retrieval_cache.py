@@ -0,0 +1,88 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from hedgeone_agent import retrieval_cache as rc
+from hedgeone_agent.embeddings import CachedEmbeddings
+
+
+class CountingModel:
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        self.calls.append(text)
+        return [float(len(text)), float(sum(map(ord, text)))]
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches(monkeypatch):
+    monkeypatch.setattr(rc, "query_embeddings", rc.QueryCache(8))
+    monkeypatch.setattr("hedgeone_agent.embeddings.query_embeddings", rc.query_embeddings)
+
+
+def test_lru_evicts_least_recently_used():
+    cache = rc.QueryCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["hits"] == 3 and cache.stats()["misses"] == 1
+
+
+def test_uncased_model_shares_case_variants():
+    model = CountingModel()
+    embeddings = CachedEmbeddings(model, "sentence-transformers/all-MiniLM-L6-v2")
+    embeddings.embed_query("Reliance Industries")
+    embeddings.embed_query("  reliance   INDUSTRIES ")
+
+    assert model.calls == ["Reliance Industries"]
+
+
+def test_cased_model_is_keyed_on_raw_text():
+    model = CountingModel()
+    embeddings = CachedEmbeddings(model, "some-org/cased-model")
+    first = embeddings.embed_query("Reliance")
+    second = embeddings.embed_query("reliance")
+
+    assert model.calls == ["Reliance", "reliance"]
+    assert first != second
+
+
+def test_models_do_not_share_entries():
+    a, b = CountingModel(), CountingModel()
+    CachedEmbeddings(a, "all-MiniLM-L6-v2").embed_query("tcs")
+    CachedEmbeddings(b, "all-MiniLM-L12-v2").embed_query("tcs")
+
+    assert a.calls == b.calls == ["tcs"]
+
+
+def test_retrieve_keys_results_on_k(monkeypatch):
+    pytest.importorskip("langchain_community")
+    from hedgeone_agent import rag_setup
+
+    class FakeRetriever:
+        def __init__(self, k):
+            self.search_kwargs = {"k": k}
+            self.calls = 0
+
+        def invoke(self, query):
+            self.calls += 1
+            return [f"{query}-{i}" for i in range(self.search_kwargs["k"])]
+
+    monkeypatch.setattr(rc, "_retrieval_caches", {})
+    retriever = FakeRetriever(3)
+    monkeypatch.setattr(rag_setup, "get_symbol_retriever", lambda: retriever)
+    assert len(rag_setup.retrieve("symbol", "TCS")) == 3
+    assert len(rag_setup.retrieve("symbol", "TCS")) == 3
+    assert retriever.calls == 1
+
+    retriever.search_kwargs["k"] = 1
+    assert len(rag_setup.retrieve("symbol", "TCS")) == 1
+    assert retriever.calls == 2
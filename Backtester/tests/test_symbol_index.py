@@ -0,0 +1,104 @@
+import os
+
+import pandas as pd
+import pytest
+
+from hedgeone_agent.symbol_index import SymbolIndex, build_symbol_index, normalize, ticker_of
+
+RECORDS = [
+    {"company_name": "Tata Consultancy Services Limited", "symbol": "NSE:TCS-EQ"},
+    {"company_name": "Reliance Industries Limited", "symbol": "NSE:RELIANCE-EQ"},
+    {"company_name": "Reliance Power Limited", "symbol": "NSE:RPOWER-EQ"},
+    {"company_name": "Mahindra & Mahindra Limited", "symbol": "NSE:M&M-EQ"},
+    {"company_name": "Reliance Industries Limited", "symbol": "NSE:RELIANCE-BE"},
+]
+
+
+def test_normalize_and_ticker():
+    assert normalize("  Mahindra & Mahindra, Ltd. ") == "MAHINDRA AND MAHINDRA LTD"
+    assert ticker_of("NSE:TCS-EQ") == "TCS"
+    assert ticker_of("tcs") == "TCS"
+
+
+def test_exact_matches_symbol_ticker_and_name():
+    index = SymbolIndex(RECORDS)
+
+    assert index.search("NSE:TCS-EQ", k=1)[0]["symbol"] == "NSE:TCS-EQ"
+    assert index.search("tcs", k=1) == [{**RECORDS[0], "match": "exact"}]
+    assert index.search("mahindra and mahindra limited", k=1)[0]["symbol"] == "NSE:M&M-EQ"
+
+
+def test_exact_hits_come_before_prefix_hits():
+    index = SymbolIndex(RECORDS)
+    hits = index.search("Reliance", k=3)
+
+    # "RELIANCE" is a ticker of two series (-EQ first), then the prefix tier adds Reliance Power
+    assert [(h["symbol"], h["match"]) for h in hits] == [
+        ("NSE:RELIANCE-EQ", "exact"), ("NSE:RELIANCE-BE", "exact"), ("NSE:RPOWER-EQ", "prefix"),
+    ]
+
+
+def test_prefix_prefers_name_starts_then_shorter_names():
+    index = SymbolIndex(RECORDS)
+
+    assert [h["symbol"] for h in index.search("Reliance I", k=3)] == ["NSE:RELIANCE-EQ", "NSE:RELIANCE-BE"]
+    # Equities first, then the shorter name: Reliance Power ahead of Reliance Industries
+    assert [h["symbol"] for h in index.search("Relia", k=3)] == ["NSE:RPOWER-EQ", "NSE:RELIANCE-EQ", "NSE:RELIANCE-BE"]
+    assert {h["match"] for h in index.search("Relia", k=3)} == {"prefix"}
+    # A later word of the name reaches its company too
+    assert index.search("Consultancy", k=1)[0]["symbol"] == "NSE:TCS-EQ"
+
+
+def test_fuzzy_only_when_nothing_else_matches():
+    index = SymbolIndex(RECORDS)
+
+    assert index.search("Relaince Industries", k=1)[0] == {**RECORDS[1], "match": "fuzzy"}
+    assert index.search("Zomato") == []
+    assert index.search("   ") == []
+
+
+def test_single_word_typo_is_scored_against_each_word_of_the_name():
+    index = SymbolIndex(RECORDS + [{"company_name": "Infosys Limited", "symbol": "NSE:INFY-EQ"}])
+
+    # Every Reliance name shares the misspelt word; the RELIANCE ticker breaks the tie
+    assert [(h["symbol"], h["match"]) for h in index.search("Relaince", k=3)] == [
+        ("NSE:RELIANCE-EQ", "fuzzy"), ("NSE:RELIANCE-BE", "fuzzy"), ("NSE:RPOWER-EQ", "fuzzy"),
+    ]
+    assert index.search("Infosis", k=1)[0]["symbol"] == "NSE:INFY-EQ"
+    assert index.search("Mahindar", k=1)[0]["symbol"] == "NSE:M&M-EQ"
+    # A shared second word alone is not enough
+    assert index.search("Zomato Industries") == []
+
+
+SYMBOLS_CSV = os.path.join(os.path.dirname(__file__), "..", "symbols.csv")
+
+
+@pytest.mark.skipif(not os.path.exists(SYMBOLS_CSV), reason="symbols.csv not present")
+def test_typos_resolve_on_the_real_symbol_master():
+    index = build_symbol_index([SYMBOLS_CSV])
+
+    for query, symbol in [("Relaince", "NSE:RELIANCE-EQ"), ("Infosis", "NSE:INFY-EQ"),
+                          ("Tata Motrs", "NSE:TATAMOTORS-EQ"), ("HDFC Bnk", "NSE:HDFCBANK-EQ")]:
+        assert index.search(query, k=1)[0]["symbol"] == symbol, query
+
+
+def test_duplicate_symbols_merge_names_and_keep_the_lot_size():
+    index = SymbolIndex([
+        {"company_name": "Tata Consultancy Services Limited", "symbol": "NSE:TCS-EQ"},
+        {"company_name": "TCS", "symbol": "nse:tcs-eq", "lot_size": 175},
+    ])
+
+    assert len(index) == 1
+    assert index.records[0]["company_name"] == "Tata Consultancy Services Limited"
+    assert index.records[0]["lot_size"] == 175
+
+
+def test_build_skips_missing_csvs(tmp_path, capsys):
+    csv_path = tmp_path / "symbols.csv"
+    pd.DataFrame({"Company Name": ["Infosys Limited", None], "Symbol": ["NSE:INFY-EQ", "NSE:X-EQ"]}).to_csv(csv_path, index=False)
+
+    index = build_symbol_index([str(csv_path), str(tmp_path / "missing.csv")])
+
+    assert len(index) == 1
+    assert index.search("INFY", k=1)[0]["company_name"] == "Infosys Limited"
+    assert "not found, skipped" in capsys.readouterr().out
@@ -0,0 +1,100 @@
+import pandas as pd
+import pytest
+
+from hedgeone_agent import walk_forward
+from hedgeone_agent.backtest_engine import START_CASH
+from hedgeone_agent.synthetic_data import generate_ohlcv
+from hedgeone_agent.walk_forward import make_folds, run_walk_forward
+
+
+def test_make_folds_tile_the_out_of_sample_windows():
+    index = pd.date_range("2020-01-01", periods=100, freq="D")
+    folds = make_folds(index, in_sample_bars=40, out_of_sample_bars=25)
+
+    assert folds == [(0, 40, 65), (25, 65, 90), (50, 90, 100)]
+    # Each OOS window starts where the previous one ended and right after its own in-sample window
+    for (_, _, previous_end), (start, oos_start, _) in zip(folds, folds[1:]):
+        assert oos_start == previous_end and oos_start - start == 40
+
+
+class FakeEngine:
+    """ Records the bars each run sees; the equity curve tracks Close so OOS returns are known. """
+
+    def __init__(self, fail=lambda params, feed: False):
+        self.calls = []
+        self.fail = fail
+
+    def __call__(self, strategy_id, feeds, params, engine):
+        feed = feeds[0]
+        self.calls.append((params["n1"], feed.index[0], feed.index[-1]))
+        if self.fail(params, feed):
+            raise ValueError(f"bad n1={params['n1']}")
+        curve = START_CASH * feed["Close"] / feed["Close"].iloc[0]
+        return {"final_value": curve.iloc[-1], "total_return_pct": 0.0, "sharpe": float(params["n1"]),
+                "max_drawdown_pct": 0.0, "total_trades": 0, "win_rate": 0.0, "equity_curve": curve}
+
+
+def _run(monkeypatch, engine, df, **kwargs):
+    monkeypatch.setattr(walk_forward, "run_backtest_metrics", engine)
+    return run_walk_forward("SmaCrossStrategy", [df], in_sample_bars=60, out_of_sample_bars=20,
+                            param_ranges={"n1": [5, 10], "n2": 30}, max_workers=1, **kwargs)
+
+
+def test_folds_warm_up_on_in_sample_bars_and_stitch_oos_returns(monkeypatch):
+    df = generate_ohlcv(120, seed=3)
+    engine = FakeEngine()
+    result = _run(monkeypatch, engine, df)
+
+    folds = result["folds"]
+    assert list(folds["status"]) == ["ok", "ok", "ok"]
+    # Highest in-sample "sharpe" wins
+    assert all(params == {"n1": 10, "n2": 30} for params in folds["params"])
+    index = df.index
+    for fold, (start, oos_start, oos_end) in enumerate([(0, 60, 80), (20, 80, 100), (40, 100, 120)]):
+        calls = engine.calls[3 * fold:3 * fold + 3]
+        in_sample, out_of_sample = calls[:2], calls[2]
+        # Optimised only on the in-sample bars, evaluated on in-sample + OOS for the warm-up
+        assert all(call[1:] == (index[start], index[oos_start - 1]) for call in in_sample)
+        assert out_of_sample[1:] == (index[start], index[oos_end - 1])
+
+    # Each OOS bar appears once and the stitched curve compounds Close from the bar before the first OOS bar
+    curve = result["equity_curve"]
+    assert curve.index.equals(index[60:])
+    expected = START_CASH * df["Close"].iloc[60:] / df["Close"].iloc[59]
+    pd.testing.assert_series_equal(curve, expected, check_names=False, check_freq=False)
+    assert result["oos_return_pct"] == pytest.approx((df["Close"].iloc[-1] / df["Close"].iloc[59] - 1) * 100)
+
+
+def test_failed_combinations_are_never_chosen(monkeypatch):
+    df = generate_ohlcv(120, seed=3)
+    result = _run(monkeypatch, FakeEngine(fail=lambda params, feed: params["n1"] == 10), df)
+
+    assert list(result["folds"]["status"]) == ["ok", "ok", "ok"]
+    assert all(params == {"n1": 5, "n2": 30} for params in result["folds"]["params"])
+
+
+def test_fold_where_everything_fails_is_marked_and_skipped(monkeypatch):
+    df = generate_ohlcv(120, seed=3)
+    second_in_sample = lambda params, feed: feed.index[0] == df.index[20] and feed.index[-1] == df.index[79]
+    result = _run(monkeypatch, FakeEngine(fail=second_in_sample), df)
+
+    folds = result["folds"]
+    assert list(folds["status"]) == ["ok", "error", "ok"]
+    assert folds.loc[1, "error"].startswith("All 2 combination(s) failed in-sample")
+    assert folds.loc[1, "params"] is None
+    # The failed fold's OOS window is missing from the stitched curve
+    assert result["equity_curve"].index.equals(df.index[60:80].append(df.index[100:120]))
+
+
+def test_every_fold_failing_raises(monkeypatch):
+    with pytest.raises(RuntimeError, match="Every walk-forward fold failed"):
+        _run(monkeypatch, FakeEngine(fail=lambda params, feed: True), generate_ohlcv(120, seed=3))
+
+
+def test_walk_forward_runs_on_the_real_engine():
+    df = generate_ohlcv(400, seed=1)
+    result = run_walk_forward("SmaCrossStrategy", [df], in_sample_bars=200, out_of_sample_bars=100,
+                              param_ranges={"n1": [5, 10], "n2": [20, 30]}, max_workers=1, engine="vectorized")
+
+    assert list(result["folds"]["status"]) == ["ok", "ok"]
+    assert result["equity_curve"].index.equals(df.index[200:])